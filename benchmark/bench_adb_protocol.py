@@ -0,0 +1,73 @@
+"""
+adb server 套接字协议客户端的功能自检与耗时对比（基于本地伪 adb server）
+
+对比三种执行方式：
+    pooled   复用连接池中的常驻shell连接
+    oneshot  每次打开新的 shell:<cmd> 服务连接
+    exec     exec:<cmd> 原始输出
+
+用法：
+    python -m benchmark.bench_adb_protocol -n 200
+"""
+import argparse
+import statistics
+import time
+
+from benchmark.fake_adb_server import FakeADBServer
+from control.adb.adb_protocol import ADBProtocolClient
+
+SERIAL = "127.0.0.1:16384"
+
+
+def _summary(name: str, samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return (f"{name:<8} 次数={len(samples):<5} 平均={statistics.mean(samples) * 1000:8.2f}ms "
+            f"p50={statistics.median(samples) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms")
+
+
+def _measure(func, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def self_check(client: ADBProtocolClient):
+    """逐项验证协议实现，失败时抛出 AssertionError"""
+    assert client.host_command("host:version") == "0029"
+    assert "already connected" in client.host_command(f"host:connect:{SERIAL}")
+    assert client.shell(SERIAL, "echo hello") == (0, b"hello\n")
+    assert client.shell(SERIAL, "echo oops >&2; false") == (1, b"oops\n")
+    assert b"cur=1920x1080" in client.shell(SERIAL, "dumpsys window displays")[1]
+    assert client.exec_out(SERIAL, "printf 'a\\nb'") == b"a\nb"
+    client.shell(SERIAL, "uiautomator dump /sdcard/window_dump.xml")
+    assert b"page_indicator" in client.pull_bytes(SERIAL, "/sdcard/window_dump.xml")
+    print("协议自检通过")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="adb 套接字协议客户端耗时对比")
+    parser.add_argument("-n", "--count", type=int, default=200, help="每种方式执行次数")
+    args = parser.parse_args()
+
+    with FakeADBServer([SERIAL]) as server:
+        client = ADBProtocolClient(port=server.port)
+        try:
+            self_check(client)
+
+            def oneshot():
+                with client.open_service(SERIAL, "shell:echo ok") as sock:
+                    client._read_until_close(sock)
+
+            print(_summary("pooled", _measure(lambda: client.shell(SERIAL, "echo ok"), args.count)))
+            print(_summary("oneshot", _measure(oneshot, args.count)))
+            print(_summary("exec", _measure(lambda: client.exec_out(SERIAL, "echo ok"), args.count)))
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+常驻shell会话 与 每次调用创建adb进程 的耗时对比
+
+用法：
+    python -m benchmark.bench_adb_shell_session --serial 127.0.0.1:16384 -n 50
+    python -m benchmark.bench_adb_shell_session --local -n 200    # 无设备时用本地sh对比进程创建开销
+"""
+import argparse
+import statistics
+import subprocess
+import time
+
+from control.adb.adb_shell_session import ADBShellSession
+
+
+def _summary(name: str, samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return (f"{name:<8} 次数={len(samples):<5} 平均={statistics.mean(samples) * 1000:8.2f}ms "
+            f"p50={statistics.median(samples) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms")
+
+
+def bench_spawn(shell_args: list, command: str, count: int) -> list:
+    """每次调用都创建新进程"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        subprocess.run(shell_args + [command], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_session(shell_args: list, command: str, count: int) -> list:
+    """复用常驻shell会话"""
+    session = ADBShellSession(shell_args)
+    session.execute("true")  # 预热，排除会话启动耗时
+    samples = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            exit_code, _ = session.execute(command)
+            samples.append(time.perf_counter() - start)
+            if exit_code != 0:
+                raise RuntimeError(f"命令执行失败，退出码: {exit_code}")
+    finally:
+        session.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻shell会话耗时对比")
+    parser.add_argument("--serial", help="设备序列号，如 127.0.0.1:16384")
+    parser.add_argument("--local", action="store_true", help="不连接设备，使用本地sh进程对比")
+    parser.add_argument("--command", default="echo ok", help="每次执行的shell命令")
+    parser.add_argument("-n", "--count", type=int, default=50, help="每种方式执行次数")
+    args = parser.parse_args()
+
+    if args.local:
+        spawn_args, session_args = ["sh", "-c"], ["sh"]
+    else:
+        adb = ["adb", "-s", args.serial] if args.serial else ["adb"]
+        spawn_args, session_args = adb + ["shell"], adb + ["shell"]
+
+    print(_summary("spawn", bench_spawn(spawn_args, args.command, args.count)))
+    print(_summary("session", bench_session(session_args, args.command, args.count)))
+
+
+if __name__ == "__main__":
+    main()
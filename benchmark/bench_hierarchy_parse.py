@@ -0,0 +1,139 @@
+"""
+UI布局解析方式耗时对比
+
+对比五种查找方式在同一份布局XML上的耗时：
+    et         ElementTree 完整解析后线性遍历 .//node（原 get_simulator_ui_bounds）
+    lxml       lxml 完整解析后 XPath 查询（原 _get_simulator_screen_info，未安装 lxml 时跳过）
+    snapshot   构建 HierarchySnapshot 索引后查询
+    stream     find_nodes 流式查找（exact：原始字节搜索后只解析命中的标签）
+    stream-re  find_nodes 流式查找（regex：增量解析，命中后停止）
+
+目标节点分别位于布局的开头、中间、末尾以及不存在，以体现提前停止的效果。
+未指定 --file 时生成一份约 200KB 的仿真桌面布局（多层嵌套 + 大量图标节点）。
+
+用法：
+    python -m benchmark.bench_hierarchy_parse -n 50
+    python -m benchmark.bench_hierarchy_parse --file res/xml/window_dump_16384_xxx.xml
+"""
+import argparse
+import re
+import statistics
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from control.image.hierarchy import HierarchySnapshot, Selector, find_nodes
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+def generate_dump(pages: int = 12, icons_per_page: int = 40, depth: int = 6) -> bytes:
+    """生成仿真布局：每页一棵 depth 层的容器链，末端挂 icons_per_page 个图标节点"""
+    lines = ["<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>", '<hierarchy rotation="0">']
+
+    def node(text="", resource_id="", cls="android.widget.FrameLayout", desc="", bounds="[0,0][1920,1080]",
+             close=False):
+        attrs = (f'index="0" text={quoteattr(text)} resource-id={quoteattr(resource_id)} class={quoteattr(cls)} '
+                 f'package="com.mumu.launcher" content-desc={quoteattr(desc)} checkable="false" checked="false" '
+                 f'clickable="true" enabled="true" focusable="true" focused="false" scrollable="false" '
+                 f'long-clickable="true" password="false" selected="false" bounds="{bounds}"')
+        return f"<node {attrs} />" if close else f"<node {attrs}>"
+
+    lines.append(node(resource_id="com.mumu.launcher:id/close", cls="android.widget.ImageView",
+                      bounds="[1700,100][1780,180]", close=True))
+    for page in range(pages):
+        for level in range(depth):
+            lines.append(node(resource_id=f"com.mumu.launcher:id/container_{level}"))
+        for icon in range(icons_per_page):
+            left, top = 100 + (icon % 8) * 220, 100 + (icon // 8) * 180
+            lines.append(node(text=f"应用{page}_{icon}", resource_id="com.mumu.launcher:id/icon",
+                              cls="android.widget.TextView", desc=f"应用{page}_{icon}",
+                              bounds=f"[{left},{top}][{left + 160},{top + 160}]", close=True))
+        lines.extend(["</node>"] * depth)
+    lines.append(node(resource_id="com.mumu.launcher:id/page_indicator", cls="android.view.View",
+                      desc=f"页面指示器：第1屏，共{pages}屏, 按钮", bounds="[860,1000][1060,1040]", close=True))
+    lines.append("</hierarchy>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def et_find(xml: bytes, value: str, by: str):
+    root = ET.fromstring(xml)
+    for node in root.findall(".//node"):
+        if node.get(by) == value and node.get("bounds"):
+            return node
+    return None
+
+
+def lxml_find(xml: bytes, value: str, by: str):
+    nodes = lxml_etree.fromstring(xml).xpath(f'//node[@{by}="{value}"]')
+    return nodes[0] if nodes else None
+
+
+def snapshot_find(xml: bytes, value: str, by: str):
+    return HierarchySnapshot.from_xml(xml).find(value, by)
+
+
+def stream_find(xml: bytes, value: str, by: str):
+    return find_nodes(xml, {"target": Selector(by, value)})["target"]
+
+
+def stream_regex_find(xml: bytes, value: str, by: str):
+    return find_nodes(xml, {"target": Selector(by, f"^{re.escape(value)}$", "regex")})["target"]
+
+
+def _measure(func, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UI布局解析方式耗时对比")
+    parser.add_argument("-n", "--count", type=int, default=50, help="每种方式执行次数")
+    parser.add_argument("--file", help="使用真实的 uiautomator dump 文件")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            xml = f.read()
+        snapshot = HierarchySnapshot.from_xml(xml)
+        nodes = [node for node in snapshot.nodes if node.center and node.text]
+        if not nodes:
+            raise SystemExit("布局中没有带文本的节点")
+        targets = {
+            "开头": (nodes[0].text, "text"),
+            "中间": (nodes[len(nodes) // 2].text, "text"),
+            "末尾": (nodes[-1].text, "text"),
+        }
+    else:
+        xml = generate_dump()
+        targets = {
+            "开头": ("com.mumu.launcher:id/close", "resource-id"),
+            "中间": ("应用6_0", "text"),
+            "末尾": ("com.mumu.launcher:id/page_indicator", "resource-id"),
+        }
+    targets["不存在"] = ("不存在的节点", "text")
+    print(f"布局大小: {len(xml) / 1024:.0f}KB, 节点数: {len(HierarchySnapshot.from_xml(xml))}")
+
+    methods = {"et": et_find, "snapshot": snapshot_find, "stream": stream_find, "stream-re": stream_regex_find}
+    if lxml_etree is not None:
+        methods["lxml"] = lxml_find
+    for position, (value, by) in targets.items():
+        print(f"目标位于{position}: {by}={value!r}")
+        for name, func in methods.items():
+            expected = et_find(xml, value, by)
+            found = func(xml, value, by)
+            assert (found is None) == (expected is None), f"{name} 查找结果与 ElementTree 不一致"
+            samples = _measure(lambda: func(xml, value, by), args.count)
+            print(f"    {name:<9} 平均={statistics.mean(samples) * 1000:8.2f}ms "
+                  f"p50={statistics.median(samples) * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
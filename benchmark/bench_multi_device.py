@@ -0,0 +1,81 @@
+"""
+多设备并行扩展性测试（基于本地伪 adb server）
+
+分别用 1/2/4/8 台伪设备同时执行点击，每台设备一个线程、一个 ADBSocketController。
+命令按序列号绑定到各自设备、锁按设备区分时，总吞吐量应随设备数近似线性增长；
+同时校验每台设备只收到了发给自己的点击。
+
+用法：
+    python -m benchmark.bench_multi_device -n 20 --input-delay 0.05
+"""
+import argparse
+import threading
+import time
+
+from benchmark.fake_adb_server import FakeADBServer
+from control.adb.adb_protocol import ADBProtocolClient
+from control.adb.adb_socket_controller import ADBSocketController
+
+BASE_PORT = 16384
+
+
+def run_round(client: ADBProtocolClient, server: FakeADBServer, device_count: int, taps: int) -> float:
+    """每台设备并行点击 taps 次，返回总耗时秒数"""
+    controllers = [
+        ADBSocketController(BASE_PORT + index, f"bench{index}", "bench", client=client)
+        for index in range(device_count)
+    ]
+    barrier = threading.Barrier(device_count + 1)
+    errors = []
+
+    def worker(controller: ADBSocketController):
+        barrier.wait()
+        for index in range(taps):
+            if not controller.click(controller.port, index, max_offset=0, min_delay=0, max_delay=0,
+                                    after_sleep=False):
+                errors.append(controller.serial)
+
+    threads = [threading.Thread(target=worker, args=(controller,)) for controller in controllers]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        raise RuntimeError(f"点击失败的设备: {sorted(set(errors))}")
+    for controller in controllers:
+        received = server.devices[controller.serial].input_log()
+        expected = [f"tap {controller.port} {index}" for index in range(taps)]
+        if received[-taps:] != expected:
+            raise RuntimeError(f"设备 {controller.serial} 收到了不属于它的点击: {received[-taps:][:3]}...")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多设备并行扩展性测试")
+    parser.add_argument("-n", "--taps", type=int, default=20, help="每台设备的点击次数")
+    parser.add_argument("--input-delay", type=float, default=0.05, help="伪设备执行一次 input 的耗时（秒）")
+    parser.add_argument("--devices", default="1,2,4,8", help="逐轮测试的设备数")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.devices.split(",")]
+    serials = [f"127.0.0.1:{BASE_PORT + index}" for index in range(max(counts))]
+    with FakeADBServer(serials, input_delay=args.input_delay) as server:
+        client = ADBProtocolClient(port=server.port)
+        try:
+            baseline = None
+            for count in counts:
+                elapsed = run_round(client, server, count, args.taps)
+                throughput = count * args.taps / elapsed
+                baseline = baseline or throughput
+                print(f"设备数={count:<3} 耗时={elapsed:6.2f}s 吞吐={throughput:7.1f}次/秒 "
+                      f"加速比={throughput / baseline:5.2f}x")
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
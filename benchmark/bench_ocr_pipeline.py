@@ -0,0 +1,78 @@
+"""
+OCR管道：逐条请求（PPOCR_pipe）vs 流水线（PPOCR_pipeline）吞吐量对比
+
+仿真引擎（benchmark.fake_ocr_engine，管道模式）每条识别耗时 --delay 秒。每帧先做 --prep 秒的
+截图/预处理（模拟截图等待）并把区域编码为BMP，再提交识别：
+    sequential  预处理 → 识别 → 等待回复 → 下一帧，引擎在预处理期间空闲
+    pipeline    提交后立即处理下一帧，最多 --depth 条同时等待回复，预处理与识别重叠
+
+用法：
+    python -m benchmark.bench_ocr_pipeline -n 200 --delay 0.01 --prep 0.005
+"""
+import argparse
+import os
+import sys
+import time
+from base64 import b64encode
+
+import numpy as np
+
+from benchmark import fake_ocr_engine
+from control.ocr.ocr_controller import PPOCR_pipe, PPOCR_pipeline
+from control.ocr.ocr_region import encode_bmp
+
+
+def _prepare(frame: np.ndarray, index: int, prep: float) -> str:
+    if prep:
+        time.sleep(prep)
+    top = (index * 37) % (frame.shape[0] - 60)
+    return b64encode(encode_bmp(frame[top:top + 60, 200:600])).decode("utf-8")
+
+
+def run_sequential(ocr: PPOCR_pipe, frame: np.ndarray, count: int, prep: float) -> float:
+    start = time.perf_counter()
+    for index in range(count):
+        result = ocr.runBase64(_prepare(frame, index, prep), show_log=False)
+        assert result["code"] == 100, result
+    return time.perf_counter() - start
+
+
+def run_pipeline(ocr: PPOCR_pipeline, frame: np.ndarray, count: int, prep: float) -> float:
+    start = time.perf_counter()
+    futures = [ocr.submitBase64(_prepare(frame, index, prep)) for index in range(count)]
+    for future in futures:
+        result = future.result()
+        assert result["code"] == 100, result
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR管道流水线吞吐量对比")
+    parser.add_argument("-n", "--count", type=int, default=200, help="每种方式的识别次数")
+    parser.add_argument("--delay", type=float, default=0.01, help="仿真引擎每次识别耗时（秒）")
+    parser.add_argument("--prep", type=float, default=0.005, help="每帧截图/预处理耗时（秒）")
+    parser.add_argument("--depth", type=int, default=4, help="流水线最多同时等待回复的指令数")
+    args = parser.parse_args()
+
+    script = os.path.abspath(fake_ocr_engine.__file__)
+    command = [sys.executable, script, "--delay", str(args.delay)]
+    frame = np.random.default_rng(0).integers(0, 255, (1080, 1920, 4), dtype=np.uint8)
+
+    sequential = PPOCR_pipe(script, command=command)
+    run_sequential(sequential, frame, 10, args.prep)  # 预热
+    elapsed = run_sequential(sequential, frame, args.count, args.prep)
+    sequential.exit()
+    print(f"sequential  {args.count / elapsed:8.1f} 次/s  总耗时={elapsed:.3f}s")
+
+    pipeline = PPOCR_pipeline(script, maxInFlight=args.depth, command=command)
+    run_pipeline(pipeline, frame, 10, args.prep)  # 预热
+    elapsed_pipeline = run_pipeline(pipeline, frame, args.count, args.prep)
+    pipeline.exit()
+    print(f"pipeline    {args.count / elapsed_pipeline:8.1f} 次/s  总耗时={elapsed_pipeline:.3f}s  "
+          f"加速={elapsed / elapsed_pipeline:.2f}x")
+    ideal = args.count * max(args.delay, args.prep)
+    print(f"理论下限（只计 --delay 和 --prep）: {ideal:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
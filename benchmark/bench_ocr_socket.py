@@ -0,0 +1,57 @@
+"""
+OCR套接字客户端：长连接 vs 每次请求新建连接
+
+对仿真引擎（benchmark.fake_ocr_engine）连续发送小请求，对比：
+    per-request  每次请求新建TCP连接并半关闭（原 PPOCR_socket 行为）
+    keep-alive   复用同一TCP连接，按换行分帧读取回复
+另外测试 keep-alive 客户端遇到每次回复后关闭连接的服务端时，自动退回新建连接后的耗时。
+
+用法：
+    python -m benchmark.bench_ocr_socket -n 2000 --lines 8
+"""
+import argparse
+import statistics
+import time
+from base64 import b64encode
+
+from benchmark.fake_ocr_engine import FakeOcrServer
+from control.ocr.ocr_controller import PPOCR_socket
+
+
+def _measure(ocr: PPOCR_socket, payload: str, count: int) -> list:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        result = ocr.runBase64(payload, show_log=False)
+        samples.append(time.perf_counter() - start)
+        assert result["code"] == 100, result
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR套接字客户端耗时对比")
+    parser.add_argument("-n", "--count", type=int, default=2000, help="每种方式的请求数")
+    parser.add_argument("--lines", type=int, default=8, help="每次回复的文本行数（回复大小）")
+    parser.add_argument("--image-kb", type=int, default=4, help="请求中图片的大小（KB）")
+    args = parser.parse_args()
+
+    payload = b64encode(bytes(args.image_kb * 1024)).decode()
+    cases = [
+        ("per-request", True, False),
+        ("keep-alive", True, True),
+        ("keep-alive→单次连接服务端", False, True),
+    ]
+    for name, server_keep_alive, client_keep_alive in cases:
+        with FakeOcrServer(keep_alive=server_keep_alive, lines=args.lines) as server:
+            ocr = PPOCR_socket(f"remote://127.0.0.1:{server.port}", keepAlive=client_keep_alive)
+            _measure(ocr, payload, 20)  # 预热
+            samples = _measure(ocr, payload, args.count)
+            ocr.exit()
+            print(f"{name:<20} 平均={statistics.mean(samples) * 1000:7.3f}ms "
+                  f"p50={statistics.median(samples) * 1000:7.3f}ms "
+                  f"p99={sorted(samples)[int(len(samples) * 0.99) - 1] * 1000:7.3f}ms "
+                  f"连接数={server.connections}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+模板匹配耗时测试
+
+在一帧仿真截图（平滑背景 + 若干图标）上依次匹配多个模板，统计：
+    首个模板  包含整帧预处理（灰度化、金字塔、FFT频谱）
+    后续模板  复用同一帧的预处理结果
+分别测试全屏与 ROI（四分之一屏）、不同金字塔层数。
+
+用法：
+    python -m benchmark.bench_template_match -n 10 --templates 8
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from control.image.template_matcher import TemplateMatcher
+
+
+def generate_frame(width: int = 1920, height: int = 1080, icons: int = 8, seed: int = 0):
+    """生成仿真截图：渐变背景上放置 icons 个随机纹理图标，返回 (帧, [(模板, 左上角)])"""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width]
+    background = (xs / width * 120 + ys / height * 60).astype(np.uint8)
+    frame = np.dstack([background, background, background, np.full_like(background, 255)])
+    templates = []
+    for index in range(icons):
+        size = int(rng.integers(48, 120))
+        left = 40 + (index % 4) * 460
+        top = 40 + (index // 4) * 500
+        icon = (rng.random((size, size, 4)) * 255).astype(np.uint8)
+        icon[..., 3] = 255
+        frame[top:top + size, left:left + size] = icon
+        templates.append((icon, (left, top)))
+    return frame, templates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模板匹配耗时测试")
+    parser.add_argument("-n", "--count", type=int, default=10, help="重复次数")
+    parser.add_argument("--templates", type=int, default=8, help="每帧匹配的模板数")
+    args = parser.parse_args()
+
+    frame, templates = generate_frame(icons=args.templates)
+    frame.flags.writeable = False
+    cases = {
+        "全屏": None,
+        "ROI": (0, 0, frame.shape[1] // 2, frame.shape[0] // 2),
+    }
+    for name, roi in cases.items():
+        for pyramid in (0, 1, 2):
+            first, rest = [], []
+            for _ in range(args.count):
+                matcher = TemplateMatcher(frame)
+                for index, (template, (left, top)) in enumerate(templates):
+                    start = time.perf_counter()
+                    matches = matcher.find(template, roi=roi, pyramid=pyramid)
+                    (first if index == 0 else rest).append(time.perf_counter() - start)
+                    if roi is None:
+                        assert matches and (matches[0].left, matches[0].top) == (left, top), "匹配位置错误"
+            print(f"{name:<4} 金字塔={pyramid} 首个模板={statistics.mean(first) * 1000:8.2f}ms "
+                  f"后续模板={statistics.mean(rest) * 1000:8.2f}ms "
+                  f"{len(templates)}个模板合计={(sum(first) + sum(rest)) / args.count * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+本地伪 adb server，用于在没有模拟器的环境中验证 ADBProtocolClient / ADBSocketController
+
+实现了 adb server 套接字协议中本项目用到的部分：
+    host:version / host:devices / host:connect:<addr> / host:disconnect:<addr>
+    host:transport:<serial> 之后的 shell,v2,raw: / shell:<cmd> / exec:<cmd> / sync:(RECV)
+
+每台伪设备是一个临时目录：设备端命令交给本地 sh 执行，PATH 中放置了 input、dumpsys、am、
+uiautomator、screencap 等桩脚本，设备路径（如 /sdcard/window_dump.xml）映射到临时目录下。
+仅支持 Linux / macOS。
+
+用法：
+    with FakeADBServer(["127.0.0.1:16384"]) as server:
+        client = ADBProtocolClient(port=server.port)
+"""
+import os
+import shutil
+import socket
+import socketserver
+import struct
+import subprocess
+import tempfile
+import threading
+
+WINDOW_DUMP = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy rotation="0">
+  <node index="0" text="" resource-id="" class="android.widget.FrameLayout" package="com.mumu.launcher" content-desc="" bounds="[0,0][1920,1080]">
+    <node index="0" text="" resource-id="com.mumu.launcher:id/close" class="android.widget.ImageView" package="com.mumu.launcher" content-desc="" bounds="[1700,100][1780,180]" />
+    <node index="1" text="" resource-id="com.mumu.launcher:id/page_indicator" class="android.view.View" package="com.mumu.launcher" content-desc="页面指示器：第1屏，共2屏, 按钮" bounds="[860,1000][1060,1040]" />
+    <node index="2" text="崩坏：星穹铁道" resource-id="com.mumu.launcher:id/icon" class="android.widget.TextView" package="com.mumu.launcher" content-desc="崩坏：星穹铁道" bounds="[200,300][360,480]" />
+    <node index="3" text="食物语" resource-id="com.mumu.launcher:id/icon" class="android.widget.TextView" package="com.mumu.launcher" content-desc="食物语" bounds="[400,300][560,480]" />
+  </node>
+</hierarchy>
+"""
+
+_STUBS = {
+    "input": '#!/bin/sh\nsleep "${FAKE_INPUT_DELAY:-0}"\necho "$*" >> "$FAKE_ROOT/input.log"\n',
+    "am": "#!/bin/sh\nexit 0\n",
+    "dumpsys": (
+        '#!/bin/sh\n'
+        'read width height rotation < "$FAKE_ROOT/display"\n'
+        'case "$1 $2" in\n'
+        '"window displays")\n'
+        '  echo "Display: mDisplayId=0"\n'
+        '  echo "  init=${FAKE_WIDTH}x${FAKE_HEIGHT} 240dpi cur=${width}x${height} app=${width}x${height}"\n'
+        '  echo "  mRotation=$rotation" ;;\n'
+        '"window windows") echo "  mCurrentFocus=Window{1a2b3c u0 $(cat "$FAKE_ROOT/focus")}" ;;\n'
+        'power*) echo "  mWakefulness=Awake" ;;\n'
+        'input*) echo "    SurfaceOrientation: $rotation" ;;\n'
+        'esac\n'
+    ),
+    "screencap": '#!/bin/sh\ncat "$FAKE_ROOT/screencap.raw"\n',
+    "uiautomator": (
+        '#!/bin/sh\n'
+        'if [ "$2" = /dev/tty ]; then cat "$FAKE_ROOT/window_dump.xml"; '
+        'else cp "$FAKE_ROOT/window_dump.xml" "$FAKE_ROOT$2"; fi\n'
+        'echo "UI hierchary dumped to: $2"\n'
+    ),
+}
+
+
+class FakeDevice:
+    """伪设备：临时目录 + 桩命令"""
+
+    def __init__(self, serial: str, width: int = 1920, height: int = 1080, input_delay: float = 0.0):
+        self.serial = serial
+        self.width = width
+        self.height = height
+        self.input_delay = input_delay
+        self.root = tempfile.mkdtemp(prefix="fake_adb_")
+        self.bin_dir = os.path.join(self.root, "bin")
+        os.makedirs(self.bin_dir)
+        os.makedirs(os.path.join(self.root, "sdcard"))
+        for name, content in _STUBS.items():
+            path = os.path.join(self.bin_dir, name)
+            with open(path, "w") as f:
+                f.write(content)
+            os.chmod(path, 0o755)
+        self.set_window_dump(WINDOW_DUMP.encode("utf-8"))
+        self.set_frame(bytes(width * height * 4))
+        self.set_rotation(0)
+        self.set_focus("com.mumu.launcher/com.mumu.launcher.Launcher")
+
+    def set_rotation(self, rotation: int):
+        """设置屏幕旋转（0~3），dumpsys 返回的当前分辨率随之交换宽高"""
+        width, height = (self.height, self.width) if rotation % 2 else (self.width, self.height)
+        with open(os.path.join(self.root, "display"), "w") as f:
+            f.write(f"{width} {height} {rotation}\n")
+
+    def set_focus(self, component: str):
+        """设置前台窗口，格式为 包名/Activity"""
+        with open(os.path.join(self.root, "focus"), "w") as f:
+            f.write(component)
+
+    def set_window_dump(self, xml: bytes):
+        """设置 uiautomator dump 返回的布局内容"""
+        with open(os.path.join(self.root, "window_dump.xml"), "wb") as f:
+            f.write(xml)
+
+    def set_frame(self, rgba: bytes):
+        """设置 screencap 返回的像素（Android 9+ 格式：16字节头 + RGBA）"""
+        header = struct.pack("<IIII", self.width, self.height, 1, 0)
+        with open(os.path.join(self.root, "screencap.raw"), "wb") as f:
+            f.write(header + rgba)
+
+    def input_log(self) -> list:
+        """设备收到的 input 命令参数（每行一条）"""
+        path = os.path.join(self.root, "input.log")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return f.read().splitlines()
+
+    def local_path(self, remote_path: str) -> str:
+        return os.path.join(self.root, remote_path.lstrip("/"))
+
+    def env(self) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "PATH": self.bin_dir + os.pathsep + env.get("PATH", ""),
+            "FAKE_ROOT": self.root,
+            "FAKE_WIDTH": str(self.width),
+            "FAKE_HEIGHT": str(self.height),
+            "FAKE_INPUT_DELAY": str(self.input_delay),
+        })
+        return env
+
+    def spawn(self, command: str = None, stderr=subprocess.PIPE) -> subprocess.Popen:
+        args = ["sh"] if command is None else ["sh", "-c", command]
+        return subprocess.Popen(args, cwd=self.root, env=self.env(),
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr)
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server = self.server.fake
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            request = self._read_request()
+            if request.startswith("host:transport:"):
+                device = server.devices.get(request[len("host:transport:"):])
+                if device is None:
+                    return self._fail("device not found")
+                sock.sendall(b"OKAY")
+                self._serve_device(device, self._read_request())
+            else:
+                self._serve_host(server, request)
+        except (ConnectionError, OSError):
+            pass
+
+    # ---------- 协议辅助 ----------
+
+    def _read_exact(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _read_request(self) -> str:
+        length = int(self._read_exact(4), 16)
+        return self._read_exact(length).decode("utf-8")
+
+    def _okay(self, message: str):
+        payload = message.encode("utf-8")
+        self.request.sendall(b"OKAY" + b"%04x" % len(payload) + payload)
+
+    def _fail(self, message: str):
+        payload = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + b"%04x" % len(payload) + payload)
+
+    # ---------- host 服务 ----------
+
+    def _serve_host(self, server: "FakeADBServer", request: str):
+        if request == "host:version":
+            self._okay("0029")
+        elif request == "host:devices":
+            self._okay("".join(f"{serial}\tdevice\n" for serial in server.devices))
+        elif request.startswith("host:connect:"):
+            serial = request[len("host:connect:"):]
+            if serial in server.devices:
+                self._okay(f"already connected to {serial}")
+            else:
+                self._okay(f"failed to connect to {serial}")
+        elif request.startswith("host:disconnect:"):
+            self._okay(f"disconnected {request[len('host:disconnect:'):]}")
+        else:
+            self._fail(f"unknown host service {request}")
+
+    # ---------- 设备服务 ----------
+
+    def _serve_device(self, device: FakeDevice, service: str):
+        sock = self.request
+        if service == "shell,v2,raw:":
+            sock.sendall(b"OKAY")
+            self._serve_shell_v2(device.spawn())
+        elif service.startswith("shell:") or service.startswith("exec:"):
+            sock.sendall(b"OKAY")
+            # shell: 合并stderr，exec: 只返回stdout的原始字节
+            stderr = subprocess.STDOUT if service.startswith("shell:") else subprocess.DEVNULL
+            process = device.spawn(service.split(":", 1)[1], stderr=stderr)
+            process.stdin.close()
+            for chunk in iter(lambda: process.stdout.read1(65536), b""):
+                sock.sendall(chunk)
+            process.wait()
+        elif service == "sync:":
+            sock.sendall(b"OKAY")
+            self._serve_sync(device)
+        else:
+            self._fail(f"unknown device service {service}")
+
+    def _serve_shell_v2(self, process: subprocess.Popen):
+        sock = self.request
+        send_lock = threading.Lock()
+
+        def send_packet(packet_id: int, data: bytes):
+            with send_lock:
+                sock.sendall(struct.pack("<BI", packet_id, len(data)) + data)
+
+        def pump(stream, packet_id):
+            for chunk in iter(lambda: stream.read1(65536), b""):
+                send_packet(packet_id, chunk)
+
+        pumps = [threading.Thread(target=pump, args=(process.stdout, 1), daemon=True),
+                 threading.Thread(target=pump, args=(process.stderr, 2), daemon=True)]
+        for thread in pumps:
+            thread.start()
+
+        def feed():
+            try:
+                while True:
+                    packet_id, length = struct.unpack("<BI", self._read_exact(5))
+                    data = self._read_exact(length)
+                    if packet_id == 0:
+                        process.stdin.write(data)
+                        process.stdin.flush()
+                    elif packet_id == 3:
+                        break
+            except (ConnectionError, OSError):
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+
+        threading.Thread(target=feed, daemon=True).start()
+        exit_code = process.wait()
+        for thread in pumps:
+            thread.join()
+        send_packet(3, bytes([exit_code & 0xFF]))
+
+    def _serve_sync(self, device: FakeDevice):
+        sock = self.request
+        while True:
+            command = self._read_exact(4)
+            length = struct.unpack("<I", self._read_exact(4))[0]
+            if command == b"QUIT":
+                return
+            path = self._read_exact(length).decode("utf-8")
+            if command != b"RECV":
+                message = f"unsupported sync command {command!r}".encode()
+                sock.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                return
+            try:
+                with open(device.local_path(path), "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                message = str(e).encode()
+                sock.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                continue
+            for offset in range(0, len(data), 64 * 1024):
+                chunk = data[offset:offset + 64 * 1024]
+                sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            sock.sendall(b"DONE" + struct.pack("<I", 0))
+
+
+class FakeADBServer:
+    """在随机端口上监听的伪 adb server"""
+
+    def __init__(self, serials: list = None, **device_kwargs):
+        self.devices = {serial: FakeDevice(serial, **device_kwargs) for serial in (serials or [])}
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def add_device(self, serial: str, **device_kwargs) -> FakeDevice:
+        self.devices[serial] = FakeDevice(serial, **device_kwargs)
+        return self.devices[serial]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        for device in self.devices.values():
+            device.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,136 @@
+"""
+仿真 PaddleOCR-json 引擎（JSON Lines 协议），用于在没有 PaddleOCR-json.exe 的环境下测试OCR客户端
+
+每收到一行JSON请求（image_base64 / image_path / 空指令），等待 delay 秒后回复一行结果：
+    {"code": 100, "data": [{"box": [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], "score": 0.99, "text": "..."}, ...]}
+空指令回复 {"code": 200, "data": "..."}，与真实引擎一致。
+
+套接字模式：
+    keep_alive=True   同一连接上可连续请求（长连接）
+    keep_alive=False  每次回复后关闭连接（与每次请求新建连接的服务端行为一致）
+
+管道模式（与 PaddleOCR-json.exe 相同：启动后输出 "OCR init completed."，之后按顺序逐行处理标准输入）：
+    python benchmark/fake_ocr_engine.py --delay 0.02
+    PPOCR_pipe(exe, command=[sys.executable, fake_ocr_engine.__file__, "--delay", "0.02"])
+"""
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+
+def fake_result(request: dict, lines: int = 8) -> dict:
+    """根据请求生成识别结果"""
+    if not request:
+        return {"code": 200, "data": "No image input"}
+    data = []
+    for index in range(lines):
+        top = 20 + index * 40
+        data.append({
+            "box": [[40, top], [360, top], [360, top + 30], [40, top + 30]],
+            "score": 0.99,
+            "text": f"识别文本第{index + 1}行",
+        })
+    return {"code": 100, "data": data}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "FakeOcrServer"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            if request is None:
+                response = {"code": 904, "data": "请求不是有效的JSON"}
+            else:
+                if self.server.delay:
+                    time.sleep(self.server.delay)
+                response = fake_result(request, self.server.lines)
+            self.server.requests += 1
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if not self.server.keep_alive:
+                return
+
+
+class FakeOcrServer(socketserver.ThreadingTCPServer):
+    """
+    套接字模式的仿真引擎（本地环回随机端口）
+
+        with FakeOcrServer(keep_alive=True) as server:
+            ocr = PPOCR_socket(f"remote://127.0.0.1:{server.port}")
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, keep_alive: bool = True, delay: float = 0.0, lines: int = 8):
+        """
+        :param keep_alive: 是否支持同一连接上的连续请求
+        :param delay: 每次识别的模拟耗时秒数
+        :param lines: 每次返回的文本行数
+        """
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.keep_alive = keep_alive
+        self.delay = delay
+        self.lines = lines
+        self.connections = 0
+        self.requests = 0
+        self.port = self.server_address[1]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-ocr-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def serve_pipe(delay: float = 0.0, lines: int = 8, stdin=None, stdout=None):
+    """管道模式：逐行读取请求，按顺序逐条回复（同一时刻只处理一条，与真实引擎一致）"""
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    stdout.write(b"OCR init completed.\n")
+    stdout.flush()
+    for line in iter(stdin.readline, b""):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"code": 904, "data": "请求不是有效的JSON"}
+        else:
+            if delay and request:
+                time.sleep(delay)
+            response = fake_result(request, lines)
+        stdout.write((json.dumps(response, ensure_ascii=True) + "\n").encode("utf-8"))
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="仿真 PaddleOCR-json 引擎（管道模式）")
+    parser.add_argument("--delay", type=float, default=0.0, help="每次识别的模拟耗时秒数")
+    parser.add_argument("--lines", type=int, default=8, help="每次返回的文本行数")
+    args = parser.parse_args()
+    serve_pipe(args.delay, args.lines)
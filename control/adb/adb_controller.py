@@ -1,15 +1,32 @@
 import random
-import re
+import struct
 import subprocess
 import threading
 import time
 import os
+from contextlib import contextmanager
 
+import numpy as np
+
+from control.adb.adb_metrics import ADBMetrics, command_type
+from control.adb.adb_shell_session import ADBShellSession
+from control.adb.coordinate_transform import CoordinateTransform
+from control.adb.device_state import DeviceState
+from control.adb.input_batch import InputBatch
 from log.log_factory import get_logger
 
 
+def extract_hierarchy(data: bytes) -> bytes | None:
+    """从 uiautomator dump 的输出中截取布局XML（其后紧跟 `UI hierchary dumped to: ...` 提示），没有布局时返回None"""
+    start = data.find(b"<?xml")
+    end = data.rfind(b"</hierarchy>")
+    if start < 0 or end < start:
+        return None
+    return data[start:end + len(b"</hierarchy>")]
+
+
 class ADBController:
-    """ADB控制器，线程安全"""
+    """ADB控制器，线程安全（每个设备一个实例，所有设备命令均通过 -s 绑定到该设备的序列号）"""
 
     _instances = {}
     _lock = threading.Lock()
@@ -17,8 +34,49 @@ class ADBController:
     def __init__(self, port: int, account: str, simulator_type: str, host: str = "127.0.0.1"):
         self.host = host
         self.port = port
+        self.serial = f"{host}:{port}"
         self._connection_lock = threading.Lock()
+        # 设备级命令锁：同一设备的命令串行，不同设备之间互不阻塞
+        self._command_lock = threading.RLock()
         self.logger = get_logger(self.__class__.__name__, port, account, simulator_type)
+        # shell命令执行方式：session 复用常驻shell会话，spawn 每次调用创建新的adb进程
+        self.shell_mode = "session"
+        self._shell_session = ADBShellSession(self._adb_args("shell"), logger=self.logger)
+        # 按分辨率预分配的截图缓冲区 {(width, height): np.ndarray}
+        self._frame_buffers = {}
+        self._screencap_lock = threading.Lock()
+        # 命令耗时统计（进程内共享，按设备序列号区分）
+        self.metrics = ADBMetrics.get_instance()
+        # 设备状态缓存（分辨率、旋转、前台Activity、亮屏），可能切换界面的操作会使其失效
+        self.state = DeviceState(self, logger=self.logger)
+        # 基准坐标到设备坐标的变换，分辨率变化时重新计算
+        self._transform = None
+        # 游戏画面相对屏幕需要旋转的90°次数，由游戏适配器按实际情况设置（如取 state.rotation）；
+        # 暂不支持旋转显示的游戏画面，默认为0
+        self.content_rotation = 0
+        self.state.add_listener(self._on_state_changed)
+        # 设备截图流，由 FrameStream 创建时关联
+        self.frame_stream = None
+        # 为True时点击/滑动后等待画面稳定，代替固定时长的等待（可按次通过 wait_stable 参数覆盖）
+        self.wait_stable = False
+        self._settle_lock = threading.Lock()
+        self._settle_stats = {"calls": 0, "stable": 0, "waited": 0.0, "saved": 0.0}
+
+    @property
+    def transform(self) -> CoordinateTransform | None:
+        """基准分辨率（1920x1080）坐标到当前设备坐标的变换，获取分辨率失败时为None"""
+        transform = self._transform
+        if transform is None or transform.rotation != self.content_rotation % 4:
+            resolution = self.state.resolution
+            if not resolution:
+                return None
+            transform = self._transform = CoordinateTransform(resolution, rotation=self.content_rotation)
+            self.logger.debug(f"坐标变换: {transform}")
+        return transform
+
+    def _on_state_changed(self, old, new):
+        if old is None or old.resolution != new.resolution:
+            self._transform = None
 
     @classmethod
     def get_instance(cls, port: int, account: str, simulator_type: str, host: str = "127.0.0.1"):
@@ -29,6 +87,62 @@ class ADBController:
                 cls._instances[key] = cls(port, account, simulator_type, host)
             return cls._instances[key]
 
+    def _adb_args(self, *args) -> list:
+        """构建绑定到当前设备序列号的adb命令"""
+        return ["adb", "-s", self.serial, *args]
+
+    @contextmanager
+    def _measure(self, command: str):
+        """
+        统计一次命令的耗时并记录到 metrics
+
+        用法：
+            with self._measure("pull") as sample:
+                sample["exit_code"], output = ...
+        sample 中可填写 spawn（创建进程耗时）、exit_code、bytes；抛出异常且未填写退出码时记为 -1。
+        """
+        sample = {"spawn": 0.0, "exit_code": 0, "bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield sample
+        except BaseException:
+            if sample["exit_code"] == 0:
+                sample["exit_code"] = -1
+            raise
+        finally:
+            self.metrics.record(self.serial, command, time.perf_counter() - start, sample["spawn"],
+                                sample["exit_code"], sample["bytes"], logger=self.logger)
+
+    @staticmethod
+    def _run_adb(args: list, sample: dict, timeout: float, stdout=subprocess.PIPE) -> tuple[int, bytes]:
+        """
+        启动 adb 进程并等待其结束，将创建进程耗时、退出码和输出字节数写入 sample
+
+        :return: (退出码, 合并后的stdout/stderr输出)
+        :raises subprocess.TimeoutExpired: 超时（进程会被结束）
+        """
+        started = time.perf_counter()
+        process = subprocess.Popen(args, stdout=stdout, stderr=subprocess.STDOUT)
+        sample["spawn"] = time.perf_counter() - started
+        try:
+            output, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        output = output or b""
+        sample["exit_code"] = process.returncode
+        sample["bytes"] = len(output)
+        return process.returncode, output
+
+    def get_latency_stats(self) -> dict:
+        """
+        当前设备各类命令的耗时统计
+
+        :return: {命令类型: {"count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms", "mean_spawn_ms", "bytes"}}
+        """
+        return self.metrics.summary(self.serial).get(self.serial, {})
+
     def connect(self, port) -> bool:
         """连接到模拟器"""
         with self._connection_lock:
@@ -41,17 +155,11 @@ class ADBController:
                 self.logger.debug(f"执行ADB命令: {' '.join(adb_cmd)}")  # 打印完整命令
 
                 # 执行ADB命令
-                result = subprocess.run(
-                    adb_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
+                with self._measure("connect") as sample:
+                    returncode, output = self._run_adb(adb_cmd, sample, timeout=10)
 
                 # 处理命令输出（区分不同情况）
-                stdout = result.stdout.strip() if result.stdout else "无输出"
+                stdout = output.decode("utf-8", errors="ignore").strip() or "无输出"
 
                 # 判断连接结果
                 if "connected" in stdout.lower() or "already" in stdout.lower():
@@ -60,7 +168,7 @@ class ADBController:
                 else:
                     self.logger.error(
                         f"连接模拟器失败: 命令返回非预期结果\n"
-                        f"返回码: {result.returncode}\n"
+                        f"返回码: {returncode}\n"
                         f"输出信息: {stdout}"
                     )
                     return False
@@ -107,28 +215,175 @@ class ADBController:
         """断开模拟器"""
         try:
             self.logger.info(f"正在尝试断开模拟器 地址:{self.host} 端口: {self.port}...")
+            self._shell_session.close()
             cmd = ["adb", "disconnect", f"{self.host}:{port}"]
-            subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            with self._measure("disconnect") as sample:
+                self._run_adb(cmd, sample, timeout=10)
             return True
         except Exception as e:
             self.logger.error(f"断开模拟器失败: {str(e)}")
             return False
 
+    def shell(self, command: str, timeout: float = 5, check: bool = True, metric: str = None) -> str:
+        """
+        在设备上执行shell命令
+
+        默认通过常驻shell会话执行，避免每次操作都创建adb进程；
+        shell_mode 为 spawn 时退回到每次调用启动一个 `adb shell` 进程。
+
+        :param command: 设备端shell命令
+        :param timeout: 超时秒数
+        :param check: 退出码非0时是否抛出 subprocess.CalledProcessError
+        :param metric: 耗时统计中的命令类型，默认根据命令推断（tap、swipe、dump、dumpsys、force-stop等）
+        :return: 命令输出（stdout与stderr合并）
+        :raises subprocess.CalledProcessError: check 为True且退出码非0
+        :raises subprocess.TimeoutExpired: 执行超时
+        :raises OSError: adb进程启动失败或常驻会话中断（ADBSessionError）
+        """
+        with self._command_lock, self._measure(metric or command_type(command)) as sample:
+            if self.shell_mode == "spawn":
+                exit_code, output = self._run_adb(self._adb_args("shell", command), sample, timeout=timeout)
+            else:
+                exit_code, output = self._shell_session.execute(command, timeout=timeout)
+                sample["spawn"] = self._shell_session.last_spawn_seconds
+                sample["exit_code"] = exit_code
+                sample["bytes"] = len(output)
+        if check and exit_code != 0:
+            raise subprocess.CalledProcessError(exit_code, command, output=output, stderr=output)
+        return output.decode("utf-8", errors="ignore")
+
+    def pull(self, remote_path: str, local_path: str, timeout: float = 30):
+        """
+        将设备文件复制到本地
+
+        :raises subprocess.CalledProcessError: adb pull 执行失败
+        """
+        args = self._adb_args("pull", remote_path, local_path)
+        with self._command_lock, self._measure("pull") as sample:
+            exit_code, output = self._run_adb(args, sample, timeout=timeout)
+            if exit_code != 0:
+                raise subprocess.CalledProcessError(exit_code, args, output=output)
+            sample["bytes"] = os.path.getsize(local_path) if os.path.isfile(local_path) else 0
+
+    @contextmanager
+    def exec_out(self, command: str, timeout: float = 10):
+        """
+        以 `adb exec-out` 执行命令，返回可 readinto 的原始二进制输出流（不经过pty转换）
+
+        用法：
+            with self.exec_out("screencap") as stream:
+                stream.readinto(buffer)
+        """
+        process = subprocess.Popen(self._adb_args("exec-out", command),
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL,
+                                   bufsize=0)
+        try:
+            yield process.stdout
+        finally:
+            process.stdout.close()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                raise
+
+    def screencap(self) -> np.ndarray:
+        """
+        截取屏幕原始帧（exec-out screencap，不做PNG编码、不落地临时文件）
+
+        screencap 原始输出为 12字节头(宽、高、像素格式) 或 Android 9+ 的 16字节头(多一个色彩空间)，
+        之后是 宽×高×4 的RGBA像素。数据直接 readinto 到按分辨率预分配的缓冲区。
+
+        注意：返回的数组是缓冲区视图，下一次截图会覆盖其内容，需要保留时请自行 copy()。
+
+        :return: 形状为 (高, 宽, 4) 的 uint8 RGBA 数组
+        :raises ValueError: 输出不完整或像素格式不受支持
+        """
+        with self._screencap_lock, self._measure("screencap") as sample, self.exec_out("screencap") as stream:
+            header = bytearray(12)
+            if self._read_into(stream, memoryview(header)) != 12:
+                raise ValueError("screencap 输出为空，请检查设备连接")
+            width, height, pixel_format = struct.unpack("<III", header)
+            if pixel_format not in (1, 2):  # RGBA_8888 / RGBX_8888
+                raise ValueError(f"不支持的像素格式: {pixel_format}")
+            frame_size = width * height * 4
+            buffer = self._frame_buffers.get((width, height))
+            if buffer is None:
+                # 额外预留4字节以容纳新版头部中的色彩空间字段
+                buffer = np.empty(frame_size + 4, dtype=np.uint8)
+                self._frame_buffers[(width, height)] = buffer
+                self.logger.debug(f"为分辨率 {width}x{height} 分配截图缓冲区")
+            received = self._read_into(stream, memoryview(buffer))
+            sample["bytes"] = received + len(header)
+            # 剩余数据比像素多4字节说明是16字节头，像素从第4字节开始
+            offset = received - frame_size
+            if offset not in (0, 4):
+                raise ValueError(f"screencap 输出长度异常: 期望{frame_size}字节像素，实际{received}字节")
+            return buffer[offset:offset + frame_size].reshape(height, width, 4)
+
+    @staticmethod
+    def _read_into(stream, view: memoryview) -> int:
+        """循环 readinto 直到缓冲区填满或数据流结束，返回读取字节数"""
+        received = 0
+        while received < len(view):
+            count = stream.readinto(view[received:])
+            if not count:
+                break
+            received += count
+        return received
+
     def get_current_display_resolution(self) -> tuple[int, int] | None:
-        """通过 dumpsys 获取当前界面实际分辨率（自动适应旋转）"""
+        """获取当前界面实际分辨率（自动适应旋转），读取设备状态缓存"""
+        resolution = self.state.resolution
+        if resolution is None:
+            self.logger.error("获取当前分辨率失败")
+        return resolution  # (width, height)
+
+    def dump_window_hierarchy(self, save_path: str = None) -> bytes | None:
+        """
+        获取当前界面的UI布局XML（uiautomator dump）
+
+        通过 `exec-out uiautomator dump /dev/tty` 将布局直接输出到主机内存，
+        不写设备存储、不执行 adb pull、不落地本地文件；设备不支持输出到 /dev/tty 时
+        退回到写入设备临时文件后 cat 输出。
+
+        :param save_path: 调试用，提供时将布局另存到该本地路径
+        :return: 布局XML字节串（已去除 uiautomator 的提示信息），失败返回None
+        """
         try:
-            result = subprocess.run(
-                ["adb", "shell", "dumpsys", "window", "displays"],
-                capture_output=True, text=True, check=True, timeout=5
-            )
-            # 解析类似 cur=1080x1920 的当前分辨率
-            match = re.search(r"cur=(\d+)x(\d+)", result.stdout)
-            if not match:
-                raise ValueError("未找到当前分辨率")
-            return int(match[1]), int(match[2])  # (width, height)
+            with self._command_lock, self._measure("dump") as sample:
+                data = self._exec_out_bytes("uiautomator dump /dev/tty", timeout=30)
+                xml = extract_hierarchy(data)
+                if xml is None:
+                    data = self._exec_out_bytes(
+                        "uiautomator dump /sdcard/window_dump.xml >/dev/null && cat /sdcard/window_dump.xml",
+                        timeout=30)
+                    xml = extract_hierarchy(data)
+                sample["bytes"] = len(data)
+                if xml is None:
+                    sample["exit_code"] = 1
+                    raise ValueError(f"uiautomator dump 输出中没有布局内容: {data[-200:]!r}")
+            if save_path:
+                save_dir = os.path.dirname(save_path)
+                if save_dir and not os.path.exists(save_dir):
+                    os.makedirs(save_dir)
+                with open(save_path, "wb") as f:
+                    f.write(xml)
+                self.logger.debug(f"布局文件已保存: {save_path}")
+            return xml
+        except subprocess.TimeoutExpired:
+            self.logger.error("获取UI布局超时，建议检查设备连接")
+        except FileNotFoundError:
+            self.logger.error("错误: 未找到 adb 命令，请确认 adb 已安装并添加到环境变量")
         except Exception as e:
-            self.logger.error(f"获取当前分辨率失败: {str(e)}")
-            return None
+            self.logger.error(f"获取UI布局失败: {str(e)}")
+        return None
+
+    def _exec_out_bytes(self, command: str, timeout: float = 10) -> bytes:
+        """以 exec-out 执行命令并读取全部输出"""
+        with self.exec_out(command, timeout=timeout) as stream:
+            return stream.read() or b""
 
     def download_window_dump(self, xml_path):
         """
@@ -140,34 +395,11 @@ class ADBController:
         Returns:
             bool: 下载是否成功
         """
-        try:
-            self.logger.info(f"正在尝试下载模拟器布局文件...")
-            # 确保目标路径的目录存在
-            xml_dir = os.path.dirname(xml_path)
-            if xml_dir and not os.path.exists(xml_dir):
-                os.makedirs(xml_dir)
-                
-            # 执行 uiautomator dump 命令获取 UI 布局信息，捕获标准输出和错误输出并忽略
-            subprocess.run(["adb", "shell", "uiautomator", "dump", "/sdcard/window_dump.xml"],
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL,
-                           check=True)
-            # 将布局文件从设备复制到本地，捕获标准输出和错误输出并忽略
-            subprocess.run(["adb", "pull", "/sdcard/window_dump.xml", xml_path],
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL,
-                           check=True)
-            self.logger.info(f"下载模拟器布局文件成功: {xml_path}")
-            return True
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"错误: 命令执行失败: {e}")
-            return False
-        except FileNotFoundError:
-            self.logger.error("错误: 未找到 adb 命令，请确认 adb 已安装并添加到环境变量")
-            return False
-        except Exception as e:
-            self.logger.error(f"未知错误: {str(e)}")
+        self.logger.info(f"正在尝试下载模拟器布局文件...")
+        if self.dump_window_hierarchy(save_path=xml_path) is None:
             return False
+        self.logger.info(f"下载模拟器布局文件成功: {xml_path}")
+        return True
 
     def click(
             self,
@@ -180,6 +412,8 @@ class ADBController:
             after_sleep: bool = True,
             before_sleep_delay: int = 2,
             after_sleep_delay: int = 2,
+            wait_stable: bool = None,
+            stable_region: tuple = None,
     ) -> bool:
         """
         增强版模拟点击（带随机扰动和防护机制）
@@ -193,6 +427,9 @@ class ADBController:
         :param after_sleep: 在执行程序之后等待
         :param before_sleep_delay: 在执行程序之前等待秒数（默认2秒）
         :param after_sleep_delay: 在执行程序之后等待（默认2秒）
+        :param wait_stable: 执行之后等待画面稳定而不是固定等待 after_sleep_delay 秒（最长仍为 after_sleep_delay 秒），
+                            默认取 self.wait_stable
+        :param stable_region: 等待稳定时只观察该区域 (left, top, right, bottom)
         :return: 操作是否成功
         """
         try:
@@ -217,13 +454,8 @@ class ADBController:
             }
 
             # ==================== 执行点击 ====================
-            subprocess.run(
-                ["adb", "shell", "input", "tap",
-                 str(actual_x), str(actual_y)],
-                check=True,
-                timeout=5,
-                capture_output=True
-            )
+            self.shell(f"input tap {actual_x} {actual_y}")
+            self.state.invalidate()
 
             # ==================== 日志记录 ====================
             self.logger.debug(
@@ -234,7 +466,7 @@ class ADBController:
                 f"坐标演变: {coord_info}"
             )
             if after_sleep:
-                time.sleep(after_sleep_delay)
+                self._settle(after_sleep_delay, wait_stable, stable_region)
             return True
 
         except subprocess.TimeoutExpired:
@@ -257,7 +489,9 @@ class ADBController:
             duration: int = 900,
             max_offset: int = 5,
             min_delay: float = 0.1,
-            max_delay: float = 0.5
+            max_delay: float = 0.5,
+            wait_stable: bool = None,
+            stable_max_wait: float = 2,
     ) -> bool:
         """
         增强版模拟滑动（带随机扰动和防护机制）
@@ -270,6 +504,8 @@ class ADBController:
         :param max_offset: 最大随机偏移量（默认5像素）
         :param min_delay: 最小延迟秒数（默认0.1）
         :param max_delay: 最大延迟秒数（默认0.5）
+        :param wait_stable: 滑动之后等待画面（惯性滚动、翻页动画）稳定，默认取 self.wait_stable
+        :param stable_max_wait: 等待稳定的最长秒数
         :return: 操作是否成功
         """
         try:
@@ -299,15 +535,9 @@ class ADBController:
             }
 
             # ==================== 执行滑动 ====================
-            subprocess.run(
-                ["adb", "shell", "input", "swipe",
-                 str(actual_x1), str(actual_y1),
-                 str(actual_x2), str(actual_y2),
-                 str(duration)],
-                check=True,
-                timeout=5,
-                capture_output=True
-            )
+            self.shell(f"input swipe {actual_x1} {actual_y1} {actual_x2} {actual_y2} {duration}",
+                       timeout=5 + duration / 1000)
+            self.state.invalidate()
 
             # ==================== 日志记录 ====================
             self.logger.debug(
@@ -318,6 +548,8 @@ class ADBController:
                 f"持续时间: {duration}ms | "
                 f"坐标演变: {coord_info}"
             )
+            if wait_stable or (wait_stable is None and self.wait_stable):
+                self._settle(stable_max_wait, True)
             return True
 
         except subprocess.TimeoutExpired:
@@ -331,6 +563,43 @@ class ADBController:
             self.logger.error(f"发生未预期的异常 {e}")
         return False
 
+    def run_batch(self, batch: InputBatch, timeout: float = None) -> list | None:
+        """
+        一次往返执行整个输入宏（点击、滑动、等待均在设备端完成）
+
+        :param batch: 输入宏
+        :param timeout: 超时秒数，默认为宏的预计耗时加10秒
+        :return: 每步的执行结果（见 InputBatch.parse_results），失败返回None
+        """
+        if not len(batch):
+            return []
+        if timeout is None:
+            timeout = batch.estimated_seconds() + 10
+        try:
+            start = time.perf_counter()
+            output = self.shell(batch.compile(), timeout=timeout, check=False, metric="batch")
+            self.state.invalidate()
+            results = batch.parse_results(output)
+            self.logger.debug(
+                "输入宏执行完成 | "
+                f"步数: {len(results)}/{len(batch)} | "
+                f"总耗时: {(time.perf_counter() - start) * 1000:.0f}ms | "
+                f"每步耗时(ms): {[step['elapsed_ms'] for step in results]}"
+            )
+            if len(results) != len(batch):
+                self.logger.error(f"输入宏未完整执行，输出: {output.strip()}")
+                return None
+            failed = [step for step in results if step["exit_code"] != 0]
+            if failed:
+                self.logger.error(f"输入宏中有步骤执行失败: {failed}")
+                return None
+            return results
+        except subprocess.TimeoutExpired:
+            self.logger.error("ADB命令执行超时，建议检查设备连接")
+        except Exception as e:
+            self.logger.error(f"执行输入宏发生异常: {str(e)}")
+        return None
+
     def close_simulator_game(self, package_name) -> bool:
         """
         通过ADB命令强制停止指定包名的应用程序
@@ -341,23 +610,93 @@ class ADBController:
                 True: 成功发送关闭命令
                 False: 执行过程中出现异常
         """
-        import subprocess
         try:
             # 发送 ADB 关闭命令
-            cmd = f"adb shell am force-stop {package_name}"
-            subprocess.run(cmd, shell=True, check=True)
+            self.shell(f"am force-stop {package_name}")
+            self.state.invalidate()
             self.logger.info(f"将关闭应用,应用包名: {package_name}")
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
             self.logger.error(f"关闭失败: {str(e)}")
             return False
 
+    def _settle(self, delay: float, wait_stable: bool = None, region: tuple = None):
+        """
+        操作后的等待：稳定模式下画面稳定即返回（最长 delay 秒），否则固定等待 delay 秒
+
+        :param wait_stable: 是否使用稳定模式，默认取 self.wait_stable；未关联截图流时退回固定等待
+        """
+        if wait_stable is None:
+            wait_stable = self.wait_stable
+        if not wait_stable or self.frame_stream is None:
+            time.sleep(delay)
+            return
+        result = self.frame_stream.wait_until_stable(region, max_wait=delay, min_wait=min(0.2, delay))
+        saved = max(0.0, delay - result.elapsed)
+        with self._settle_lock:
+            stats = self._settle_stats
+            stats["calls"] += 1
+            stats["stable"] += int(result.stable)
+            stats["waited"] += result.elapsed
+            stats["saved"] += saved
+        self.logger.debug(
+            f"等待画面稳定 | 结果: {'稳定' if result.stable else '超时'} | 耗时: {result.elapsed:.2f}s | "
+            f"比较帧数: {result.frames} | 节省: {saved:.2f}s"
+        )
+
+    def get_settle_stats(self) -> dict:
+        """
+        稳定等待统计
+
+        :return: {"calls": 次数, "stable": 超时前稳定的次数, "waited": 累计等待秒数, "saved": 相比固定等待累计节省秒数}
+        """
+        with self._settle_lock:
+            stats = dict(self._settle_stats)
+        stats["waited"] = round(stats["waited"], 3)
+        stats["saved"] = round(stats["saved"], 3)
+        return stats
+
+    def click_base(self, base_x: float, base_y: float, **kwargs) -> bool:
+        """
+        按基准分辨率（1920x1080）坐标点击，换算为当前设备坐标后调用 click
+
+        :param kwargs: 传给 click 的其他参数
+        """
+        transform = self.transform
+        if transform is None:
+            self.logger.error("设备分辨率获取失败，无法换算点击坐标")
+            return False
+        return self.click(*transform.point(base_x, base_y), **kwargs)
+
+    def swipe_base(self, base_x1: float, base_y1: float, base_x2: float, base_y2: float, **kwargs) -> bool:
+        """
+        按基准分辨率（1920x1080）坐标滑动，换算为当前设备坐标后调用 swipe
+
+        :param kwargs: 传给 swipe 的其他参数
+        """
+        transform = self.transform
+        if transform is None:
+            self.logger.error("设备分辨率获取失败，无法换算滑动坐标")
+            return False
+        (x1, y1), (x2, y2) = transform.points([(base_x1, base_y1), (base_x2, base_y2)]).tolist()
+        return self.swipe(x1, y1, x2, y2, **kwargs)
+
+    def _swipe_screen(self, base_x1: float, base_y1: float, base_x2: float, base_y2: float) -> bool:
+        """按基准坐标在屏幕坐标系中滑动：只缩放不旋转，桌面等系统界面的手势不随游戏画面旋转"""
+        resolution = self.state.resolution
+        if not resolution:
+            self.logger.error("设备分辨率获取失败，无法换算滑动坐标")
+            return False
+        transform = CoordinateTransform(resolution)
+        (x1, y1), (x2, y2) = transform.points([(base_x1, base_y1), (base_x2, base_y2)]).tolist()
+        return self.swipe(x1, y1, x2, y2)
+
     def swipe_left(self):
         """向左滑动（从右向左滑动手势）"""
-        self.swipe(480, 540, 1440, 540)
+        self._swipe_screen(480, 540, 1440, 540)
         self.logger.debug("执行向左滑动")
 
     def swipe_right(self):
         """向右滑动（从左向右滑动手势）"""
-        self.swipe(1440, 540, 480, 540)
+        self._swipe_screen(1440, 540, 480, 540)
         self.logger.debug("执行向右滑动")
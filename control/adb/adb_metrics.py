@@ -0,0 +1,169 @@
+import bisect
+import threading
+import time
+
+# 直方图桶上界（秒）：0.1ms 起按 1.2 倍递增到约 60s，相对误差不超过 20%
+_BUCKET_BOUNDS = []
+_bound = 0.0001
+while _bound < 60:
+    _BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.2
+_BUCKET_BOUNDS.append(float("inf"))
+
+
+class LatencyHistogram:
+    """固定对数分桶的耗时直方图，内存占用与样本数无关"""
+
+    def __init__(self):
+        self.counts = [0] * len(_BUCKET_BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.spawn_total = 0.0
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, seconds: float, spawn_seconds: float = 0.0, exit_code: int = 0, byte_count: int = 0):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.spawn_total += spawn_seconds
+        self.bytes += byte_count
+        if exit_code != 0:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        """估算第 p 百分位耗时（秒），返回所在桶的上界（不超过观测到的最大值）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(self.count * p / 100)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        """统计摘要（耗时单位为毫秒）"""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "mean_spawn_ms": round(self.spawn_total / self.count * 1000, 2) if self.count else 0.0,
+            "bytes": self.bytes,
+        }
+
+
+class ADBMetrics:
+    """
+    ADB命令耗时统计，线程安全（进程内共享）
+
+    按 设备序列号 × 命令类型 记录墙钟耗时、进程创建耗时、退出码和传输字节数，
+    提供 p50/p95/p99 查询，并按设备定期输出一行统计摘要日志。
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, summary_interval: float = 300):
+        """
+        :param summary_interval: 摘要日志的输出间隔秒数，0 表示不输出
+        """
+        self.summary_interval = summary_interval
+        self._histograms = {}
+        self._last_summary = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "ADBMetrics":
+        """获取进程内共享的统计实例（单例模式）"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def record(self, serial: str, command: str, seconds: float, spawn_seconds: float = 0.0,
+               exit_code: int = 0, byte_count: int = 0, logger=None):
+        """
+        记录一次命令执行
+
+        :param serial: 设备序列号
+        :param command: 命令类型，如 tap、swipe、dump、pull、dumpsys、force-stop
+        :param seconds: 墙钟耗时
+        :param spawn_seconds: 其中创建进程（或重建会话）的耗时
+        :param exit_code: 退出码
+        :param byte_count: 收发的字节数
+        :param logger: 提供时按 summary_interval 定期输出该设备的摘要日志
+        """
+        now = time.monotonic()
+        with self._lock:
+            histogram = self._histograms.setdefault(serial, {}).setdefault(command, LatencyHistogram())
+            histogram.add(seconds, spawn_seconds, exit_code, byte_count)
+            last = self._last_summary.setdefault(serial, now)
+            due = self.summary_interval and now - last >= self.summary_interval
+            if due:
+                self._last_summary[serial] = now
+        if due and logger is not None:
+            logger.info(self.format_summary(serial))
+
+    def percentiles(self, serial: str, command: str) -> dict:
+        """
+        查询单个设备单类命令的统计
+
+        :return: {"count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms", "mean_spawn_ms", "bytes"}，
+                 没有记录时返回空字典
+        """
+        with self._lock:
+            histogram = self._histograms.get(serial, {}).get(command)
+            return histogram.snapshot() if histogram else {}
+
+    def summary(self, serial: str = None) -> dict:
+        """
+        全部统计，结构为 {序列号: {命令类型: 统计}}
+
+        :param serial: 只返回指定设备
+        """
+        with self._lock:
+            return {
+                device: {command: histogram.snapshot() for command, histogram in commands.items()}
+                for device, commands in self._histograms.items()
+                if serial is None or device == serial
+            }
+
+    def format_summary(self, serial: str) -> str:
+        """单个设备的一行摘要"""
+        commands = self.summary(serial).get(serial, {})
+        parts = [
+            f"{command}: n={stats['count']} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+            f"p99={stats['p99_ms']}ms err={stats['errors']}"
+            for command, stats in sorted(commands.items())
+        ]
+        return f"ADB耗时统计 [{serial}] | " + " | ".join(parts)
+
+    def reset(self):
+        """清空全部统计"""
+        with self._lock:
+            self._histograms.clear()
+            self._last_summary.clear()
+
+
+def command_type(command: str) -> str:
+    """根据shell命令推断统计用的命令类型"""
+    words = command.split()
+    if not words:
+        return "shell"
+    if words[0] == "input" and len(words) > 1:
+        return words[1]  # tap / swipe / keyevent
+    if words[0] == "uiautomator":
+        return "dump"
+    if words[0] == "am" and len(words) > 1:
+        return words[1]  # force-stop / start
+    if words[0] in ("dumpsys", "screencap"):
+        return words[0]
+    return "shell"
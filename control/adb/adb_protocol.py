@@ -0,0 +1,266 @@
+import os
+import socket
+import struct
+import threading
+import uuid
+
+from control.adb.adb_shell_session import frame_command, marker_bytes, parse_marker_line, strip_frame_newline
+
+
+class ADBProtocolError(OSError):
+    """adb server 返回 FAIL、连接中断或协议数据不符合预期，与套接字错误一样按 OSError 处理"""
+    pass
+
+
+class ADBProtocolClient:
+    """
+    adb server 套接字协议客户端（默认端口5037），线程安全
+
+    直接通过 `host:transport:<serial>` 切换到设备后请求 `shell,v2,raw:`、`exec:`、`sync:` 等服务，
+    热路径上不再创建 adb 进程。短命令复用按设备缓存的常驻 shell 连接（连接池），
+    每条命令的响应按哨兵行分帧，与 ADBShellSession 的格式一致。
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5037, timeout: float = 10, pool_size: int = 2):
+        """
+        :param host: adb server 地址
+        :param port: adb server 端口
+        :param timeout: 套接字超时秒数
+        :param pool_size: 每个设备最多缓存的空闲shell连接数
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool = {}
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, host: str = "127.0.0.1", port: int = None):
+        """获取adb server客户端实例（单例模式），端口默认取环境变量 ANDROID_ADB_SERVER_PORT 或5037"""
+        if port is None:
+            port = int(os.environ.get("ANDROID_ADB_SERVER_PORT", 5037))
+        key = f"{host}:{port}"
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(host, port)
+            return cls._instances[key]
+
+    # ==================== 基础协议 ====================
+
+    def _create_connection(self, timeout: float = None) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=timeout or self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _read_exact(sock: socket.socket, size: int) -> bytes:
+        """读取固定长度数据，连接提前关闭时抛出异常"""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = sock.recv_into(view[received:], size - received)
+            if not count:
+                raise ADBProtocolError(f"连接已关闭，期望读取{size}字节，实际读取{received}字节")
+            received += count
+        return bytes(buffer)
+
+    def _send_request(self, sock: socket.socket, request: str):
+        """发送一条请求（4位十六进制长度 + 内容）并检查 OKAY/FAIL 状态"""
+        payload = request.encode("utf-8")
+        sock.sendall(b"%04x" % len(payload) + payload)
+        status = self._read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise ADBProtocolError(f"adb server 拒绝请求 [{request}]: {self._read_length_prefixed(sock)}")
+        raise ADBProtocolError(f"adb server 返回未知状态 [{request}]: {status!r}")
+
+    def _read_length_prefixed(self, sock: socket.socket) -> str:
+        length = int(self._read_exact(sock, 4), 16)
+        return self._read_exact(sock, length).decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _read_until_close(sock: socket.socket) -> bytes:
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def host_command(self, request: str) -> str:
+        """
+        执行 host 服务请求，如 host:version、host:connect:127.0.0.1:16384
+
+        :return: 服务器返回的字符串
+        """
+        with self._create_connection() as sock:
+            self._send_request(sock, request)
+            return self._read_length_prefixed(sock)
+
+    def open_service(self, serial: str, service: str, timeout: float = None) -> socket.socket:
+        """
+        打开设备服务连接（先 host:transport:<serial>，再请求 service）
+
+        :return: 已进入服务数据流的套接字，由调用方负责关闭
+        """
+        sock = self._create_connection(timeout)
+        try:
+            self._send_request(sock, f"host:transport:{serial}")
+            self._send_request(sock, service)
+            return sock
+        except Exception:
+            sock.close()
+            raise
+
+    # ==================== 设备服务 ====================
+
+    def shell(self, serial: str, command: str, timeout: float = None) -> tuple[int, bytes]:
+        """
+        执行shell命令，优先复用连接池中的常驻shell连接
+
+        命令未写入连接前失败会换新连接重试一次；写入后连接中断则直接抛出，避免重复执行。
+
+        :return: (退出码, 合并后的stdout/stderr输出)
+        """
+        marker_id = uuid.uuid4().hex
+        payload = frame_command(command, marker_id)
+        for attempt in range(2):
+            conn = self._checkout(serial, timeout)
+            try:
+                conn.send(payload)
+            except OSError:
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            try:
+                result = self._read_framed(conn, marker_bytes(marker_id), command)
+            except Exception:
+                conn.close()
+                raise
+            self._checkin(serial, conn)
+            return result
+
+    def exec_out(self, serial: str, command: str, timeout: float = None) -> bytes:
+        """执行 `exec:` 服务并返回原始二进制输出（不经过pty转换）"""
+        with self.open_service(serial, f"exec:{command}", timeout) as sock:
+            return self._read_until_close(sock)
+
+    def pull_bytes(self, serial: str, remote_path: str, timeout: float = None) -> bytes:
+        """通过 `sync:` 服务的 RECV 请求读取设备文件内容"""
+        with self.open_service(serial, "sync:", timeout) as sock:
+            path = remote_path.encode("utf-8")
+            sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+            chunks = []
+            while True:
+                header = self._read_exact(sock, 8)
+                tag, length = header[:4], struct.unpack("<I", header[4:])[0]
+                if tag == b"DATA":
+                    chunks.append(self._read_exact(sock, length))
+                elif tag == b"DONE":
+                    break
+                elif tag == b"FAIL":
+                    message = self._read_exact(sock, length).decode("utf-8", errors="ignore")
+                    raise ADBProtocolError(f"读取设备文件失败 [{remote_path}]: {message}")
+                else:
+                    raise ADBProtocolError(f"sync 服务返回未知数据块: {tag!r}")
+            sock.sendall(b"QUIT" + struct.pack("<I", 0))
+            return b"".join(chunks)
+
+    def pull(self, serial: str, remote_path: str, local_path: str, timeout: float = None):
+        """将设备文件下载到本地路径"""
+        data = self.pull_bytes(serial, remote_path, timeout)
+        with open(local_path, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        """关闭连接池中的全部连接"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, {}
+        for conns in pool.values():
+            for conn in conns:
+                conn.close()
+
+    # ==================== 连接池 ====================
+
+    def _checkout(self, serial: str, timeout: float = None) -> "_ShellConnection":
+        with self._pool_lock:
+            conns = self._pool.get(serial)
+            conn = conns.pop() if conns else None
+        if conn is None:
+            conn = _ShellConnection(self.open_service(serial, "shell,v2,raw:", timeout))
+        conn.sock.settimeout(timeout or self.timeout)
+        return conn
+
+    def _checkin(self, serial: str, conn: "_ShellConnection"):
+        with self._pool_lock:
+            conns = self._pool.setdefault(serial, [])
+            if len(conns) < self.pool_size:
+                conns.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _read_framed(conn: "_ShellConnection", marker: bytes, command: str) -> tuple[int, bytes]:
+        output = []
+        while True:
+            line = conn.readline()
+            if not line:
+                raise ADBProtocolError(f"shell 连接在执行命令时中断: {command}")
+            parsed = parse_marker_line(line, marker)
+            if parsed is None:
+                output.append(line)
+                continue
+            output.append(parsed[0])
+            return parsed[1], strip_frame_newline(b"".join(output))
+
+
+class _ShellConnection:
+    """
+    连接池中的常驻shell连接
+
+    使用 shell v2 协议的 raw 模式（不分配pty，输入不会被回显），
+    数据按 [id:1字节][长度:4字节小端][内容] 分包：0=stdin，1=stdout，2=stderr，3=退出码。
+    """
+
+    STDIN, STDOUT, STDERR, EXIT = 0, 1, 2, 3
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._buffer = bytearray()
+        self._closed = False
+
+    def send(self, data: bytes):
+        self.sock.sendall(struct.pack("<BI", self.STDIN, len(data)) + data)
+
+    def readline(self) -> bytes:
+        """读取一行stdout/stderr输出，shell退出后返回剩余内容或空字节串"""
+        while True:
+            index = self._buffer.find(b"\n")
+            if index >= 0:
+                line = bytes(self._buffer[:index + 1])
+                del self._buffer[:index + 1]
+                return line
+            if self._closed:
+                line = bytes(self._buffer)
+                self._buffer.clear()
+                return line
+            header = ADBProtocolClient._read_exact(self.sock, 5)
+            packet_id, length = struct.unpack("<BI", header)
+            data = ADBProtocolClient._read_exact(self.sock, length)
+            if packet_id in (self.STDOUT, self.STDERR):
+                self._buffer += data
+            elif packet_id == self.EXIT:
+                self._closed = True
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
@@ -0,0 +1,188 @@
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+
+MARKER_PREFIX = "__GH_END_"
+# 任意命令的哨兵行（回显的命令文本中前缀与ID之间有引号，不会匹配）
+_ANY_MARKER = re.compile(re.escape(MARKER_PREFIX).encode("utf-8") + rb"[0-9a-f]{32}__:")
+
+
+class ADBSessionError(OSError):
+    """常驻shell会话异常（会话已退出或输出流被关闭），与进程/管道错误一样按 OSError 处理"""
+    pass
+
+
+def frame_command(command: str, marker_id: str) -> bytes:
+    """封装命令：合并stderr、保存退出码，并追加哨兵行"""
+    # 哨兵拆成两段拼接，避免终端回显的命令文本被误判为响应结束
+    marker = f'"{MARKER_PREFIX}""{marker_id}__:$__gh_rc"'
+    return f"{{ {command}\n}} 2>&1 </dev/null; __gh_rc=$?; echo; echo {marker}\n".encode("utf-8")
+
+
+def marker_bytes(marker_id: str) -> bytes:
+    """哨兵行中退出码之前的固定部分"""
+    return f"{MARKER_PREFIX}{marker_id}__:".encode("utf-8")
+
+
+def parse_marker_line(line: bytes, marker: bytes) -> tuple[bytes, int] | None:
+    """
+    解析一行输出中的哨兵
+
+    :return: (哨兵前的输出, 退出码)，未包含哨兵时返回None
+    """
+    index = line.find(marker)
+    if index < 0:
+        return None
+    return line[:index], int(line[index + len(marker):].strip() or 1)
+
+
+def is_marker_line(line: bytes) -> bool:
+    """是否包含（任意命令的）哨兵"""
+    return _ANY_MARKER.search(line) is not None
+
+
+def strip_frame_newline(data: bytes) -> bytes:
+    """去掉哨兵前补充的换行，还原命令的原始输出"""
+    if data.endswith(b"\r\n"):
+        return data[:-2]
+    if data.endswith(b"\n"):
+        return data[:-1]
+    return data
+
+
+class ADBShellSession:
+    """
+    常驻 adb shell 会话，线程安全
+
+    启动一个长期存活的 `adb shell` 进程，命令通过已打开的stdin管道写入，
+    每条命令的输出以随机哨兵行结尾，并在哨兵行中携带退出码，从而在同一管道上
+    区分每次请求的响应，省去每次操作都创建 adb 进程的开销。
+    """
+
+    def __init__(self, adb_args: list, logger=None):
+        """
+        :param adb_args: 启动会话的命令，如 ["adb", "-s", "127.0.0.1:16384", "shell"]
+        :param logger: 日志记录器对象
+        """
+        self.adb_args = list(adb_args)
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._process = None
+        self._lines = None
+        # 最近一次 execute 中重建会话进程所花的秒数（会话复用时为0）
+        self.last_spawn_seconds = 0.0
+
+    def is_alive(self) -> bool:
+        """会话进程是否存活"""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        """启动会话进程及其输出读取线程"""
+        self._process = subprocess.Popen(
+            self.adb_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self._lines = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_output,
+            args=(self._process.stdout, self._lines),
+            name=f"adb-shell-reader-{self._process.pid}",
+            daemon=True,
+        )
+        reader.start()
+        if self.logger:
+            self.logger.debug(f"常驻shell会话已启动: {' '.join(self.adb_args)} (pid={self._process.pid})")
+
+    def close(self):
+        """关闭会话进程"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+        try:
+            process.kill()
+            process.wait(timeout=2)
+        except Exception:
+            pass
+
+    def execute(self, command: str, timeout: float = 5) -> tuple[int, bytes]:
+        """
+        在常驻会话中执行一条shell命令
+
+        会话不存在或已退出时自动重建；命令写入失败（尚未送达设备）时重连后重试一次。
+        命令已发出后会话中断则直接抛出异常，避免点击等非幂等操作被重复执行。
+
+        :param command: 设备端shell命令
+        :param timeout: 等待命令完成的超时秒数
+        :return: (退出码, 合并后的stdout/stderr输出)
+        :raises subprocess.TimeoutExpired: 命令执行超时（会话将被关闭，下次调用时重建）
+        :raises ADBSessionError: 命令发出后会话中断
+        """
+        with self._lock:
+            marker_id = uuid.uuid4().hex
+            payload = frame_command(command, marker_id)
+            self.last_spawn_seconds = 0.0
+            for attempt in range(2):
+                if not self.is_alive():
+                    self.close()
+                    started = time.perf_counter()
+                    self.start()
+                    self.last_spawn_seconds += time.perf_counter() - started
+                try:
+                    self._process.stdin.write(payload)
+                    self._process.stdin.flush()
+                    break
+                except OSError as e:
+                    self.close()
+                    if attempt:
+                        raise ADBSessionError(f"向常驻shell会话写入命令失败: {e}") from e
+                    if self.logger:
+                        self.logger.warning(f"常驻shell会话已断开，正在重连: {e}")
+            return self._read_response(command, marker_id, timeout)
+
+    def _read_response(self, command: str, marker_id: str, timeout: float) -> tuple[int, bytes]:
+        """读取输出直到哨兵行出现"""
+        marker = marker_bytes(marker_id)
+        output = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+            if line is None:
+                self.close()
+                raise ADBSessionError(f"常驻shell会话在执行命令时中断: {command}")
+            parsed = parse_marker_line(line, marker)
+            if parsed is None:
+                if is_marker_line(line):
+                    # 之前未读完的命令的哨兵：此前读到的都是那条命令的输出
+                    output.clear()
+                    continue
+                output.append(line)
+                continue
+            output.append(parsed[0])
+            return parsed[1], strip_frame_newline(b"".join(output))
+
+    @staticmethod
+    def _read_output(stream, lines: queue.Queue):
+        """读取线程：逐行读取会话输出，EOF时放入None"""
+        try:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        except Exception:
+            pass
+        finally:
+            lines.put(None)
+
+    def __del__(self):
+        self.close()
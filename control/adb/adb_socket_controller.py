@@ -0,0 +1,107 @@
+import os
+import socket
+import subprocess
+import threading
+from contextlib import contextmanager
+
+from control.adb.adb_controller import ADBController
+from control.adb.adb_metrics import command_type
+from control.adb.adb_protocol import ADBProtocolClient, ADBProtocolError
+
+
+class ADBSocketController(ADBController):
+    """
+    基于 adb server 套接字协议的ADB控制器，线程安全
+
+    与 ADBController 提供相同的方法，但命令直接经由 ADBProtocolClient 发送到 adb server，
+    热路径上不再依赖 adb 可执行文件；多个设备共享同一个客户端及其连接池。
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, port: int, account: str, simulator_type: str, host: str = "127.0.0.1",
+                 client: ADBProtocolClient = None):
+        super().__init__(port, account, simulator_type, host)
+        self.client = client or ADBProtocolClient.get_instance()
+
+    @classmethod
+    def get_instance(cls, port: int, account: str, simulator_type: str, host: str = "127.0.0.1",
+                     client: ADBProtocolClient = None):
+        """获取ADB控制器实例（单例模式）"""
+        key = f"{host}:{port}"
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(port, account, simulator_type, host, client)
+            return cls._instances[key]
+
+    def connect(self, port) -> bool:
+        """通过 host:connect 服务连接到模拟器"""
+        with self._connection_lock:
+            connect_cmd = f"{self.host}:{port}"
+            try:
+                self.logger.info(f"正在尝试连接到模拟器: {connect_cmd}")
+                with self._measure("connect") as sample:
+                    reply = self.client.host_command(f"host:connect:{connect_cmd}")
+                    sample["bytes"] = len(reply)
+                if "connected" in reply.lower() or "already" in reply.lower():
+                    self.logger.info(f"成功连接到模拟器: {connect_cmd}")
+                    return True
+                self.logger.error(f"连接模拟器失败: 命令返回非预期结果\n输出信息: {reply}")
+                return False
+            except OSError as e:
+                self.logger.error(
+                    f"连接模拟器失败: 无法与adb server通信\n"
+                    f"adb server: {self.client.host}:{self.client.port}\n"
+                    f"异常信息: {str(e)}"
+                )
+                return False
+
+    def disconnect(self, port: int) -> bool:
+        """通过 host:disconnect 服务断开模拟器"""
+        try:
+            self.logger.info(f"正在尝试断开模拟器 地址:{self.host} 端口: {self.port}...")
+            with self._measure("disconnect"):
+                self.client.host_command(f"host:disconnect:{self.host}:{port}")
+            return True
+        except Exception as e:
+            self.logger.error(f"断开模拟器失败: {str(e)}")
+            return False
+
+    def shell(self, command: str, timeout: float = 5, check: bool = True, metric: str = None) -> str:
+        """
+        通过连接池中的常驻shell连接执行命令
+
+        超时与退出码异常转换为 subprocess 的同名异常，保持与 ADBController 一致的错误处理；
+        连接中断或 adb server 返回 FAIL（如设备离线）时抛出 ADBProtocolError（OSError 的子类）。
+        """
+        try:
+            with self._command_lock, self._measure(metric or command_type(command)) as sample:
+                exit_code, output = self.client.shell(self.serial, command, timeout=timeout)
+                sample["exit_code"] = exit_code
+                sample["bytes"] = len(output)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(command, timeout)
+        if check and exit_code != 0:
+            raise subprocess.CalledProcessError(exit_code, command, output=output, stderr=output)
+        return output.decode("utf-8", errors="ignore")
+
+    @contextmanager
+    def exec_out(self, command: str, timeout: float = 10):
+        """通过 exec 服务执行命令，返回可 readinto 的原始二进制输出流"""
+        sock = self.client.open_service(self.serial, f"exec:{command}", timeout)
+        stream = sock.makefile("rb", buffering=0)
+        try:
+            yield stream
+        finally:
+            stream.close()
+            sock.close()
+
+    def pull(self, remote_path: str, local_path: str, timeout: float = 30):
+        """通过 sync 服务将设备文件复制到本地"""
+        try:
+            with self._command_lock, self._measure("pull") as sample:
+                self.client.pull(self.serial, remote_path, local_path, timeout=timeout)
+                sample["bytes"] = os.path.getsize(local_path)
+        except ADBProtocolError as e:
+            raise subprocess.CalledProcessError(1, f"sync RECV {remote_path}", stderr=str(e).encode()) from e
@@ -0,0 +1,289 @@
+import asyncio
+import os
+import random
+import re
+import subprocess
+import threading
+import uuid
+
+from control.adb.adb_controller import extract_hierarchy
+from control.adb.adb_shell_session import (frame_command, is_marker_line, marker_bytes, parse_marker_line,
+                                           strip_frame_newline)
+from log.log_factory import get_logger
+
+
+class AsyncADBController:
+    """
+    异步ADB控制器
+
+    提供 connect/click/swipe/布局导出/分辨率查询 等协程版本，等待全部使用 asyncio.sleep，
+    shell命令通过每台设备一个常驻的 asyncio 子进程会话执行，单个事件循环即可驱动多台模拟器：
+
+        controllers = [AsyncADBController.get_instance(port, account, "mumu") for port, account in devices]
+        await asyncio.gather(*(c.click(960, 540) for c in controllers))
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, port: int, account: str, simulator_type: str, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.serial = f"{host}:{port}"
+        self.logger = get_logger(self.__class__.__name__, port, account, simulator_type)
+        self._session_lock = asyncio.Lock()
+        self._process = None
+
+    @classmethod
+    def get_instance(cls, port: int, account: str, simulator_type: str, host: str = "127.0.0.1"):
+        """获取异步ADB控制器实例（单例模式）"""
+        key = f"{host}:{port}"
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(port, account, simulator_type, host)
+            return cls._instances[key]
+
+    async def _run_adb(self, args: list, timeout: float = 10) -> tuple[int, bytes]:
+        """启动一个 adb 子进程并等待其结束，返回 (退出码, 合并后的输出)"""
+        process = await asyncio.create_subprocess_exec(
+            "adb", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise subprocess.TimeoutExpired(["adb", *args], timeout)
+        return process.returncode, output
+
+    async def connect(self, port) -> bool:
+        """连接到模拟器"""
+        connect_cmd = f"{self.host}:{port}"
+        try:
+            self.logger.info(f"正在尝试连接到模拟器: {connect_cmd}")
+            exit_code, output = await self._run_adb(["connect", connect_cmd])
+            stdout = output.decode("utf-8", errors="ignore").strip() or "无输出"
+            if "connected" in stdout.lower() or "already" in stdout.lower():
+                self.logger.info(f"成功连接到模拟器: {connect_cmd}")
+                return True
+            self.logger.error(
+                f"连接模拟器失败: 命令返回非预期结果\n"
+                f"返回码: {exit_code}\n"
+                f"输出信息: {stdout}"
+            )
+            return False
+        except FileNotFoundError:
+            self.logger.error("连接模拟器失败: 未找到ADB工具，请检查ADB是否已安装并配置到环境变量")
+            return False
+        except Exception as e:
+            self.logger.error(f"连接模拟器时发生未知异常: {type(e).__name__}: {str(e)}")
+            return False
+
+    async def disconnect(self, port: int) -> bool:
+        """断开模拟器"""
+        try:
+            self.logger.info(f"正在尝试断开模拟器 地址:{self.host} 端口: {self.port}...")
+            await self.close()
+            await self._run_adb(["disconnect", f"{self.host}:{port}"])
+            return True
+        except Exception as e:
+            self.logger.error(f"断开模拟器失败: {str(e)}")
+            return False
+
+    async def close(self):
+        """关闭常驻shell会话"""
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    async def shell(self, command: str, timeout: float = 5, check: bool = True) -> str:
+        """
+        在常驻shell会话中执行命令（会话不存在或已退出时自动重建）
+
+        :raises subprocess.TimeoutExpired: 超时（会话被关闭，下次调用时重建）
+        :raises subprocess.CalledProcessError: check 为 True 且退出码非0
+        """
+        marker_id = uuid.uuid4().hex
+        marker = marker_bytes(marker_id)
+        async with self._session_lock:
+            if self._process is None or self._process.returncode is not None:
+                self._process = await asyncio.create_subprocess_exec(
+                    "adb", "-s", self.serial, "shell",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+            process = self._process
+            process.stdin.write(frame_command(command, marker_id))
+            try:
+                await process.stdin.drain()
+                exit_code, output = await asyncio.wait_for(self._read_response(process, marker), timeout)
+            except asyncio.TimeoutError:
+                await self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+            except BaseException:
+                # 包括调用方取消（asyncio.CancelledError）：未读完的输出留在管道中会混入下一条命令，关闭会话
+                await self.close()
+                raise
+        if check and exit_code != 0:
+            raise subprocess.CalledProcessError(exit_code, command, output=output, stderr=output)
+        return output.decode("utf-8", errors="ignore")
+
+    @staticmethod
+    async def _read_response(process, marker: bytes) -> tuple[int, bytes]:
+        output = []
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                raise ConnectionError("常驻shell会话在执行命令时中断")
+            parsed = parse_marker_line(line, marker)
+            if parsed is None:
+                if is_marker_line(line):
+                    # 之前未读完的命令的哨兵：此前读到的都是那条命令的输出
+                    output.clear()
+                    continue
+                output.append(line)
+                continue
+            output.append(parsed[0])
+            return parsed[1], strip_frame_newline(b"".join(output))
+
+    async def get_current_display_resolution(self) -> tuple[int, int] | None:
+        """通过 dumpsys 获取当前界面实际分辨率（自动适应旋转）"""
+        try:
+            output = await self.shell("dumpsys window displays")
+            match = re.search(r"cur=(\d+)x(\d+)", output)
+            if not match:
+                raise ValueError("未找到当前分辨率")
+            return int(match[1]), int(match[2])  # (width, height)
+        except Exception as e:
+            self.logger.error(f"获取当前分辨率失败: {str(e)}")
+            return None
+
+    async def dump_window_hierarchy(self) -> bytes | None:
+        """通过 `exec-out uiautomator dump /dev/tty` 获取当前界面的UI布局XML，失败返回None"""
+        try:
+            exit_code, output = await self._run_adb(["-s", self.serial, "exec-out", "uiautomator dump /dev/tty"],
+                                                    timeout=30)
+            xml = extract_hierarchy(output)
+            if xml is None:
+                raise ValueError(f"uiautomator dump 输出中没有布局内容 [状态码:{exit_code}]: {output[-200:]!r}")
+            return xml
+        except subprocess.TimeoutExpired:
+            self.logger.error("获取UI布局超时，建议检查设备连接")
+        except FileNotFoundError:
+            self.logger.error("错误: 未找到 adb 命令，请确认 adb 已安装并添加到环境变量")
+        except Exception as e:
+            self.logger.error(f"获取UI布局失败: {str(e)}")
+        return None
+
+    async def download_window_dump(self, xml_path) -> bool:
+        """下载模拟器的UI布局文件(window_dump.xml)到 xml_path"""
+        self.logger.info(f"正在尝试下载模拟器布局文件...")
+        xml = await self.dump_window_hierarchy()
+        if xml is None:
+            return False
+        xml_dir = os.path.dirname(xml_path)
+        if xml_dir and not os.path.exists(xml_dir):
+            os.makedirs(xml_dir)
+        with open(xml_path, "wb") as f:
+            f.write(xml)
+        self.logger.info(f"下载模拟器布局文件成功: {xml_path}")
+        return True
+
+    async def click(
+            self,
+            base_x: float,
+            base_y: float,
+            max_offset: int = 10,
+            min_delay: float = 0.1,
+            max_delay: float = 0.5,
+            before_sleep: bool = False,
+            after_sleep: bool = True,
+            before_sleep_delay: int = 2,
+            after_sleep_delay: int = 2,
+    ) -> bool:
+        """模拟点击（参数同 ADBController.click，等待期间不占用线程）"""
+        try:
+            if before_sleep:
+                await asyncio.sleep(before_sleep_delay)
+            delay_seconds = random.uniform(min_delay, max_delay)
+            await asyncio.sleep(delay_seconds)
+
+            actual_x = base_x + random.randint(-max_offset, max_offset)
+            actual_y = base_y + random.randint(-max_offset, max_offset)
+            await self.shell(f"input tap {actual_x} {actual_y}")
+
+            self.logger.debug(
+                "点击操作成功 | "
+                f"延迟: {delay_seconds:.2f}s | "
+                f"基准坐标: {base_x},{base_y} | "
+                f"最终坐标: {actual_x},{actual_y}"
+            )
+            if after_sleep:
+                await asyncio.sleep(after_sleep_delay)
+            return True
+        except subprocess.TimeoutExpired:
+            self.logger.error("ADB命令执行超时，建议检查设备连接")
+        except subprocess.CalledProcessError as e:
+            self.logger.error(
+                f"ADB命令执行失败 [状态码:{e.returncode}]\n"
+                f"错误输出: {e.stderr.decode().strip()}"
+            )
+        except Exception as e:
+            self.logger.error(f"点击发生异常: {str(e)}")
+        return False
+
+    async def swipe(
+            self,
+            base_x1: int,
+            base_y1: int,
+            base_x2: int,
+            base_y2: int,
+            duration: int = 900,
+            max_offset: int = 5,
+            min_delay: float = 0.1,
+            max_delay: float = 0.5
+    ) -> bool:
+        """模拟滑动（参数同 ADBController.swipe，等待期间不占用线程）"""
+        try:
+            delay_seconds = random.uniform(min_delay, max_delay)
+            await asyncio.sleep(delay_seconds)
+
+            actual_x1 = base_x1 + random.randint(-max_offset, max_offset)
+            actual_y1 = base_y1 + random.randint(-max_offset, max_offset)
+            actual_x2 = base_x2 + random.randint(-max_offset, max_offset)
+            actual_y2 = base_y2 + random.randint(-max_offset, max_offset)
+            await self.shell(f"input swipe {actual_x1} {actual_y1} {actual_x2} {actual_y2} {duration}",
+                             timeout=5 + duration / 1000)
+
+            self.logger.debug(
+                "滑动操作成功 | "
+                f"延迟: {delay_seconds:.2f}s | "
+                f"基准坐标: ({base_x1},{base_y1})→({base_x2},{base_y2}) | "
+                f"最终坐标: ({actual_x1},{actual_y1})→({actual_x2},{actual_y2}) | "
+                f"持续时间: {duration}ms"
+            )
+            return True
+        except subprocess.TimeoutExpired:
+            self.logger.error("ADB命令执行超时，建议检查设备连接")
+        except subprocess.CalledProcessError as e:
+            self.logger.error(
+                f"ADB命令执行失败 [状态码:{e.returncode}]\n"
+                f"错误输出: {e.stderr.decode().strip()}"
+            )
+        except Exception as e:
+            self.logger.error(f"发生未预期的异常 {e}")
+        return False
+
+    async def close_simulator_game(self, package_name) -> bool:
+        """强制停止指定包名的应用程序"""
+        try:
+            await self.shell(f"am force-stop {package_name}")
+            self.logger.info(f"将关闭应用,应用包名: {package_name}")
+            return True
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            self.logger.error(f"关闭失败: {str(e)}")
+            return False
@@ -0,0 +1,94 @@
+import numpy as np
+
+# 脚本中的坐标、ROI和模板均以此分辨率（横屏）为基准编写
+BASE_RESOLUTION = (1920, 1080)
+
+
+class CoordinateTransform:
+    """
+    基准坐标（BASE_RESOLUTION）与设备坐标之间的变换
+
+    缩放与旋转在构建时一次算好（2x3 仿射矩阵），之后每次换算只是一次乘加：
+        默认只按宽、高分别缩放（输入坐标与屏幕方向一致，桌面等系统界面始终如此）
+        rotation 非0：先旋转再缩放，用于游戏画面相对屏幕旋转显示的情况；旋转次数由调用方
+        根据 DeviceState.rotation 或游戏设置给出，不从宽高比推断（竖屏设备上的横屏手势不能被旋转）
+
+        transform = adb.transform
+        adb.click(*transform.point(960, 540))
+        roi = transform.rect((1600, 0, 1920, 200))
+    """
+
+    def __init__(self, resolution: tuple[int, int], base_resolution: tuple[int, int] = BASE_RESOLUTION,
+                 rotation: int = None):
+        """
+        :param resolution: 设备当前分辨率 (宽, 高)
+        :param base_resolution: 基准分辨率 (宽, 高)
+        :param rotation: 基准坐标到设备坐标需顺时针旋转的90°次数（0~3）
+        """
+        self.resolution = tuple(resolution)
+        self.base_resolution = tuple(base_resolution)
+        width, height = self.resolution
+        base_width, base_height = self.base_resolution
+        self.rotation = (rotation or 0) % 4
+        # 旋转后的基准画面尺寸
+        rotated_width, rotated_height = (base_height, base_width) if self.rotation % 2 else (base_width, base_height)
+        self.scale_x = width / rotated_width
+        self.scale_y = height / rotated_height
+        # 模板等比缩放比例：非等比屏幕按较小的一边缩放，避免模板大于实际元素
+        self.template_scale = min(self.scale_x, self.scale_y)
+        self.identity = self.rotation == 0 and self.resolution == self.base_resolution
+
+        # 基准坐标 → 旋转后的基准坐标
+        rotations = {
+            0: ((1, 0, 0), (0, 1, 0)),
+            1: ((0, -1, base_height), (1, 0, 0)),
+            2: ((-1, 0, base_width), (0, -1, base_height)),
+            3: ((0, 1, 0), (-1, 0, base_width)),
+        }
+        rotate = np.array(rotations[self.rotation] + ((0, 0, 1),), dtype=np.float64)
+        scale = np.diag([self.scale_x, self.scale_y, 1.0])
+        self.matrix = (scale @ rotate)[:2]
+        self.inverse_matrix = np.linalg.inv(np.vstack([self.matrix, (0, 0, 1)]))[:2]
+        # 标量换算直接使用 Python 浮点数，避免单点调用 numpy 的开销
+        (self._a, self._b, self._c), (self._d, self._e, self._f) = self.matrix.tolist()
+        (self._ia, self._ib, self._ic), (self._id, self._ie, self._if) = self.inverse_matrix.tolist()
+
+    def point(self, x: float, y: float) -> tuple[int, int]:
+        """基准坐标 → 设备坐标"""
+        return (round(self._a * x + self._b * y + self._c),
+                round(self._d * x + self._e * y + self._f))
+
+    def inverse_point(self, x: float, y: float) -> tuple[int, int]:
+        """设备坐标 → 基准坐标"""
+        return (round(self._ia * x + self._ib * y + self._ic),
+                round(self._id * x + self._ie * y + self._if))
+
+    def points(self, points) -> np.ndarray:
+        """批量换算，points 为形状 (N, 2) 的基准坐标，返回 int 数组"""
+        points = np.asarray(points, dtype=np.float64)
+        return np.rint(points @ self.matrix[:, :2].T + self.matrix[:, 2]).astype(np.intp)
+
+    def rect(self, rect: tuple) -> tuple[int, int, int, int]:
+        """基准区域 (left, top, right, bottom) → 设备区域（旋转后重新取左上、右下角）"""
+        left, top, right, bottom = rect
+        x1, y1 = self.point(left, top)
+        x2, y2 = self.point(right, bottom)
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+    def size(self, width: float, height: float) -> tuple[int, int]:
+        """基准尺寸（如模板宽高）→ 设备上的尺寸（旋转后宽高互换）"""
+        if self.rotation % 2:
+            width, height = height, width
+        return max(1, round(width * self.template_scale)), max(1, round(height * self.template_scale))
+
+    def __eq__(self, other):
+        return (isinstance(other, CoordinateTransform) and self.resolution == other.resolution
+                and self.base_resolution == other.base_resolution and self.rotation == other.rotation)
+
+    def __hash__(self):
+        return hash((self.resolution, self.base_resolution, self.rotation))
+
+    def __repr__(self):
+        return (f"CoordinateTransform({self.base_resolution[0]}x{self.base_resolution[1]} → "
+                f"{self.resolution[0]}x{self.resolution[1]}, rotation={self.rotation * 90}°, "
+                f"scale=({self.scale_x:.3f}, {self.scale_y:.3f}))")
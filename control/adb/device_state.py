@@ -0,0 +1,201 @@
+import re
+import threading
+import time
+from typing import NamedTuple
+
+# 一次shell往返获取全部状态：只在设备端过滤出需要的行，避免传输完整的 dumpsys 输出
+PROBE_COMMAND = (
+    "dumpsys window displays | grep -E 'cur=[0-9]+x[0-9]+|mRotation=|mCurrentRotation='; "
+    "dumpsys window windows | grep -E 'mCurrentFocus='; "
+    "dumpsys power | grep -E 'mWakefulness=|Display Power: state='; "
+    "dumpsys input | grep -m 1 'SurfaceOrientation'; "
+    "true"
+)
+
+_RESOLUTION_PATTERN = re.compile(r"cur=(\d+)x(\d+)")
+_ROTATION_PATTERNS = (
+    re.compile(r"SurfaceOrientation: (\d)"),
+    re.compile(r"mCurrentRotation=(?:ROTATION_)?(\d+)"),
+    re.compile(r"mRotation=(?:ROTATION_)?(\d+)"),
+)
+# mCurrentFocus=Window{1a2b3c u0 com.example/com.example.MainActivity}
+_FOCUS_PATTERN = re.compile(r"mCurrentFocus=Window\{\S+ \S+ ([^\s/}]+)(?:/([^\s}]+))?\}")
+_WAKEFULNESS_PATTERN = re.compile(r"mWakefulness=(\w+)")
+_DISPLAY_POWER_PATTERN = re.compile(r"Display Power: state=(\w+)")
+
+
+class DeviceInfo(NamedTuple):
+    """一次探测得到的设备状态"""
+    width: int  # 当前界面宽度（已随旋转变化）
+    height: int  # 当前界面高度
+    rotation: int | None  # 屏幕旋转 0/1/2/3（对应 0°/90°/180°/270°），未知为None
+    focused_package: str | None  # 前台窗口所属包名，锁屏等情况为None
+    focused_activity: str | None  # 前台窗口的Activity（或窗口标题）
+    screen_on: bool | None  # 屏幕是否点亮，未知为None
+    timestamp: float  # 探测完成时间（time.monotonic）
+
+    @property
+    def resolution(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def age(self) -> float:
+        """距探测完成经过的秒数"""
+        return time.monotonic() - self.timestamp
+
+
+def parse_probe_output(output: str) -> DeviceInfo:
+    """
+    解析 PROBE_COMMAND 的输出
+
+    :raises ValueError: 输出中没有当前分辨率
+    """
+    match = _RESOLUTION_PATTERN.search(output)
+    if not match:
+        raise ValueError("未找到当前分辨率")
+    width, height = int(match[1]), int(match[2])
+
+    rotation = None
+    for pattern in _ROTATION_PATTERNS:
+        rotation_match = pattern.search(output)
+        if rotation_match:
+            value = int(rotation_match[1])
+            # 新版本输出角度（ROTATION_90），旧版本和 SurfaceOrientation 输出序号（1）
+            rotation = (value // 90 if value >= 90 else value) % 4
+            break
+
+    package = activity = None
+    focus_match = _FOCUS_PATTERN.search(output)
+    if focus_match:
+        package = focus_match[1]
+        activity = focus_match[2]
+        if activity and activity.startswith("."):
+            activity = package + activity
+
+    screen_on = None
+    wakefulness_match = _WAKEFULNESS_PATTERN.search(output)
+    if wakefulness_match:
+        screen_on = wakefulness_match[1] == "Awake"
+    else:
+        power_match = _DISPLAY_POWER_PATTERN.search(output)
+        if power_match:
+            screen_on = power_match[1] == "ON"
+
+    return DeviceInfo(width, height, rotation, package, activity, screen_on, time.monotonic())
+
+
+class DeviceState:
+    """
+    设备状态探测与缓存，线程安全（每个设备一个实例，由 ADBController 持有）
+
+    分辨率、旋转、前台Activity、亮屏状态在一次shell往返中获取并缓存 ttl 秒；
+    点击、滑动、强制停止等可能切换界面的操作会使缓存失效。
+    每次重新探测后若旋转、分辨率或前台窗口发生变化，会通知已注册的监听器。
+    """
+
+    def __init__(self, adb, ttl: float = 5.0, logger=None):
+        """
+        :param adb: ADBController 实例
+        :param ttl: 缓存有效秒数
+        :param logger: 日志记录器对象
+        """
+        self.adb = adb
+        self.ttl = ttl
+        self.logger = logger
+        self._info = None
+        self._valid = False
+        # 每次 invalidate 加1，供其他缓存判断期间是否发生过可能切换界面的操作
+        self.generation = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """
+        注册状态变化监听器
+
+        :param callback: callback(old: DeviceInfo | None, new: DeviceInfo)，在探测线程中调用
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """移除状态变化监听器"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def invalidate(self):
+        """使缓存失效，下次读取时重新探测"""
+        self._valid = False
+        self.generation += 1
+
+    def get(self, max_age: float = None) -> DeviceInfo | None:
+        """
+        获取设备状态，缓存未失效且未超过 max_age 时不访问设备
+
+        :param max_age: 可接受的最大缓存秒数，默认为 ttl
+        :return: 设备状态，探测失败返回None
+        """
+        max_age = self.ttl if max_age is None else max_age
+        info = self._info
+        if self._valid and info is not None and info.age() <= max_age:
+            return info
+        return self.refresh()
+
+    def refresh(self) -> DeviceInfo | None:
+        """立即重新探测设备状态"""
+        try:
+            # 先清除失效标记：探测期间发生的操作会再次将其置为失效
+            self._valid = True
+            info = parse_probe_output(self.adb.shell(PROBE_COMMAND, check=False, metric="device-state"))
+        except Exception as e:
+            self._valid = False
+            if self.logger:
+                self.logger.error(f"获取设备状态失败: {str(e)}")
+            return None
+        with self._lock:
+            old, self._info = self._info, info
+            listeners = list(self._listeners)
+        if old is None or self._changed(old, info):
+            if self.logger:
+                self.logger.debug(
+                    f"设备状态变化 | 分辨率: {info.width}x{info.height} | 旋转: {info.rotation} | "
+                    f"前台: {info.focused_package}/{info.focused_activity} | 亮屏: {info.screen_on}"
+                )
+            for callback in listeners:
+                try:
+                    callback(old, info)
+                except Exception as e:
+                    if self.logger:
+                        self.logger.error(f"设备状态监听器执行异常: {str(e)}")
+        return info
+
+    @staticmethod
+    def _changed(old: DeviceInfo, new: DeviceInfo) -> bool:
+        return (old.resolution != new.resolution or old.rotation != new.rotation
+                or old.focused_package != new.focused_package or old.focused_activity != new.focused_activity
+                or old.screen_on != new.screen_on)
+
+    @property
+    def resolution(self) -> tuple[int, int] | None:
+        info = self.get()
+        return info.resolution if info else None
+
+    @property
+    def rotation(self) -> int | None:
+        info = self.get()
+        return info.rotation if info else None
+
+    @property
+    def focused_package(self) -> str | None:
+        info = self.get()
+        return info.focused_package if info else None
+
+    @property
+    def focused_activity(self) -> str | None:
+        info = self.get()
+        return info.focused_activity if info else None
+
+    @property
+    def screen_on(self) -> bool | None:
+        info = self.get()
+        return info.screen_on if info else None
@@ -0,0 +1,132 @@
+import random
+
+STEP_MARKER = "__GH_STEP_"
+
+
+class InputBatch:
+    """
+    输入宏：将多步点击、滑动、按键和等待编译为一个设备端shell脚本
+
+    随机偏移与随机延迟在编译时生成并写入脚本，等待由设备端 sleep 完成，
+    整个序列只需一次往返；每步结束后输出 /proc/uptime 作为时间戳（精度10ms），
+    用于计算每步的设备端耗时。
+
+    用法：
+        batch = InputBatch().tap(960, 540).sleep(300).tap(1200, 800).swipe(480, 540, 1440, 540)
+        results = adb.run_batch(batch)
+    """
+
+    def __init__(self, max_offset: int = 10, seed: int = None):
+        """
+        :param max_offset: 点击/滑动默认的最大随机偏移量（像素）
+        :param seed: 随机数种子，便于复现同一组偏移
+        """
+        self.max_offset = max_offset
+        self._random = random.Random(seed)
+        self._steps = []
+
+    def __len__(self):
+        return len(self._steps)
+
+    def tap(self, x: float, y: float, max_offset: int = None, min_delay: float = 0, max_delay: float = 0):
+        """
+        点击
+
+        :param max_offset: 最大随机偏移量，默认使用批次的 max_offset
+        :param min_delay: 点击前最小随机延迟秒数
+        :param max_delay: 点击前最大随机延迟秒数
+        """
+        x, y = self._jitter(x, y, max_offset)
+        self._add("tap", f"input tap {x} {y}", self._delay(min_delay, max_delay), (x, y))
+        return self
+
+    def swipe(self, x1: float, y1: float, x2: float, y2: float, duration: int = 900, max_offset: int = None,
+              min_delay: float = 0, max_delay: float = 0):
+        """
+        滑动
+
+        :param duration: 滑动持续时间（毫秒）
+        :param max_offset: 最大随机偏移量，默认使用批次的 max_offset
+        :param min_delay: 滑动前最小随机延迟秒数
+        :param max_delay: 滑动前最大随机延迟秒数
+        """
+        x1, y1 = self._jitter(x1, y1, max_offset)
+        x2, y2 = self._jitter(x2, y2, max_offset)
+        self._add("swipe", f"input swipe {x1} {y1} {x2} {y2} {duration}", self._delay(min_delay, max_delay),
+                  (x1, y1, x2, y2, duration), duration / 1000)
+        return self
+
+    def keyevent(self, keycode):
+        """发送按键事件，如 KEYCODE_BACK 或 4"""
+        self._add("keyevent", f"input keyevent {keycode}", 0, (keycode,))
+        return self
+
+    def sleep(self, ms: float, jitter_ms: float = 0):
+        """
+        设备端等待
+
+        :param ms: 等待毫秒数
+        :param jitter_ms: 额外的随机等待上限（毫秒）
+        """
+        seconds = (ms + self._random.uniform(0, jitter_ms)) / 1000
+        self._add("sleep", f"sleep {seconds:.3f}", 0, (round(seconds * 1000),), seconds)
+        return self
+
+    def estimated_seconds(self) -> float:
+        """批次在设备端的预计耗时（不含 input 命令本身的启动时间）"""
+        return sum(step["delay"] + step["duration"] for step in self._steps)
+
+    def compile(self) -> str:
+        """编译为设备端shell脚本"""
+        lines = [f'echo "{STEP_MARKER}start:0 $(cat /proc/uptime)"']
+        for index, step in enumerate(self._steps):
+            if step["delay"]:
+                lines.append(f"sleep {step['delay']:.3f}")
+            lines.append(step["command"])
+            lines.append(f'echo "{STEP_MARKER}{index}:$? $(cat /proc/uptime)"')
+        return "\n".join(lines)
+
+    def parse_results(self, output: str) -> list:
+        """
+        解析脚本输出中的每步时间戳
+
+        :return: 每步一个字典 {"index", "action", "args", "exit_code", "delay_ms", "elapsed_ms"}，
+                 elapsed_ms 为该步（含随机延迟）在设备端的耗时；输出中缺失的步骤不包含在结果中
+        """
+        stamps = {}
+        for line in output.splitlines():
+            if not line.startswith(STEP_MARKER):
+                continue
+            key, _, rest = line[len(STEP_MARKER):].partition(":")
+            fields = rest.split()
+            if len(fields) >= 2:
+                stamps[key] = (int(fields[0]), float(fields[1]))
+        results = []
+        previous = stamps.get("start")
+        for index, step in enumerate(self._steps):
+            stamp = stamps.get(str(index))
+            if stamp is None or previous is None:
+                break
+            results.append({
+                "index": index,
+                "action": step["action"],
+                "args": step["args"],
+                "exit_code": stamp[0],
+                "delay_ms": round(step["delay"] * 1000),
+                "elapsed_ms": round((stamp[1] - previous[1]) * 1000),
+            })
+            previous = stamp
+        return results
+
+    def _add(self, action: str, command: str, delay: float, args: tuple, duration: float = 0):
+        self._steps.append({"action": action, "command": command, "delay": delay, "args": args,
+                            "duration": duration})
+
+    def _jitter(self, x: float, y: float, max_offset: int = None) -> tuple:
+        offset = self.max_offset if max_offset is None else max_offset
+        # 偏移后的坐标不能越过屏幕左上边界
+        return (max(0, x + self._random.randint(-offset, offset)),
+                max(0, y + self._random.randint(-offset, offset)))
+
+    def _delay(self, min_delay: float, max_delay: float) -> float:
+        return self._random.uniform(min_delay, max_delay) if max_delay > 0 else 0
@@ -0,0 +1,267 @@
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+from control.adb.adb_controller import ADBController
+from log.log_factory import get_logger
+
+
+class Frame(NamedTuple):
+    """一帧截图"""
+    seq: int  # 帧序号，从1开始递增
+    timestamp: float  # 截图完成时间（time.monotonic）
+    image: np.ndarray  # 只读的 (高, 宽, 4) RGBA 数组
+    generation: int = 0  # 截图开始时设备状态的 generation，之后发生过点击/滑动等操作时该帧已过期
+
+    def age_ms(self) -> float:
+        """距截图完成经过的毫秒数"""
+        return (time.monotonic() - self.timestamp) * 1000
+
+
+class StableResult(NamedTuple):
+    """wait_until_stable 的结果"""
+    stable: bool  # 是否在超时前稳定
+    elapsed: float  # 实际等待秒数
+    frames: int  # 期间比较的帧数
+    frame: Frame | None  # 最后一帧（稳定时即为稳定后的画面）
+
+
+def frame_difference(previous: np.ndarray, current: np.ndarray, region: tuple = None, step: int = 4,
+                     pixel_threshold: int = 24) -> float:
+    """
+    两帧之间发生变化的像素比例（每隔 step 个像素采样，任一通道差值超过 pixel_threshold 视为变化）
+
+    :param region: 只比较该区域 (left, top, right, bottom)
+    :return: 0~1，尺寸不同（如旋转）时返回1
+    """
+    if previous.shape != current.shape:
+        return 1.0
+    if region is not None:
+        left, top, right, bottom = region
+        previous = previous[top:bottom, left:right]
+        current = current[top:bottom, left:right]
+    a = previous[::step, ::step, :3].astype(np.int16)
+    b = current[::step, ::step, :3].astype(np.int16)
+    if not a.size:
+        return 0.0
+    return float((np.abs(a - b).max(axis=2) > pixel_threshold).mean())
+
+
+class FrameStream:
+    """
+    单设备截图流，线程安全（每个设备一个实例）
+
+    后台线程持续截图并保存在环形缓冲区中，同一时刻的多个检测（插件、OCR、启动器查找等）
+    共享同一帧；未启动后台线程时按需截图。并发的截图请求会合并为一次截图，不会重复截图。
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, port: int, account: str, simulator_type: str, capacity: int = 4,
+                 interval: float = 0.05, idle_timeout: float = 10):
+        """
+        :param capacity: 环形缓冲区保留的帧数
+        :param interval: 后台截图间隔秒数
+        :param idle_timeout: 超过该秒数没有读取帧时后台线程暂停截图，直到再次有读取请求
+        """
+        self.port = port
+        self.adb = ADBController.get_instance(port, account, simulator_type)
+        self.logger = get_logger(self.__class__.__name__, port, account, simulator_type)
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._frames = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._capturing = False
+        self._last_access = time.monotonic()
+        self._running = False
+        self._thread = None
+        self._users = 0
+        # 供 ADBController 在点击/滑动后等待画面稳定
+        self.adb.frame_stream = self
+
+    @classmethod
+    def get_instance(cls, port: int, account: str, simulator_type: str):
+        """获取截图流实例（单例模式，按设备区分）"""
+        key = f"{port}"
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(port, account, simulator_type)
+            return cls._instances[key]
+
+    def acquire(self):
+        """登记一个使用者（每个 SimulatorInstance 一个），与 release 成对调用"""
+        with self._cond:
+            self._users += 1
+
+    def release(self):
+        """注销一个使用者，最后一个使用者注销时停止后台截图线程"""
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            last = self._users == 0
+        if last:
+            self.stop()
+
+    def start(self):
+        """启动后台截图线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._last_access = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"frame-stream-{self.port}", daemon=True)
+        self._thread.start()
+        self.logger.info("后台截图线程已启动")
+
+    def stop(self):
+        """停止后台截图线程"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.logger.info("后台截图线程已停止")
+
+    def is_running(self) -> bool:
+        """后台截图线程是否运行中"""
+        return self._running
+
+    def latest_frame(self, max_age_ms: float = None) -> Frame | None:
+        """
+        获取最新一帧
+
+        :param max_age_ms: 可接受的最大帧龄（毫秒），None表示不限；最新帧过旧或截图后发生过点击/滑动时立即截图
+        :return: 帧，截图失败返回None
+        """
+        with self._cond:
+            self._last_access = time.monotonic()
+            self._cond.notify_all()
+            if self._frames:
+                frame = self._frames[-1]
+                if max_age_ms is None or (frame.age_ms() <= max_age_ms
+                                          and frame.generation == self.adb.state.generation):
+                    return frame
+        return self.capture()
+
+    def wait_for_new_frame(self, after_seq: int = None, timeout: float = 5) -> Frame | None:
+        """
+        等待一帧在调用之后（或指定帧序号之后）产生的新帧
+
+        后台线程未运行时直接截图。
+        :param after_seq: 帧序号，默认为当前最新帧序号
+        :param timeout: 超时秒数
+        :return: 新帧，超时返回None
+        """
+        with self._cond:
+            self._last_access = time.monotonic()
+            self._cond.notify_all()
+            if after_seq is None:
+                after_seq = self._seq
+            if self._running:
+                if self._cond.wait_for(lambda: self._seq > after_seq or not self._running, timeout):
+                    if self._seq > after_seq:
+                        return self._frames[-1]
+                    # 等待期间后台线程被停止，转为直接截图
+                else:
+                    return None
+        frame = self.capture()
+        return frame if frame is not None and frame.seq > after_seq else None
+
+    def wait_until_stable(self, region: tuple = None, max_wait: float = 3.0, stable_frames: int = 2,
+                          tolerance: float = 0.005, min_wait: float = 0.0) -> StableResult:
+        """
+        等待画面停止变化（用于替代操作后的固定等待）
+
+        从调用之后产生的新帧开始，连续 stable_frames 次相邻帧的变化比例不超过 tolerance 即视为稳定。
+        界面存在持续动画时会等到 max_wait 超时。
+
+        :param region: 只观察该区域 (left, top, right, bottom)，默认全屏
+        :param max_wait: 最长等待秒数
+        :param stable_frames: 需要连续稳定的帧间比较次数
+        :param tolerance: 可忽略的变化像素比例
+        :param min_wait: 最短等待秒数，避免界面尚未开始响应时就判定为稳定
+        :return: 等待结果
+        """
+        started = time.monotonic()
+        deadline = started + max_wait
+        previous = self.wait_for_new_frame(timeout=max_wait)
+        frames = 0
+        streak = 0
+        while previous is not None:
+            now = time.monotonic()
+            if streak >= stable_frames and now - started >= min_wait:
+                return StableResult(True, now - started, frames, previous)
+            if now >= deadline:
+                break
+            current = self.wait_for_new_frame(previous.seq, timeout=deadline - now)
+            if current is None:
+                break
+            frames += 1
+            if frame_difference(previous.image, current.image, region) <= tolerance:
+                streak += 1
+            else:
+                streak = 0
+            previous = current
+        return StableResult(False, time.monotonic() - started, frames, previous)
+
+    def recent_frames(self) -> list:
+        """环形缓冲区中的全部帧（从旧到新）"""
+        with self._cond:
+            return list(self._frames)
+
+    def capture(self) -> Frame | None:
+        """
+        立即截图并放入缓冲区
+
+        已有截图正在进行时等待其完成并共享结果，不会发起重复截图。
+        :return: 帧，截图失败返回None
+        """
+        with self._cond:
+            if self._capturing:
+                seq = self._seq
+                self._cond.wait_for(lambda: not self._capturing)
+                return self._frames[-1] if self._seq > seq else None
+            self._capturing = True
+        image = None
+        # 截图开始前读取，截图期间发生的操作也会使该帧过期
+        generation = self.adb.state.generation
+        try:
+            # 截图缓冲区会被下一次截图覆盖，缓冲区中的帧需要独立副本
+            image = self.adb.screencap().copy()
+            image.flags.writeable = False
+        except Exception as e:
+            self.logger.error(f"截图失败: {str(e)}")
+        finally:
+            with self._cond:
+                self._capturing = False
+                frame = None
+                if image is not None:
+                    self._seq += 1
+                    frame = Frame(self._seq, time.monotonic(), image, generation)
+                    self._frames.append(frame)
+                self._cond.notify_all()
+        return frame
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # 长时间无人读取时暂停截图，避免空转
+                while self._running and time.monotonic() - self._last_access > self.idle_timeout:
+                    self._cond.wait()
+                if not self._running:
+                    return
+            started = time.monotonic()
+            if self.capture() is None:
+                # 截图失败时放慢重试节奏
+                time.sleep(1)
+            remaining = self.interval - (time.monotonic() - started)
+            if remaining > 0:
+                with self._cond:
+                    self._cond.wait_for(lambda: not self._running, remaining)
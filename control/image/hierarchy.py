@@ -0,0 +1,286 @@
+import re
+import time
+import xml.etree.ElementTree as ET
+
+_BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+def parse_bounds(bounds: str | None) -> tuple[int, int, int, int] | None:
+    """解析 "[left,top][right,bottom]" 格式的 bounds，格式不符时返回None"""
+    if not bounds:
+        return None
+    match = _BOUNDS_PATTERN.fullmatch(bounds)
+    if not match:
+        return None
+    return int(match[1]), int(match[2]), int(match[3]), int(match[4])
+
+
+class HierarchyNode:
+    """UI布局中的一个节点（bounds 与中心点在构建时解析为整数）"""
+
+    __slots__ = ("attrib", "bounds", "center", "parent", "children", "depth")
+
+    def __init__(self, attrib: dict, parent: "HierarchyNode" = None):
+        self.attrib = attrib
+        self.bounds = parse_bounds(attrib.get("bounds"))
+        self.center = None
+        if self.bounds:
+            left, top, right, bottom = self.bounds
+            self.center = ((left + right) // 2, (top + bottom) // 2)
+        self.parent = parent
+        self.children = []
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    def get(self, name: str, default=None):
+        """读取节点属性"""
+        return self.attrib.get(name, default)
+
+    @property
+    def text(self) -> str:
+        return self.attrib.get("text", "")
+
+    @property
+    def resource_id(self) -> str:
+        return self.attrib.get("resource-id", "")
+
+    @property
+    def class_name(self) -> str:
+        return self.attrib.get("class", "")
+
+    @property
+    def content_desc(self) -> str:
+        return self.attrib.get("content-desc", "")
+
+    def __repr__(self):
+        return (f"HierarchyNode(class={self.class_name!r}, text={self.text!r}, "
+                f"resource-id={self.resource_id!r}, bounds={self.bounds})")
+
+
+class Selector:
+    """
+    节点选择器：属性名 + 值 + 匹配方式
+
+    :param by: 属性名，如 text、resource-id、class、content-desc
+    :param value: 期望的属性值；match 为 regex 时为正则表达式
+    :param match: exact（完全相等）、contains（包含）或 regex（re.search 命中）
+    """
+
+    __slots__ = ("by", "value", "match", "_pattern")
+
+    MATCH_TYPES = ("exact", "contains", "regex")
+
+    def __init__(self, by: str, value: str, match: str = "exact"):
+        if match not in self.MATCH_TYPES:
+            raise ValueError(f"不支持的匹配方式: {match}，可选 {self.MATCH_TYPES}")
+        self.by = by
+        self.value = value
+        self.match = match
+        self._pattern = re.compile(value) if match == "regex" else None
+
+    @classmethod
+    def coerce(cls, spec) -> "Selector":
+        """将 Selector、(属性名, 值) 或 (属性名, 值, 匹配方式) 转换为 Selector"""
+        if isinstance(spec, Selector):
+            return spec
+        if isinstance(spec, (tuple, list)) and len(spec) in (2, 3):
+            return cls(*spec)
+        raise TypeError(f"无效的选择器: {spec!r}")
+
+    def matches_value(self, actual: str | None) -> bool:
+        """判断属性值是否匹配"""
+        if not actual:
+            return False
+        if self.match == "exact":
+            return actual == self.value
+        if self.match == "contains":
+            return self.value in actual
+        return self._pattern.search(actual) is not None
+
+    def __repr__(self):
+        return f"Selector({self.by!r}, {self.value!r}, {self.match!r})"
+
+
+class HierarchySnapshot:
+    """
+    一次 uiautomator dump 的索引快照
+
+    构建时遍历一次布局树，按 text、resource-id、class、content-desc 建立哈希索引，
+    之后同一界面的多次查询均不再访问设备，也不再遍历整棵树：
+
+        snapshot = image.get_hierarchy_snapshot()
+        close = snapshot.get_center("com.mumu.launcher:id/close", "resource-id")
+        icon = snapshot.get_center("崩坏：星穹铁道")
+    """
+
+    INDEXED_ATTRIBUTES = ("text", "resource-id", "class", "content-desc")
+
+    def __init__(self, root: ET.Element):
+        """
+        :param root: uiautomator dump 的根元素（hierarchy）
+        """
+        self.rotation = int(root.get("rotation", 0) or 0)
+        self.timestamp = time.monotonic()
+        self.nodes = []  # 文档顺序
+        self.roots = []
+        self._indexes = {name: {} for name in self.INDEXED_ATTRIBUTES}
+        self._positions = None
+        # 迭代遍历，避免深层布局触发递归深度限制
+        stack = [(element, None) for element in reversed(root.findall("node"))]
+        while stack:
+            element, parent = stack.pop()
+            node = HierarchyNode(dict(element.attrib), parent)
+            if parent is None:
+                self.roots.append(node)
+            else:
+                parent.children.append(node)
+            self.nodes.append(node)
+            for name, index in self._indexes.items():
+                value = node.attrib.get(name)
+                if value:
+                    index.setdefault(value, []).append(node)
+            stack.extend((child, node) for child in reversed(element.findall("node")))
+
+    @classmethod
+    def from_xml(cls, xml: bytes | str) -> "HierarchySnapshot":
+        """
+        从布局XML构建快照
+
+        :raises xml.etree.ElementTree.ParseError: XML格式错误
+        """
+        return cls(ET.fromstring(xml))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def age(self) -> float:
+        """距快照构建经过的秒数"""
+        return time.monotonic() - self.timestamp
+
+    def find_all(self, value: str, by: str = "text") -> list:
+        """
+        查找属性值等于 value 的全部节点（文档顺序）
+
+        :param by: 属性名，text/resource-id/class/content-desc 走索引，其他属性逐个比较
+        """
+        index = self._indexes.get(by)
+        if index is not None:
+            return list(index.get(value, ()))
+        return [node for node in self.nodes if node.attrib.get(by) == value]
+
+    def find(self, value: str, by: str = "text") -> HierarchyNode | None:
+        """查找第一个属性值等于 value 且带有效 bounds 的节点"""
+        index = self._indexes.get(by)
+        candidates = index.get(value, ()) if index is not None else self.nodes
+        for node in candidates:
+            if node.center is not None and (index is not None or node.attrib.get(by) == value):
+                return node
+        return None
+
+    def get_center(self, value: str, by: str = "text") -> tuple[int, int] | None:
+        """查找节点并返回其中心点坐标，未找到返回None"""
+        node = self.find(value, by)
+        return node.center if node else None
+
+    def select(self, selector) -> HierarchyNode | None:
+        """
+        查找第一个匹配选择器且带有效 bounds 的节点
+
+        :param selector: Selector 或 (属性名, 值[, 匹配方式])
+        """
+        selector = Selector.coerce(selector)
+        if selector.match == "exact":
+            return self.find(selector.value, selector.by)
+        index = self._indexes.get(selector.by)
+        if index is not None:
+            # 在去重后的属性值上匹配，命中的节点再按文档顺序取第一个
+            matched = [node for value, nodes in index.items() if selector.matches_value(value) for node in nodes
+                       if node.center is not None]
+            return min(matched, key=self._order) if matched else None
+        for node in self.nodes:
+            if node.center is not None and selector.matches_value(node.attrib.get(selector.by)):
+                return node
+        return None
+
+    def select_many(self, selectors: dict) -> dict:
+        """
+        一次回答多个选择器
+
+        :param selectors: {名称: Selector 或 (属性名, 值[, 匹配方式])}
+        :return: {名称: 节点或None}
+        """
+        return {name: self.select(selector) for name, selector in selectors.items()}
+
+    def _order(self, node: HierarchyNode) -> int:
+        if self._positions is None:
+            self._positions = {id(item): position for position, item in enumerate(self.nodes)}
+        return self._positions[id(node)]
+
+
+def find_nodes(xml: bytes | str, selectors: dict, chunk_size: int = 16384) -> dict:
+    """
+    流式查找：不构建完整的布局树，所有选择器都命中后立即停止
+
+    exact 选择器直接在原始字节中搜索 `属性名="值"` 并只解析命中的那个标签；
+    contains / regex 选择器使用增量解析器逐个节点匹配。
+    适合只需要查找少量元素的场景，需要对同一界面做大量查询时使用 HierarchySnapshot。
+    返回的节点不包含父子链接。
+
+    :param xml: uiautomator dump 的布局XML
+    :param selectors: {名称: Selector 或 (属性名, 值[, 匹配方式])}
+    :param chunk_size: 增量解析时每次送入解析器的字节数
+    :return: {名称: 第一个匹配且带有效 bounds 的节点（文档顺序）或None}
+    :raises xml.etree.ElementTree.ParseError: 在全部命中之前遇到XML格式错误
+    """
+    if isinstance(xml, str):
+        xml = xml.encode("utf-8")
+    pending = {name: Selector.coerce(selector) for name, selector in selectors.items()}
+    result = dict.fromkeys(pending)
+    for name, selector in list(pending.items()):
+        needle = _attribute_needle(selector)
+        if needle is not None:
+            result[name] = _scan_exact(xml, needle)
+            del pending[name]
+    if not pending:
+        return result
+
+    parser = ET.XMLPullParser(events=("start",))
+    for offset in range(0, len(xml), chunk_size):
+        parser.feed(xml[offset:offset + chunk_size])
+        for _, element in parser.read_events():
+            attrib = element.attrib
+            matched = [name for name, selector in pending.items() if selector.matches_value(attrib.get(selector.by))]
+            if not matched or element.tag != "node":
+                continue
+            node = HierarchyNode(dict(attrib))
+            if node.center is None:
+                continue
+            for name in matched:
+                result[name] = node
+                del pending[name]
+            if not pending:
+                return result
+    return result
+
+
+def _attribute_needle(selector: Selector) -> bytes | None:
+    """exact 选择器在原始XML中的字节形式；值含控制字符（转义方式不确定）时返回None"""
+    if selector.match != "exact" or not selector.value or any(ord(char) < 32 for char in selector.value):
+        return None
+    value = selector.value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return f' {selector.by}="{value}"'.encode("utf-8")
+
+
+def _scan_exact(xml: bytes, needle: bytes) -> HierarchyNode | None:
+    position = xml.find(needle)
+    while position >= 0:
+        tag_start = xml.rfind(b"<", 0, position)
+        tag_end = xml.find(b">", position)
+        if tag_start >= 0 and tag_end >= 0 and xml.startswith(b"<node ", tag_start):
+            tag = xml[tag_start:tag_end + 1]
+            if not tag.endswith(b"/>"):
+                tag = tag[:-1] + b"/>"
+            node = HierarchyNode(ET.fromstring(tag).attrib)
+            if node.center is not None:
+                return node
+        position = xml.find(needle, position + 1)
+    return None
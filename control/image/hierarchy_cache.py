@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from control.image.hierarchy import HierarchySnapshot
+
+
+class HierarchyCache:
+    """
+    UI布局缓存，线程安全（每个设备一个实例，由 ImageController 持有）
+
+    uiautomator dump 单次需要 1~3 秒，而截图只需几十毫秒。缓存保存最近一次的布局，
+    并以廉价的界面指纹作为键：指纹不变且未超过 ttl 时直接复用，指纹变化或过期时重新dump。
+
+    指纹模式：
+        frame  完整截图像素的哈希 + 输入操作计数（默认，同一Activity内的翻页、弹窗、数字或标签变化都会重新dump；
+               哈希一帧约需十几毫秒，远小于一次dump）
+        focus  前台窗口所属包名 + Activity + 屏幕旋转 + 输入操作计数（只需一次shell往返；
+               本控制器发出的点击、滑动等操作后不再复用，但无法识别其他来源引起的同一Activity内的变化）
+    """
+
+    MODES = ("frame", "focus")
+
+    def __init__(self, adb, frames, ttl: float = 10.0, mode: str = "frame", logger=None):
+        """
+        :param adb: ADBController 实例
+        :param frames: FrameStream 实例
+        :param ttl: 布局最长复用秒数
+        :param mode: 指纹模式，frame 或 focus
+        :param logger: 日志记录器对象
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的指纹模式: {mode}，可选 {self.MODES}")
+        self.adb = adb
+        self.frames = frames
+        self.ttl = ttl
+        self.mode = mode
+        self.logger = logger
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._key = None
+        self._xml = None
+        self._snapshot = None
+        self._timestamp = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+
+    def fingerprint(self):
+        """计算当前界面指纹，获取失败返回None（此时不使用缓存）"""
+        if self.mode == "focus":
+            generation = self.adb.state.generation
+            info = self.adb.state.get(max_age=0)
+            if info is None:
+                return None
+            return info.focused_package, info.focused_activity, info.rotation, info.resolution, generation
+        generation = self.adb.state.generation
+        frame = self.frames.latest_frame(max_age_ms=0)
+        if frame is None:
+            return None
+        # 原始截图没有压缩噪声，对全部像素取哈希：采样点之间的计数、标签、角标变化也不会漏掉
+        digest = hashlib.blake2b(np.ascontiguousarray(frame.image).data, digest_size=16).digest()
+        return digest, frame.image.shape, generation
+
+    def get_xml(self, save_path: str = None) -> bytes | None:
+        """
+        获取当前界面的布局XML，界面未变化时复用缓存
+
+        :param save_path: 调试用，重新dump时将布局另存到该本地路径
+        :return: 布局XML，失败返回None
+        """
+        return self._get(save_path)
+
+    def get_snapshot(self, save_path: str = None) -> HierarchySnapshot | None:
+        """获取当前界面的布局快照，界面未变化时复用缓存（快照在首次需要时构建）"""
+        xml = self._get(save_path)
+        if xml is None:
+            return None
+        with self._lock:
+            if self._xml is xml and self._snapshot is not None:
+                return self._snapshot
+        snapshot = HierarchySnapshot.from_xml(xml)
+        with self._lock:
+            if self._xml is xml:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        """清除缓存的布局"""
+        with self._lock:
+            self._key = self._xml = self._snapshot = None
+
+    def stats(self) -> dict:
+        """命中统计 {"hits", "misses", "expired", "hit_rate"}，expired 为因超过 ttl 而未命中的次数"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+            }
+
+    def _get(self, save_path: str = None) -> bytes | None:
+        key = None
+        if self.enabled:
+            try:
+                key = self.fingerprint()
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"计算界面指纹失败，跳过布局缓存: {str(e)}")
+            if key is not None:
+                with self._lock:
+                    if self._xml is not None and key == self._key:
+                        if time.monotonic() - self._timestamp <= self.ttl:
+                            self._hits += 1
+                            return self._xml
+                        self._expired += 1
+        xml = self.adb.dump_window_hierarchy(save_path=save_path)
+        with self._lock:
+            self._misses += 1
+            if xml is not None and key is not None:
+                self._key, self._xml, self._snapshot = key, xml, None
+                self._timestamp = time.monotonic()
+        return xml
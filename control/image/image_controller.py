@@ -2,7 +2,17 @@ import os
 import threading
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 from control.adb.adb_controller import ADBController
+from control.adb.coordinate_transform import CoordinateTransform
+from control.image.frame_stream import FrameStream
+from control.image.hierarchy import HierarchySnapshot, Selector, find_nodes
+from control.image.hierarchy_cache import HierarchyCache
+from control.image.pixel_probe import PixelProbeRegistry
+from control.image.screen_classifier import ScreenClassifier, ScreenMatch
+from control.image.template_library import TemplateEntry, TemplateLibrary, transform_template
+from control.image.template_matcher import TemplateMatcher
 from log.log_factory import get_logger
 
 
@@ -17,8 +27,20 @@ class ImageController:
         self.account = account
         self._connection_lock = threading.Lock()
         self.adb = ADBController.get_instance(port, account, simulator_type)
+        self.frames = FrameStream.get_instance(port, account, simulator_type)
         self.logger = get_logger(self.__class__.__name__, port, account, simulator_type)
         self.xml_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "res", "xml", "window_dump.xml")
+        # 调试用：为True时将每次获取的UI布局另存到 res/xml/window_dump_<端口>_<账号>.xml
+        self.save_window_dump = False
+        # 以界面指纹为键的布局缓存，界面未变化时不重新dump
+        self.hierarchy_cache = HierarchyCache(self.adb, self.frames, logger=self.logger)
+        # 最近一帧的模板匹配器 (帧图像, 匹配器)，同一帧匹配多个模板时复用预处理结果
+        self._matcher = None
+        self._templates = {}
+        # 已登记界面的感知哈希分类器，用于廉价地判断当前所处界面
+        self.screens = ScreenClassifier()
+        # 各游戏适配器注册的像素断言集
+        self.probes = PixelProbeRegistry()
 
     @classmethod
     def get_instance(cls, port: int, account: str, simulator_type: str):
@@ -29,90 +51,297 @@ class ImageController:
                 cls._instances[key] = cls(port, account, simulator_type)
             return cls._instances[key]
 
-    def get_simulator_ui_bounds(self, search_value, search_by='text'):
+    def take_screenshot(self, max_age_ms: float = 150, copy: bool = False) -> np.ndarray | None:
+        """
+        获取当前屏幕（原始RGBA帧，不经过PNG编码）
+
+        通过设备共享的截图流获取，帧龄在 max_age_ms 内且之后没有点击/滑动时直接复用已有帧，
+        同一轮检测中的多次调用共享一次截图；同时发起的截图请求只会截图一次。
+
+        :param max_age_ms: 可接受的最大帧龄（毫秒），0 表示需要一帧新截图（与并发请求共享）
+        :param copy: 是否返回可写副本；默认返回共享的只读帧
+        :return: 形状为 (高, 宽, 4) 的 uint8 数组，失败返回None
+        """
+        frame = self.frames.latest_frame(max_age_ms)
+        if frame is None:
+            return None
+        return frame.image.copy() if copy else frame.image
+
+    def load_template(self, path: str) -> np.ndarray:
+        """
+        读取按基准分辨率（1920x1080）制作的模板图片，换算到当前设备后返回 RGBA 数组
+
+        换算结果按路径和设备坐标变换缓存，分辨率不变时只解码、缩放一次。
+        :raises OSError: 文件不存在或无法解码
+        """
+        transform = self.adb.transform
+        key = (path, transform)
+        template = self._templates.get(key)
+        if template is None:
+            from PIL import Image
+            with Image.open(path) as image:
+                template = np.asarray(image.convert("RGBA"))
+            if transform is not None:
+                template = transform_template(template, transform)
+            self._templates[key] = template
+        return template
+
+    def get_template_library(self, source_dir: str) -> TemplateLibrary | None:
+        """
+        获取按当前设备分辨率编译的模板库（同一目录和分辨率的设备共享，源图片变化时增量重建）
+
+        :param source_dir: 模板图片目录
+        :return: 模板库，获取分辨率或编译失败返回None
+        """
+        resolution = self.adb.state.resolution
+        if not resolution:
+            self.logger.error("模拟器分辨率获取失败，无法加载模板库")
+            return None
+        try:
+            library = TemplateLibrary.get_instance(source_dir, resolution, logger=self.logger)
+            # 源图片有变化时增量重建（目录扫描间隔至少2秒）
+            library.refresh(min_interval=2.0)
+            return library
+        except Exception as e:
+            self.logger.error(f"加载模板库失败: {str(e)}")
+            return None
+
+    def find_template(self, template, roi: tuple = None, threshold: float = None, frame: np.ndarray = None,
+                      mode: str = "gray", scales=(1.0,), top_k: int = 1, max_age_ms: float = 150,
+                      base_roi: tuple = None) -> list:
+        """
+        在屏幕中查找模板图片（归一化互相关，纯CPU）
+
+        用法：
+            matches = image.find_template("res/img/start.png", base_roi=(1400, 800, 1920, 1080))
+            if matches:
+                adb.click(*matches[0].center)
+
+        :param template: 模板库中的 TemplateEntry、模板图片路径（按基准分辨率制作，自动换算到设备），
+                         或 (高, 宽, 4) RGBA / (高, 宽, 3) RGB / (高, 宽) 灰度数组（设备分辨率）
+        :param roi: 搜索区域 (left, top, right, bottom)，设备坐标；默认使用模板库中的默认ROI，否则全屏
+        :param threshold: 最低匹配得分（-1 ~ 1），默认使用模板库中的阈值，否则为0.8
+        :param frame: 要搜索的截图，默认从截图流获取
+        :param mode: gray（灰度）或 edge（梯度，适合颜色会变化的元素）
+        :param scales: 模板缩放比例序列
+        :param top_k: 最多返回的结果数（重叠结果经非极大值抑制后只保留得分最高的一个）
+        :param max_age_ms: 未提供 frame 时可接受的最大帧龄
+        :param base_roi: 以基准分辨率坐标表示的搜索区域，换算为设备坐标后使用（优先于 roi）
+        :return: Match 列表，按得分从高到低排序；截图或模板读取失败返回空列表
+        """
+        try:
+            if base_roi is not None:
+                transform = self.adb.transform
+                if transform is None:
+                    self.logger.error("设备分辨率获取失败，无法换算搜索区域")
+                    return []
+                roi = transform.rect(base_roi)
+            if isinstance(template, TemplateEntry):
+                roi = template.roi if roi is None else roi
+                threshold = template.threshold if threshold is None else threshold
+                template = template.image
+            elif isinstance(template, str):
+                template = self.load_template(template)
+            threshold = 0.8 if threshold is None else threshold
+            if frame is None:
+                frame = self.take_screenshot(max_age_ms)
+                if frame is None:
+                    self.logger.error("截图失败，无法进行模板匹配")
+                    return []
+            cached = self._matcher
+            # 只有只读帧（截图流中的帧）内容不会变化，才能按对象复用预处理结果
+            if cached is not None and cached[0] is frame and cached[1].mode == mode and not frame.flags.writeable:
+                matcher = cached[1]
+            else:
+                matcher = TemplateMatcher(frame, mode)
+                self._matcher = (frame, matcher)
+            matches = matcher.find(template, roi, threshold, scales, top_k)
+        except Exception as e:
+            self.logger.error(f"模板匹配异常: {str(e)}")
+            return []
+        self.logger.debug(f"模板匹配结果: {[(match.center, round(match.score, 3)) for match in matches]}")
+        return matches
+
+    def classify_screen(self, max_age_ms: float = 200, frame: np.ndarray = None) -> ScreenMatch | None:
+        """
+        判断当前处于哪个已登记的界面（见 self.screens）
+
+        :param max_age_ms: 可接受的最大帧龄
+        :param frame: 要分类的截图，默认从截图流获取
+        :return: 分类结果，截图失败或没有足够接近的界面时返回None
+        """
+        if frame is None:
+            frame = self.take_screenshot(max_age_ms)
+            if frame is None:
+                return None
+        match = self.screens.classify(frame)
+        self.logger.debug(f"界面分类结果: {match}")
+        return match
+
+    def check_probes(self, names=None, max_age_ms: float = 100, frame: np.ndarray = None) -> dict | None:
+        """
+        评估已注册的像素断言集（所有断言在同一次向量运算中完成，可高频轮询）
+
+        断言坐标按基准分辨率（1920x1080）编写，按当前设备的坐标变换换算。
+
+        :param names: 要返回的状态名列表，默认全部
+        :param max_age_ms: 可接受的最大帧龄
+        :param frame: 要检查的截图，默认从截图流获取
+        :return: {状态名: 是否命中}，截图失败或存在未注册的状态名时返回None
+        """
+        if frame is None:
+            frame = self.take_screenshot(max_age_ms)
+            if frame is None:
+                self.logger.error("截图失败，无法检查像素断言")
+                return None
+        try:
+            return self.probes.evaluate(frame, names, self.adb.transform)
+        except KeyError as e:
+            self.logger.error(f"未注册的像素断言集: {str(e)}")
+            return None
+
+    def check_probe(self, name: str, max_age_ms: float = 100, frame: np.ndarray = None) -> bool:
+        """是否处于指定的像素断言状态，截图失败或未注册时返回False"""
+        result = self.check_probes([name], max_age_ms, frame)
+        return bool(result and result[name])
+
+    def get_window_hierarchy(self) -> ET.Element | None:
+        """
+        获取当前界面的UI布局树（在内存中解析，不经过本地文件；界面未变化时复用缓存的布局）
+
+        :return: 布局根节点，失败返回None
+        """
+        xml = self.hierarchy_cache.get_xml(save_path=self._debug_dump_path())
+        if xml is None:
+            return None
+        try:
+            return ET.fromstring(xml)
+        except ET.ParseError as e:
+            self.logger.error(f"解析模拟器布局失败: {str(e)}")
+            return None
+
+    def get_hierarchy_snapshot(self) -> HierarchySnapshot | None:
+        """
+        获取当前界面的索引快照（一次dump，之后的多次查询不再访问设备；界面未变化时复用缓存的快照）
+
+        :return: 布局快照，失败返回None
+        """
+        try:
+            snapshot = self.hierarchy_cache.get_snapshot(save_path=self._debug_dump_path())
+        except ET.ParseError as e:
+            self.logger.error(f"解析模拟器布局失败: {str(e)}")
+            return None
+        if snapshot is not None:
+            self.logger.debug(f"布局快照节点数: {len(snapshot)} | 缓存统计: {self.hierarchy_cache.stats()}")
+        return snapshot
+
+    def _debug_dump_path(self) -> str | None:
+        """开启 save_window_dump 时返回布局另存路径"""
+        return self._window_dump_path() if self.save_window_dump else None
+
+    def _window_dump_path(self) -> str:
+        """使用端口号和账号构建唯一的调试文件名，避免多实例冲突"""
+        base_name, ext = os.path.splitext(os.path.basename(self.xml_path))
+        return os.path.join(os.path.dirname(self.xml_path), f"{base_name}_{self.port}_{self.account}{ext}")
+
+    def get_simulator_ui_bounds(self, search_value, search_by='text', snapshot: HierarchySnapshot = None):
         """
         根据指定属性获取UI元素的bounds坐标
         参数：
         search_value: 要匹配的属性值
         search_by: 搜索属性类型（默认text，可选resource-id/class等）
+        snapshot: 已有的布局快照，提供时直接在快照中查找，不重新dump
+        """
+        self.logger.info(f"正在获取模拟器布局文件{search_by}='{search_value}'的节点")
+        found = self.find_many({"target": Selector(search_by, search_value)}, snapshot=snapshot)
+        if found is None:
+            return None
+        center = found["target"]
+        if center is None:
+            self.logger.debug(f"未找到{search_by}='{search_value}'的节点")
+            return None
+        self.logger.debug(f"{search_by}='{search_value}'的节点坐标为: {center}")
+        return center
+
+    def find_nodes(self, selectors: dict, snapshot: HierarchySnapshot = None) -> dict | None:
+        """
+        在同一次布局dump中查找多个节点
+
+        未提供快照时对dump结果流式解析，所有选择器命中后立即停止，不构建完整的布局树。
+
+        :param selectors: {名称: Selector 或 (属性名, 值[, 匹配方式])}，匹配方式可选 exact/contains/regex
+        :param snapshot: 已有的布局快照，提供时不重新dump
+        :return: {名称: HierarchyNode或None}，获取或解析布局失败返回None
         """
         try:
-            # 使用端口号和账号构建唯一文件名，避免多实例冲突
-            xml_dir = os.path.dirname(self.xml_path)
-            base_name = os.path.splitext(os.path.basename(self.xml_path))[0]
-            ext = os.path.splitext(self.xml_path)[1]
-
-            # 构建基于端口和账号的唯一文件名
-            unique_filename = f"{base_name}_{self.port}_{self.account}{ext}"
-            unique_xml_path = os.path.join(xml_dir, unique_filename)
-
-            # 确保目标目录存在
-            if not os.path.exists(xml_dir):
-                os.makedirs(xml_dir)
-
-            # 下载XML文件
-            if not self.adb.download_window_dump(unique_xml_path):
-                self.logger.error("下载模拟器布局文件失败")
-                return None
-            else:
-                self.logger.info(f"正在获取模拟器布局文件{search_by}='{search_value}'的节点")
-                # 解析指定路径的 XML 文件
-                tree = ET.parse(unique_xml_path)
-                root = tree.getroot()
-                # 遍历所有节点
-                for node in root.findall('.//node'):
-                    current_value = node.get(search_by)
-                    if current_value and current_value == search_value:
-                        bounds = node.get('bounds')
-                        if bounds:
-                            # 解析 bounds 字符串获取坐标
-                            left, top, right, bottom = map(int,
-                                                           bounds.replace("[", "").replace("]", ",").split(",")[:-1])
-                            # 计算中心点坐标
-                            center_x = (left + right) // 2
-                            center_y = (top + bottom) // 2
-                            self.logger.debug(f"{search_by}='{search_value}'的节点坐标为: ({center_x}, {center_y})")
-                            return center_x, center_y
-                self.logger.debug(f"未找到{search_by}='{search_value}'的节点")
-                # 删除临时文件
-                try:
-                    os.remove(unique_xml_path)
-                except Exception as e:
-                    self.logger.warning(f"删除临时文件失败: {e}")
+            if snapshot is not None:
+                return snapshot.select_many(selectors)
+            xml = self.hierarchy_cache.get_xml(save_path=self._debug_dump_path())
+            if xml is None:
+                self.logger.error("获取模拟器布局失败")
                 return None
-        except FileNotFoundError:
-            self.logger.error("错误: 确保XML路径存在")
+            return find_nodes(xml, selectors)
         except Exception as e:
-            self.logger.error(f"运行根据指定属性获取UI元素的bounds坐标异常: {str(e)}")
+            self.logger.error(f"查找UI元素异常: {str(e)}")
+            return None
+
+    def find_many(self, selectors: dict, snapshot: HierarchySnapshot = None) -> dict | None:
+        """
+        在同一次布局dump中查找多个元素
+
+        用法：
+            found = image.find_many({
+                "close": Selector("resource-id", "com.mumu.launcher:id/close"),
+                "icon": ("text", "崩坏：星穹铁道"),
+                "indicator": ("content-desc", r"第\d+屏", "regex"),
+            })
+
+        :param selectors: {名称: Selector 或 (属性名, 值[, 匹配方式])}，匹配方式可选 exact/contains/regex
+        :param snapshot: 已有的布局快照，提供时不重新dump
+        :return: {名称: 中心点坐标或None}，获取布局失败返回None
+        """
+        nodes = self.find_nodes(selectors, snapshot)
+        if nodes is None:
             return None
+        result = {name: node.center if node else None for name, node in nodes.items()}
+        self.logger.debug(f"批量查找节点结果: {result}")
+        return result
 
     def check_resolution_ratio(self, target_width: int, target_height: int) -> bool:
-        """检查分辨率"""
+        """
+        检查分辨率
+
+        与目标分辨率不一致时不再视为失败：点击、滑动、ROI与模板通过设备坐标变换自动换算；
+        分辨率过低（不足目标的一半，模板细节丢失）或方向与目标不一致（尚不支持旋转显示的游戏画面）时返回False。
+        """
         self.logger.info("进入分辨率检测")
         # 获取当前逻辑分辨率
         resolution = self.adb.get_current_display_resolution()
         if not resolution:
             raise Exception("模拟器分辨率获取失败")
         current_width, current_height = resolution
+        transform = CoordinateTransform(resolution, (target_width, target_height))
         # 计算目标比例（强制使用横屏比例标准）
         target_ratio = max(target_width, target_height) / min(target_width, target_height)
         current_ratio = max(current_width, current_height) / min(current_width, current_height)
-        # 检查分辨率绝对值
-        if (current_width < target_width and current_height < target_height) or \
-                (current_width < target_height and current_height < target_width):  # 兼容竖屏目标
+        if transform.template_scale < 0.5:
             self.logger.error(
-                f"当前分辨率 {current_width}x{current_height} 小于目标 {target_width}x{target_height}\n"
+                f"当前分辨率 {current_width}x{current_height} 过低（不足目标 {target_width}x{target_height} 的一半）\n"
                 "请调整模拟器分辨率至推荐值")
+            return False
+        if (current_width, current_height) == (target_width, target_height):
+            self.logger.debug(f"分辨率验证通过: {current_width}x{current_height}")
+            return True
         # 检查比例容错（1% 误差）
-        elif abs(current_ratio - target_ratio) > 0.01:
-            self.logger.error(
-                f"屏幕比例异常 当前 {current_width}x{current_height} (≈{current_ratio:.2f}:1)\n"
-                f"需要接近 {target_ratio:.2f}:1 (基于 {target_width}x{target_height})")
+        if abs(current_ratio - target_ratio) > 0.01:
+            self.logger.warning(
+                f"屏幕比例不同 当前 {current_width}x{current_height} (≈{current_ratio:.2f}:1)，"
+                f"目标 {target_ratio:.2f}:1 (基于 {target_width}x{target_height})，坐标将按宽高分别缩放")
         # 宽高顺序不匹配时的警告（如竖屏模式符合比例但方向不符）
-        elif (current_width < current_height) != (target_width < target_height):
+        if (current_width < current_height) != (target_width < target_height):
             self.logger.warning(
                 f"方向不匹配 当前 {current_width}x{current_height} (竖屏)\n"
                 f"需使用横屏 {max(target_width, target_height)}x{min(target_width, target_height)}")
-        else:
-            self.logger.debug(f"分辨率验证通过: {current_width}x{current_height}")
-            return True
+            return False
+        self.logger.info(f"分辨率与目标不同，已启用坐标换算: {transform}")
+        return True
@@ -0,0 +1,139 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PixelProbe(NamedTuple):
+    """一个像素断言：(x, y) 处的颜色与 color 每个通道相差不超过 tolerance（坐标按基准分辨率 1920x1080 编写）"""
+    x: int
+    y: int
+    color: tuple[int, int, int]  # (R, G, B)
+    tolerance: int = 16
+
+
+class PixelProbeSet:
+    """
+    描述一个界面状态的一组像素断言
+
+        BATTLE_AUTO_ON = PixelProbeSet("battle/auto_on", [
+            PixelProbe(1790, 52, (255, 222, 140)),
+            PixelProbe(1802, 52, (255, 222, 140)),
+            PixelProbe(1796, 70, (40, 40, 40), tolerance=24),
+        ])
+    """
+
+    def __init__(self, name: str, probes, min_matches: int = None):
+        """
+        :param name: 状态名，在同一 ImageController 中唯一
+        :param probes: PixelProbe 或 (x, y, color[, tolerance]) 序列
+        :param min_matches: 至少命中多少个断言视为处于该状态，默认全部命中
+        """
+        probes = [PixelProbe(*probe) for probe in probes]
+        if not probes:
+            raise ValueError(f"像素断言集 {name} 为空")
+        self.name = name
+        self.probes = tuple(probes)
+        self.min_matches = len(probes) if min_matches is None else min_matches
+        self.xs = np.array([probe.x for probe in probes], dtype=np.intp)
+        self.ys = np.array([probe.y for probe in probes], dtype=np.intp)
+        self.colors = np.array([probe.color for probe in probes], dtype=np.int16)
+        self.tolerances = np.array([probe.tolerance for probe in probes], dtype=np.int16)
+
+    def __len__(self):
+        return len(self.probes)
+
+    def matches(self, frame: np.ndarray) -> np.ndarray:
+        """每个断言是否命中（坐标不做换算，超出画面的断言视为未命中）"""
+        return _evaluate(frame, self.xs, self.ys, self.colors, self.tolerances)
+
+    def check(self, frame: np.ndarray) -> bool:
+        """是否处于该状态"""
+        return int(self.matches(frame).sum()) >= self.min_matches
+
+    def __repr__(self):
+        return f"PixelProbeSet({self.name!r}, probes={len(self.probes)}, min_matches={self.min_matches})"
+
+
+def _evaluate(frame: np.ndarray, xs: np.ndarray, ys: np.ndarray, colors: np.ndarray,
+              tolerances: np.ndarray) -> np.ndarray:
+    height, width = frame.shape[:2]
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    pixels = frame[np.where(inside, ys, 0), np.where(inside, xs, 0), :3].astype(np.int16)
+    return inside & (np.abs(pixels - colors).max(axis=1) <= tolerances)
+
+
+class PixelProbeRegistry:
+    """
+    已注册的像素断言集，线程安全
+
+    全部断言合并为一组坐标/颜色数组，一次取像素、一次比较即可得到所有状态的结果，
+    适合插件高频轮询。坐标换算到设备分辨率的结果按坐标变换缓存，只在分辨率变化时重新计算。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sets = {}
+        # {设备坐标变换: 合并后的数组}，None 表示不换算
+        self._compiled = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sets
+
+    def names(self) -> list:
+        return list(self._sets)
+
+    def get(self, name: str) -> PixelProbeSet:
+        """
+        :raises KeyError: 未注册
+        """
+        return self._sets[name]
+
+    def register(self, *probe_sets: PixelProbeSet):
+        """注册断言集，同名的断言集会被替换"""
+        with self._lock:
+            for probe_set in probe_sets:
+                self._sets[probe_set.name] = probe_set
+            self._compiled = {}
+
+    def unregister(self, name: str):
+        with self._lock:
+            if self._sets.pop(name, None) is not None:
+                self._compiled = {}
+
+    def evaluate(self, frame: np.ndarray, names=None, transform=None) -> dict:
+        """
+        评估断言集
+
+        :param names: 只返回这些状态的结果，默认全部（均在同一次向量运算中计算）
+        :param transform: 设备坐标变换（CoordinateTransform），断言坐标按基准分辨率编写时传入，换算结果按变换缓存
+        :return: {状态名: 是否命中}
+        :raises KeyError: names 中有未注册的状态
+        """
+        compiled = self._compiled.get(transform)
+        if compiled is None:
+            compiled = self._compile(transform)
+        set_names, starts, thresholds, arrays = compiled
+        if not set_names:
+            return {}
+        counts = np.add.reduceat(_evaluate(frame, *arrays).astype(np.int32), starts)
+        result = dict(zip(set_names, (counts >= thresholds).tolist()))
+        if names is None:
+            return result
+        return {name: result[name] for name in names}
+
+    def _compile(self, transform):
+        with self._lock:
+            sets = list(self._sets.values())
+            starts = np.cumsum([0] + [len(probe_set) for probe_set in sets[:-1]]) if sets else np.empty(0, np.intp)
+            arrays = tuple(
+                np.concatenate([getattr(probe_set, field) for probe_set in sets]) if sets else None
+                for field in ("xs", "ys", "colors", "tolerances")
+            )
+            if transform is not None and sets:
+                points = transform.points(np.column_stack(arrays[:2]))
+                arrays = (points[:, 0], points[:, 1]) + arrays[2:]
+            compiled = ([probe_set.name for probe_set in sets], starts,
+                        np.array([probe_set.min_matches for probe_set in sets]), arrays)
+            self._compiled[transform] = compiled
+            return compiled
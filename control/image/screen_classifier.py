@@ -0,0 +1,200 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+from control.image.template_matcher import to_gray
+
+# 每个哈希格内取 _SAMPLES×_SAMPLES 个采样点求平均，只读取约 64x68x16 个像素而不是整帧
+_SAMPLES = 4
+# 相邻格灰度差超过该值才记为1：纯色区域的比较结果由噪声决定，不设容差时会随机翻转
+_MARGIN = 4.0
+
+
+def dhash(image: np.ndarray, hash_size: int = 16, roi: tuple = None) -> np.ndarray:
+    """
+    差值哈希（dHash）：缩小为 hash_size×(hash_size+1) 灰度图，比较每行相邻像素的明暗（右侧明显更亮记为1）
+
+    对压缩噪声、轻微亮度变化不敏感，界面布局变化时大量位翻转。
+
+    :param image: (高, 宽, 4) RGBA、(高, 宽, 3) RGB 或 (高, 宽) 灰度数组
+    :param hash_size: 哈希边长，位数为 hash_size²（需为8的倍数）
+    :param roi: 只对该区域 (left, top, right, bottom) 计算
+    :return: 形状为 (hash_size² / 64,) 的 uint64 数组（hash_size² 不是64的倍数时为 uint8 数组）
+    """
+    if roi is not None:
+        left, top, right, bottom = roi
+        image = image[top:bottom, left:right]
+    height, width = image.shape[:2]
+    rows, cols = hash_size, hash_size + 1
+    ys = ((np.arange(rows * _SAMPLES) + 0.5) * (height / (rows * _SAMPLES))).astype(np.intp)
+    xs = ((np.arange(cols * _SAMPLES) + 0.5) * (width / (cols * _SAMPLES))).astype(np.intp)
+    gray = to_gray(image[ys[:, None], xs[None, :]])
+    cells = gray.reshape(rows, _SAMPLES, cols, _SAMPLES).mean(axis=(1, 3))
+    packed = np.packbits(cells[:, 1:] > cells[:, :-1] + _MARGIN)
+    return packed.view(np.uint64) if packed.size % 8 == 0 else packed
+
+
+def hamming(hashes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    query 与 hashes 每一行之间的汉明距离
+
+    :param hashes: 形状为 (N, 字数) 的哈希数组
+    :param query: 形状为 (字数,) 的哈希
+    :return: 形状为 (N,) 的距离数组
+    """
+    diff = np.bitwise_xor(hashes, query)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff).sum(axis=-1, dtype=np.int64)
+    return np.unpackbits(diff.view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+class ScreenMatch(NamedTuple):
+    """分类结果"""
+    label: str
+    distance: int  # 汉明距离
+    similarity: float  # 1 - distance / 位数
+
+
+class ScreenClassifier:
+    """
+    界面分类器，线程安全
+
+    以截图的 dHash 作为特征，在已登记的界面样本中做最近邻查找，判断当前处于哪个界面，
+    截图已在截图流中时一次分类约 0.1~0.2 毫秒（其中查找只需十几微秒），远快于 uiautomator dump 或OCR。
+    同一标签可以登记多个样本（如不同活动期间的主界面）：
+
+        screens = image.screens
+        screens.register("launcher/1", frame)
+        screens.register("star_rail/login", frame)
+        match = screens.classify(image.take_screenshot(max_age_ms=200))
+        if match and match.label == "star_rail/login":
+            ...
+    """
+
+    def __init__(self, hash_size: int = 16, max_distance: int = None, roi: tuple = None):
+        """
+        :param hash_size: 哈希边长，位数为 hash_size²
+        :param max_distance: 判定为同一界面的最大汉明距离，默认为位数的 10%
+        :param roi: 只对画面中该区域 (left, top, right, bottom) 分类，如忽略会变化的顶栏
+        """
+        self.hash_size = hash_size
+        self.bits = hash_size * hash_size
+        self.max_distance = max(1, self.bits // 10) if max_distance is None else max_distance
+        self.roi = roi
+        self._lock = threading.Lock()
+        self._labels = []
+        self._hashes = None
+
+    def __len__(self):
+        return len(self._labels)
+
+    def hash(self, image: np.ndarray) -> np.ndarray:
+        """计算截图的哈希"""
+        return dhash(image, self.hash_size, self.roi)
+
+    def labels(self) -> list:
+        """已登记的标签（去重）"""
+        with self._lock:
+            return list(dict.fromkeys(self._labels))
+
+    def register(self, label: str, image: np.ndarray, unique: bool = False) -> np.ndarray:
+        """
+        登记一个界面样本
+
+        :param label: 界面标签
+        :param image: 该界面的截图
+        :param unique: 为True时与已有样本的距离在 max_distance 内则不重复登记
+        :return: 样本哈希
+        """
+        return self.register_hash(label, self.hash(image), unique)
+
+    def register_hash(self, label: str, value: np.ndarray, unique: bool = False) -> np.ndarray:
+        """登记已计算好的哈希"""
+        with self._lock:
+            if self._hashes is None:
+                self._hashes = value[None, :].copy()
+            else:
+                if unique:
+                    same = np.asarray(self._labels) == label
+                    if same.any() and hamming(self._hashes[same], value).min() <= self.max_distance:
+                        return value
+                self._hashes = np.vstack([self._hashes, value[None, :]])
+            self._labels.append(label)
+        return value
+
+    def remove(self, label: str) -> int:
+        """
+        删除标签的全部样本
+
+        :return: 删除的样本数
+        """
+        with self._lock:
+            keep = np.asarray(self._labels) != label
+            removed = len(self._labels) - int(keep.sum())
+            if removed:
+                self._labels = [name for name, kept in zip(self._labels, keep) if kept]
+                self._hashes = self._hashes[keep] if self._labels else None
+            return removed
+
+    def nearest(self, image: np.ndarray = None, k: int = 1, value: np.ndarray = None) -> list:
+        """
+        最近的 k 个标签（每个标签只取其最近的样本）
+
+        :param image: 截图
+        :param value: 已计算好的哈希，提供时忽略 image
+        :return: ScreenMatch 列表，按距离从小到大排序
+        """
+        value = self.hash(image) if value is None else value
+        with self._lock:
+            if self._hashes is None:
+                return []
+            distances = hamming(self._hashes, value)
+            labels = self._labels
+        result = {}
+        for position in np.argsort(distances, kind="stable"):
+            label = labels[position]
+            if label not in result:
+                distance = int(distances[position])
+                result[label] = ScreenMatch(label, distance, 1 - distance / self.bits)
+                if len(result) >= k:
+                    break
+        return list(result.values())
+
+    def classify(self, image: np.ndarray = None, max_distance: int = None, value: np.ndarray = None) -> ScreenMatch | None:
+        """
+        判断截图属于哪个已登记的界面
+
+        :param image: 截图
+        :param max_distance: 最大汉明距离，默认为 self.max_distance
+        :param value: 已计算好的哈希，提供时忽略 image
+        :return: 最近的界面，距离超过 max_distance 或未登记任何界面时返回None
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        matches = self.nearest(image, 1, value)
+        if matches and matches[0].distance <= max_distance:
+            return matches[0]
+        return None
+
+    def save(self, path: str):
+        """保存已登记的样本（.npz）"""
+        with self._lock:
+            hashes = self._hashes if self._hashes is not None else np.empty((0, 0), dtype=np.uint64)
+            np.savez(path, labels=np.asarray(self._labels, dtype=str), hashes=hashes,
+                     hash_size=self.hash_size, roi=np.asarray(self.roi if self.roi else (), dtype=np.int64))
+
+    def load(self, path: str):
+        """
+        加载 save 保存的样本（替换当前样本）
+
+        :raises ValueError: 哈希参数与当前分类器不一致
+        """
+        with np.load(path) as data:
+            roi = tuple(int(value) for value in data["roi"]) or None
+            if int(data["hash_size"]) != self.hash_size or roi != (tuple(self.roi) if self.roi else None):
+                raise ValueError("样本的哈希边长或ROI与分类器不一致")
+            labels = [str(label) for label in data["labels"]]
+            hashes = data["hashes"]
+        with self._lock:
+            self._labels = labels
+            self._hashes = hashes if labels else None
@@ -0,0 +1,338 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from control.adb.coordinate_transform import BASE_RESOLUTION, CoordinateTransform
+from control.image.template_matcher import resize, to_gray
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+METADATA_FILE = "templates.json"
+
+# 文件头：魔数 + 索引JSON长度；索引之后是按 _ALIGNMENT 对齐的 uint8 灰度数组
+_MAGIC = b"GHTPACK1"
+_HEADER = struct.Struct("<8sI")
+_ALIGNMENT = 64
+
+
+def _data_start(index_size: int) -> int:
+    return -(-(_HEADER.size + index_size) // _ALIGNMENT) * _ALIGNMENT
+
+
+def transform_template(image: np.ndarray, transform: CoordinateTransform) -> np.ndarray:
+    """
+    将按基准分辨率制作的模板换算到设备上（旋转 + 等比缩放）
+
+    :return: 与输入通道数相同的数组，uint8 输入时仍为 uint8（四舍五入），否则为 float32
+    """
+    if transform.identity:
+        return image
+    height, width = image.shape[:2]
+    rotated = np.rot90(image, -transform.rotation) if transform.rotation else image
+    scaled = resize(rotated, *transform.size(width, height))
+    return np.clip(np.rint(scaled), 0, 255).astype(np.uint8) if image.dtype == np.uint8 else scaled
+
+
+class TemplateEntry(NamedTuple):
+    """模板包中的一个模板（坐标均已换算到设备分辨率）"""
+    name: str  # 相对模板目录的路径（不含扩展名，以 / 分隔）
+    image: np.ndarray  # 只读的 (高, 宽) uint8 灰度数组，直接映射自模板包
+    roi: tuple | None  # 默认搜索区域 (left, top, right, bottom)
+    threshold: float | None  # 默认匹配阈值
+
+
+class TemplateLibrary:
+    """
+    模板库：将模板目录编译为单个二进制模板包，并以 mmap 只读打开
+
+    模板包中保存按设备分辨率缩放好的灰度数组和元数据（默认ROI、阈值），
+    查找时不再解码PNG；同一分辨率的多个设备进程映射同一个文件，共享物理内存页。
+    源图片或元数据变化时增量重建：未变化的模板直接从旧包复制，只解码变化的图片。
+    每次重建写入带版本号的新文件再切换映射（Windows 下被映射的文件无法替换），旧版本在不再被占用后删除。
+
+    目录结构：
+        res/templates/
+            start.png
+            battle/auto.png
+            templates.json    可选，{"battle/auto": {"roi": [1600, 0, 1920, 200], "threshold": 0.85}}
+                              ROI 按 BASE_RESOLUTION 坐标填写
+            .templates_1280x720.<版本>.pack    编译生成
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, source_dir: str, resolution: tuple[int, int], pack_path: str = None, logger=None):
+        """
+        :param source_dir: 模板图片目录
+        :param resolution: 设备分辨率 (宽, 高)
+        :param pack_path: 模板包路径，默认为 source_dir/.templates_<宽>x<高>.pack；
+                          实际文件名在扩展名前加版本号，如 .templates_1280x720.18c2f0a1b2c3d4e5.pack
+        :param logger: 日志记录器对象
+        """
+        self.source_dir = os.path.abspath(source_dir)
+        self.resolution = tuple(resolution)
+        # 模板图片与ROI以 BASE_RESOLUTION 制作，编译时按设备坐标变换缩放（及旋转）
+        self.transform = CoordinateTransform(self.resolution)
+        width, height = self.resolution
+        self.pack_path = pack_path or os.path.join(self.source_dir, f".templates_{width}x{height}.pack")
+        self.logger = logger
+        self._build_lock = threading.Lock()
+        # 保护映射状态（文件、mmap、索引、已取出的模板）：切换映射与 get 互斥，读取方不会看到切换到一半的状态；
+        # 编译模板期间不持有，不阻塞读取
+        self._state_lock = threading.RLock()
+        self._file = None
+        self._mmap = None
+        self._index = {}
+        self._entries = {}
+        self._data_start = 0
+        self._mapped_path = None
+        self._last_refresh = 0.0
+        self.refresh()
+
+    @classmethod
+    def get_instance(cls, source_dir: str, resolution: tuple[int, int], logger=None):
+        """获取模板库实例（每个目录和分辨率一个）"""
+        key = (os.path.abspath(source_dir), tuple(resolution))
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(source_dir, resolution, logger=logger)
+            return cls._instances[key]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def names(self) -> list:
+        """全部模板名"""
+        return sorted(self._index)
+
+    def get(self, name: str) -> TemplateEntry:
+        """
+        获取模板
+
+        :raises KeyError: 模板不存在
+        """
+        with self._state_lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                info = self._index[name]
+                height, width = info["shape"]
+                image = np.frombuffer(self._mmap, dtype=np.uint8, count=height * width,
+                                      offset=self._data_start + info["offset"]).reshape(height, width)
+                roi = tuple(info["roi"]) if info.get("roi") else None
+                entry = TemplateEntry(name, image, roi, info.get("threshold"))
+                self._entries[name] = entry
+            return entry
+
+    def refresh(self, min_interval: float = 0) -> bool:
+        """
+        检查源目录，有变化时增量重建模板包并重新映射
+
+        :param min_interval: 距上次检查不足该秒数时跳过检查
+        :return: 是否进行了重建
+        """
+        with self._build_lock:
+            now = time.monotonic()
+            if min_interval and now - self._last_refresh < min_interval:
+                return False
+            self._last_refresh = now
+            sources = self._scan_sources()
+            metadata = self._load_metadata()
+            if self._mmap is None:
+                with self._state_lock:
+                    self._open()
+            if self._is_current(sources, metadata):
+                return False
+            self._build(sources, metadata)
+            return True
+
+    def close(self):
+        """释放映射；仍被外部引用的模板数组保持有效，映射在最后一个引用释放后关闭"""
+        with self._state_lock:
+            self._entries = {}
+            self._index = {}
+            self._mapped_path = None
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    pass
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _scan_sources(self) -> dict:
+        """{模板名: (相对路径, mtime_ns, 文件大小)}"""
+        sources = {}
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+            for file_name in sorted(files):
+                if file_name.startswith(".") or not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, file_name)
+                relative = os.path.relpath(path, self.source_dir).replace(os.sep, "/")
+                name = os.path.splitext(relative)[0]
+                stat = os.stat(path)
+                if name in sources:
+                    self._log("warning", f"模板名重复，忽略 {relative}")
+                    continue
+                sources[name] = (relative, stat.st_mtime_ns, stat.st_size)
+        return sources
+
+    def _load_metadata(self) -> dict:
+        path = os.path.join(self.source_dir, METADATA_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self._log("error", f"读取模板元数据失败: {str(e)}")
+            return {}
+
+    def _pack_versions(self) -> list:
+        """已有的模板包文件路径，最新版本在前"""
+        root, ext = os.path.splitext(self.pack_path)
+        directory, prefix = os.path.split(root)
+        versions = []
+        try:
+            names = os.listdir(directory or ".")
+        except OSError:
+            return []
+        for file_name in names:
+            if not (file_name.startswith(prefix + ".") and file_name.endswith(ext)):
+                continue
+            version = file_name[len(prefix) + 1:len(file_name) - len(ext)]
+            try:
+                versions.append((int(version, 16), os.path.join(directory, file_name)))
+            except ValueError:
+                continue
+        return [path for _, path in sorted(versions, reverse=True)]
+
+    def _open(self) -> bool:
+        """映射最新的有效模板包，不存在或格式不符时返回False（调用方持有 _state_lock）"""
+        self.close()
+        for path in self._pack_versions():
+            if self._open_path(path):
+                return True
+        return False
+
+    def _open_path(self, path: str) -> bool:
+        file = mapping = None
+        try:
+            file = open(path, "rb")
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_size = _HEADER.unpack_from(mapping, 0)
+            if magic != _MAGIC:
+                raise ValueError("文件头不匹配")
+            index = json.loads(mapping[_HEADER.size:_HEADER.size + index_size])
+            self._data_start = _data_start(index_size)
+            if index.get("resolution") != list(self.resolution):
+                raise ValueError(f"分辨率不匹配: {index.get('resolution')}")
+        except (OSError, ValueError, struct.error) as e:
+            self._log("warning", f"模板包无效，将重新编译: {os.path.basename(path)} {str(e)}")
+            for handle in (mapping, file):
+                if handle is not None:
+                    handle.close()
+            return False
+        self._file, self._mmap, self._index = file, mapping, index["entries"]
+        self._mapped_path = path
+        return True
+
+    def _is_current(self, sources: dict, metadata: dict) -> bool:
+        if self._mmap is None or sources.keys() != self._index.keys():
+            return False
+        for name, (relative, mtime_ns, size) in sources.items():
+            info = self._index[name]
+            if ([info["source"], info["mtime_ns"], info["size"]] != [relative, mtime_ns, size]
+                    or info.get("metadata") != metadata.get(name)):
+                return False
+        return True
+
+    def _build(self, sources: dict, metadata: dict):
+        """编译模板包：写入新版本文件后切换映射，自己和其他进程已有的映射都不受影响"""
+        blobs = {}
+        index = {}
+        reused = 0
+        for name, (relative, mtime_ns, size) in sources.items():
+            old = self._index.get(name)
+            if old is not None and [old["source"], old["mtime_ns"], old["size"]] == [relative, mtime_ns, size]:
+                image = self.get(name).image
+                reused += 1
+            else:
+                try:
+                    image = self._compile(os.path.join(self.source_dir, relative))
+                except (OSError, ValueError) as e:
+                    self._log("error", f"编译模板 {relative} 失败: {str(e)}")
+                    continue
+            meta = metadata.get(name) or {}
+            roi = meta.get("roi")
+            index[name] = {
+                "source": relative,
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "shape": list(image.shape),
+                "roi": list(self.transform.rect(roi)) if roi else None,
+                "threshold": meta.get("threshold"),
+                "metadata": metadata.get(name),
+            }
+            blobs[name] = image.tobytes()
+
+        # 偏移量相对数据区起点，数据区紧跟索引并按 _ALIGNMENT 对齐
+        offset = 0
+        for name in index:
+            index[name]["offset"] = offset
+            offset += -(-len(blobs[name]) // _ALIGNMENT) * _ALIGNMENT
+        index_bytes = json.dumps({"resolution": list(self.resolution), "base": list(BASE_RESOLUTION),
+                                  "entries": index}, ensure_ascii=False).encode("utf-8")
+        data_start = _data_start(len(index_bytes))
+
+        root, ext = os.path.splitext(self.pack_path)
+        pack_path = f"{root}.{time.time_ns():016x}{ext}"
+        # 先写临时文件，写完再改名，其他进程不会映射到写了一半的文件
+        temp_path = f"{pack_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(index_bytes)))
+            f.write(index_bytes)
+            for name, info in index.items():
+                f.seek(data_start + info["offset"])
+                f.write(blobs[name])
+        os.replace(temp_path, pack_path)
+        with self._state_lock:
+            self.close()
+            if not self._open_path(pack_path):
+                self._open()
+        self._remove_stale_packs()
+        self._log("info", f"模板包已编译: {pack_path} | 模板数: {len(index)} | 复用: {reused}")
+
+    def _remove_stale_packs(self):
+        """删除旧版本模板包；仍被映射（Windows 下本进程未释放的模板数组或其他进程）时跳过，下次重建再删"""
+        # 包括未带版本号的旧格式文件名
+        for path in self._pack_versions() + [self.pack_path]:
+            if path == self._mapped_path or not os.path.exists(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _compile(self, path: str) -> np.ndarray:
+        """解码图片、转换为灰度并按设备坐标变换缩放"""
+        from PIL import Image
+        with Image.open(path) as image:
+            pixels = np.asarray(image.convert("RGB"))
+        gray = transform_template(to_gray(pixels), self.transform)
+        return np.clip(np.rint(gray), 0, 255).astype(np.uint8)
+
+    def _log(self, level: str, message: str):
+        if self.logger:
+            getattr(self.logger, level)(message)
@@ -0,0 +1,327 @@
+from typing import NamedTuple
+
+import numpy as np
+
+MODES = ("gray", "edge")
+
+_GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class Match(NamedTuple):
+    """一个模板匹配结果（坐标均为原图坐标）"""
+    x: int  # 匹配区域中心X
+    y: int  # 匹配区域中心Y
+    score: float  # 归一化互相关系数，范围 [-1, 1]
+    left: int
+    top: int
+    width: int
+    height: int
+    scale: float  # 命中时模板的缩放比例
+
+    @property
+    def center(self) -> tuple[int, int]:
+        return self.x, self.y
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int]:
+        return self.left, self.top, self.left + self.width, self.top + self.height
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """RGBA / RGB / 灰度图转换为 float32 灰度图"""
+    if image.ndim == 2:
+        return image.astype(np.float32, copy=False)
+    return image[..., :3].astype(np.float32) @ _GRAY_WEIGHTS
+
+
+def to_edges(gray: np.ndarray) -> np.ndarray:
+    """灰度图的梯度幅值（中心差分，L1范数），对亮度和配色变化不敏感"""
+    gx = np.zeros_like(gray)
+    gy = np.zeros_like(gray)
+    gx[:, 1:-1] = gray[:, 2:] - gray[:, :-2]
+    gy[1:-1, :] = gray[2:, :] - gray[:-2, :]
+    return np.abs(gx) + np.abs(gy)
+
+
+def resize(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    双线性缩放（支持 (高, 宽) 与 (高, 宽, 通道) 数组）
+
+    :return: float32 数组
+    """
+    src_height, src_width = image.shape[:2]
+    if (src_width, src_height) == (width, height):
+        return image.astype(np.float32, copy=False)
+    # 像素中心对齐的采样坐标
+    ys = np.clip((np.arange(height, dtype=np.float32) + 0.5) * (src_height / height) - 0.5, 0, src_height - 1)
+    xs = np.clip((np.arange(width, dtype=np.float32) + 0.5) * (src_width / width) - 0.5, 0, src_width - 1)
+    y0 = ys.astype(np.intp)
+    x0 = xs.astype(np.intp)
+    y1 = np.minimum(y0 + 1, src_height - 1)
+    x1 = np.minimum(x0 + 1, src_width - 1)
+    wy = (ys - y0)[:, None]
+    wx = (xs - x0)[None, :]
+    if image.ndim == 3:
+        wy = wy[..., None]
+        wx = wx[..., None]
+    source = image.astype(np.float32, copy=False)
+    top = source[y0][:, x0] * (1 - wx) + source[y0][:, x1] * wx
+    bottom = source[y1][:, x0] * (1 - wx) + source[y1][:, x1] * wx
+    return top * (1 - wy) + bottom * wy
+
+
+def _downsample(image: np.ndarray, factor: int) -> np.ndarray:
+    """按 factor×factor 块求平均缩小（金字塔下一层）"""
+    if factor == 1:
+        return image
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    cropped = image[:height * factor, :width * factor]
+    return cropped.reshape(height, factor, width, factor).mean(axis=(1, 3), dtype=np.float32)
+
+
+def _fft_length(n: int) -> int:
+    """不小于 n 的最小 2^a·3^b·5^c，FFT在这些长度上最快"""
+    best = 1 << max(0, (n - 1).bit_length())
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+class _PreparedImage:
+    """预处理后的搜索图像：像素、积分图和频谱（同一帧的多个模板共享）"""
+
+    def __init__(self, pixels: np.ndarray):
+        self.pixels = pixels
+        # 只需要相关结果的有效区域，FFT长度不小于图像尺寸即不会产生环绕混叠
+        self.fft_shape = (_fft_length(pixels.shape[0]), _fft_length(pixels.shape[1]))
+        self._spectrum = None
+        self._integrals = None
+
+    @property
+    def spectrum(self) -> np.ndarray:
+        if self._spectrum is None:
+            self._spectrum = np.fft.rfft2(self.pixels, self.fft_shape)
+        return self._spectrum
+
+    def window_sums(self, height: int, width: int) -> tuple[np.ndarray, np.ndarray]:
+        """每个 height×width 窗口的像素和与像素平方和"""
+        if self._integrals is None:
+            pixels = self.pixels.astype(np.float64)
+            self._integrals = tuple(np.pad(values.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+                                    for values in (pixels, pixels * pixels))
+        return tuple(integral[height:, width:] - integral[:-height, width:]
+                     - integral[height:, :-width] + integral[:-height, :-width]
+                     for integral in self._integrals)
+
+
+def _ncc(image: _PreparedImage, template: np.ndarray) -> np.ndarray:
+    """
+    归一化互相关（FFT计算相关项，积分图计算窗口方差）
+
+    :return: 形状为 (H-h+1, W-w+1) 的得分图，方差为0的窗口得分为0
+    """
+    height, width = template.shape
+    count = height * width
+    centered = template.astype(np.float64) - template.mean(dtype=np.float64)
+    template_norm = np.sqrt((centered * centered).sum())
+    if template_norm < 1e-6:
+        raise ValueError("模板像素值没有变化，无法进行归一化互相关匹配")
+    kernel = np.fft.rfft2(centered[::-1, ::-1], image.fft_shape)
+    correlation = np.fft.irfft2(image.spectrum * kernel, image.fft_shape)
+    rows, cols = image.pixels.shape
+    numerator = correlation[height - 1:rows, width - 1:cols]
+    sums, sums_sq = image.window_sums(height, width)
+    variance = np.maximum(sums_sq - sums * sums / count, 0)
+    denominator = np.sqrt(variance) * template_norm
+    scores = np.zeros_like(numerator)
+    valid = denominator > 1e-6 * template_norm * np.sqrt(count)
+    scores[valid] = numerator[valid] / denominator[valid]
+    return np.clip(scores, -1, 1, out=scores)
+
+
+def _peaks(scores: np.ndarray, threshold: float, limit: int) -> list:
+    """得分不低于阈值的 3x3 局部极大值，按得分从高到低最多返回 limit 个 (x, y, score)"""
+    ys, xs = np.nonzero(scores >= threshold)
+    if not len(ys):
+        return []
+    values = scores[ys, xs]
+    padded = np.pad(scores, 1, constant_values=-np.inf)
+    is_peak = np.ones(len(ys), dtype=bool)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dy != 1 or dx != 1:
+                is_peak &= values >= padded[ys + dy, xs + dx]
+    ys, xs, values = ys[is_peak], xs[is_peak], values[is_peak]
+    order = np.argsort(-values, kind="stable")[:limit]
+    return [(int(xs[i]), int(ys[i]), float(values[i])) for i in order]
+
+
+def _iou(a: Match, b: Match) -> float:
+    left, top = max(a.left, b.left), max(a.top, b.top)
+    right = min(a.left + a.width, b.left + b.width)
+    bottom = min(a.top + a.height, b.top + b.height)
+    if right <= left or bottom <= top:
+        return 0.0
+    inter = (right - left) * (bottom - top)
+    return inter / (a.width * a.height + b.width * b.height - inter)
+
+
+def non_max_suppression(matches: list, top_k: int, overlap: float = 0.3) -> list:
+    """按得分从高到低保留互相重叠（IoU）不超过 overlap 的结果，最多 top_k 个"""
+    kept = []
+    for match in sorted(matches, key=lambda item: -item.score):
+        if all(_iou(match, other) <= overlap for other in kept):
+            kept.append(match)
+            if len(kept) >= top_k:
+                break
+    return kept
+
+
+class TemplateMatcher:
+    """
+    单帧模板匹配器
+
+    同一帧上的预处理结果（灰度/边缘图、积分图、FFT频谱）按 ROI 与金字塔层级缓存，
+    对同一帧匹配多个模板时只计算一次：
+
+        matcher = TemplateMatcher(frame)
+        for template in templates:
+            matches = matcher.find(template, roi=(0, 0, 960, 540))
+    """
+
+    def __init__(self, frame: np.ndarray, mode: str = "gray"):
+        """
+        :param frame: 截图，(高, 宽, 4) RGBA、(高, 宽, 3) RGB 或 (高, 宽) 灰度数组
+        :param mode: gray（灰度）或 edge（梯度幅值，适合配色/亮度会变化的图标）
+        """
+        if mode not in MODES:
+            raise ValueError(f"不支持的匹配模式: {mode}，可选 {MODES}")
+        self.frame = frame
+        self.mode = mode
+        self.height, self.width = frame.shape[:2]
+        self._prepared = {}
+
+    def _prepare_template(self, template: np.ndarray, scale: float) -> np.ndarray:
+        gray = to_gray(template)
+        if scale != 1.0:
+            height, width = gray.shape
+            gray = resize(gray, max(1, round(width * scale)), max(1, round(height * scale)))
+        return to_edges(gray) if self.mode == "edge" else gray
+
+    def _prepared_image(self, roi: tuple, level: int) -> _PreparedImage:
+        key = (roi, level)
+        prepared = self._prepared.get(key)
+        if prepared is None:
+            left, top, right, bottom = roi
+            pixels = to_gray(self.frame[top:bottom, left:right])
+            if self.mode == "edge":
+                pixels = to_edges(pixels)
+            prepared = _PreparedImage(_downsample(pixels, 1 << level))
+            self._prepared[key] = prepared
+        return prepared
+
+    def _clip_roi(self, roi) -> tuple:
+        if roi is None:
+            return 0, 0, self.width, self.height
+        left, top, right, bottom = (int(round(value)) for value in roi)
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(self.width, right), min(self.height, bottom)
+        if right <= left or bottom <= top:
+            raise ValueError(f"ROI 超出画面范围: {roi}")
+        return left, top, right, bottom
+
+    def scores(self, template: np.ndarray, roi: tuple = None, scale: float = 1.0) -> np.ndarray:
+        """
+        完整的得分图（不做阈值与极大值筛选）
+
+        :return: 形状为 (ROI高-模板高+1, ROI宽-模板宽+1) 的 float64 数组，模板大于ROI时为空数组
+        """
+        roi = self._clip_roi(roi)
+        pattern = self._prepare_template(template, scale)
+        image = self._prepared_image(roi, 0)
+        if pattern.shape[0] > image.pixels.shape[0] or pattern.shape[1] > image.pixels.shape[1]:
+            return np.empty((0, 0))
+        return _ncc(image, pattern)
+
+    def find(self, template: np.ndarray, roi: tuple = None, threshold: float = 0.8, scales=(1.0,),
+             top_k: int = 1, overlap: float = 0.3, pyramid: int = None) -> list:
+        """
+        在帧中查找模板
+
+        :param template: 模板图像，通道格式同 frame
+        :param roi: 搜索区域 (left, top, right, bottom)，默认整帧
+        :param threshold: 最低得分
+        :param scales: 模板缩放比例序列，用于匹配不同尺寸的同一元素
+        :param top_k: 最多返回的结果数
+        :param overlap: 非极大值抑制的 IoU 上限
+        :param pyramid: 金字塔层数，先在缩小 2^pyramid 倍的图像上粗搜、再在原图上局部精确匹配；
+                        None 表示按模板尺寸自动选择（模板越大层数越多，最多2层）
+        :return: 匹配结果列表，按得分从高到低排序
+        """
+        roi = self._clip_roi(roi)
+        candidates = []
+        for scale in scales:
+            pattern = self._prepare_template(template, scale)
+            height, width = pattern.shape
+            if height > roi[3] - roi[1] or width > roi[2] - roi[0] or min(height, width) < 3:
+                continue
+            level = self._auto_level(height, width) if pyramid is None else pyramid
+            for x, y, score in self._search(pattern, roi, threshold, top_k, level):
+                candidates.append(Match(roi[0] + x + width // 2, roi[1] + y + height // 2, score,
+                                        roi[0] + x, roi[1] + y, width, height, scale))
+        return non_max_suppression(candidates, top_k, overlap)
+
+    @staticmethod
+    def _auto_level(height: int, width: int) -> int:
+        # 保证最粗一层的模板短边不少于16像素
+        level = 0
+        while level < 2 and min(height, width) >> (level + 1) >= 16:
+            level += 1
+        return level
+
+    def _search(self, pattern: np.ndarray, roi: tuple, threshold: float, top_k: int, level: int) -> list:
+        """返回 ROI 内坐标系下的 (x, y, score)"""
+        limit = max(top_k * 8, 16)
+        if level == 0:
+            return _peaks(_ncc(self._prepared_image(roi, 0), pattern), threshold, limit)
+        factor = 1 << level
+        coarse_pattern = _downsample(pattern, factor)
+        coarse = self._prepared_image(roi, level)
+        if coarse_pattern.shape[0] > coarse.pixels.shape[0] or coarse_pattern.shape[1] > coarse.pixels.shape[1]:
+            return _peaks(_ncc(self._prepared_image(roi, 0), pattern), threshold, limit)
+        # 缩小后细节损失，粗搜阈值适当放宽，最终以原图精确得分为准
+        coarse_hits = _peaks(_ncc(coarse, coarse_pattern), threshold - 0.15 * level, limit)
+        full = self._prepared_image(roi, 0).pixels
+        height, width = pattern.shape
+        radius = factor + 1
+        results = []
+        for cx, cy, _ in coarse_hits:
+            left = max(0, cx * factor - radius)
+            top = max(0, cy * factor - radius)
+            right = min(full.shape[1], cx * factor + width + radius)
+            bottom = min(full.shape[0], cy * factor + height + radius)
+            if right - left < width or bottom - top < height:
+                continue
+            local = _ncc(_PreparedImage(full[top:bottom, left:right]), pattern)
+            for x, y, score in _peaks(local, threshold, 1):
+                results.append((left + x, top + y, score))
+        return results
+
+
+def find_template(frame: np.ndarray, template: np.ndarray, roi: tuple = None, threshold: float = 0.8,
+                  mode: str = "gray", scales=(1.0,), top_k: int = 1, overlap: float = 0.3,
+                  pyramid: int = None) -> list:
+    """
+    在帧中查找模板（参数见 TemplateMatcher.find）；同一帧需要匹配多个模板时直接使用 TemplateMatcher 以复用预处理结果
+
+    :return: 匹配结果列表，按得分从高到低排序
+    """
+    return TemplateMatcher(frame, mode).find(template, roi, threshold, scales, top_k, overlap, pyramid)
@@ -0,0 +1,176 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class OcrCache:
+    """
+    OCR结果缓存（LRU），线程安全（进程内共享）
+
+    插件轮询界面时同一个标签会被反复识别。缓存以裁剪区域像素和引擎参数的哈希为键，
+    相同画面直接返回上次的识别结果（微秒级），不再调用引擎（上百毫秒）。
+    同时限制条目数和总字节数，超出时淘汰最久未使用的条目。
+
+    只缓存识别成功（100）和没有文字（101）的结果；文本框坐标相对于裁剪区域保存，
+    同一标签出现在屏幕不同位置时同样命中。
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 4 * 1024 * 1024, path: str = None,
+                 logger=None):
+        """
+        :param max_entries: 最大条目数
+        :param max_bytes: 缓存结果的最大总字节数（按结果JSON长度估算）
+        :param path: 持久化文件路径，提供时启动时加载、程序退出时保存；None表示只在内存中缓存
+        :param logger: 日志记录器对象
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.logger = logger
+        self._entries = OrderedDict()  # 键 -> (结果, 字节数)
+        self._bytes = 0
+        self._entry_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    @classmethod
+    def get_instance(cls, path: str = None, **kwargs):
+        """获取缓存实例（单例模式，按持久化路径区分；其他参数仅在首次创建时生效）"""
+        key = os.path.abspath(path) if path else None
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(path=path, **kwargs)
+            return cls._instances[key]
+
+    @staticmethod
+    def key(pixels: np.ndarray, args=None) -> str:
+        """
+        计算缓存键：像素内容、形状和引擎参数的 blake2b 哈希
+
+        :param pixels: 裁剪后的图片数组
+        :param args: 影响识别结果的引擎参数（可JSON序列化）
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{pixels.shape}{pixels.dtype}".encode())
+        if args is not None:
+            digest.update(json.dumps(args, sort_keys=True, default=str).encode())
+        digest.update(np.ascontiguousarray(pixels).data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """取出缓存结果并标记为最近使用，未命中返回None"""
+        with self._entry_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: str, result: dict) -> bool:
+        """
+        保存识别结果
+
+        :return: 是否已缓存（识别失败或单个结果超过字节上限时不缓存）
+        """
+        if result.get("code") not in (100, 101):
+            return False
+        size = len(key) + len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+        with self._entry_lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+        return True
+
+    def clear(self):
+        with self._entry_lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        缓存统计
+
+        :return: {"entries", "bytes", "hits", "misses", "evictions", "hit_rate"}
+        """
+        with self._entry_lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def save(self, path: str = None) -> bool:
+        """
+        把缓存写入JSON文件（先写临时文件再替换，避免中途退出损坏文件）
+
+        :param path: 文件路径，默认为创建时指定的路径
+        :return: 是否保存成功
+        """
+        path = path or self.path
+        if not path:
+            return False
+        with self._entry_lock:
+            entries = [[key, result] for key, (result, _) in self._entries.items()]
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": entries}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"保存OCR缓存失败: {str(e)}")
+            return False
+
+    def load(self, path: str = None) -> int:
+        """
+        从JSON文件加载缓存（按保存时的使用顺序，超出上限的旧条目被淘汰）
+
+        :return: 加载的条目数，文件不存在或损坏时返回0
+        """
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = json.load(f)
+            entries = content["entries"] if content.get("version") == 1 else []
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            if self.logger:
+                self.logger.warning(f"OCR缓存文件无效，已忽略: {str(e)}")
+            return 0
+        loaded = 0
+        for key, result in entries:
+            if isinstance(result, dict) and self.put(key, result):
+                loaded += 1
+        if self.logger:
+            self.logger.debug(f"已加载OCR缓存 {loaded} 条: {path}")
+        return loaded
@@ -7,18 +7,24 @@ import socket  # 套接字
 import atexit  # 退出处理
 import subprocess  # 进程，管道
 import re  # regex
+import threading  # 连接锁，流水线读取线程
+import queue  # 流水线写入队列
+from collections import deque  # 流水线待回复队列
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError  # 流水线请求结果
 from json import loads as jsonLoads, dumps as jsonDumps
 from sys import platform as sysPlatform  # popen静默模式
 from base64 import b64encode  # base64 编码
 
 
 class PPOCR_pipe:  # 调用OCR（管道模式）
-    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None, logger = None):
+    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None, logger = None,
+                 command: list = None):
         """初始化识别器（管道模式）。\n
         `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
         `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
         `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json
         `log`: 日志记录器对象\n
+        `command`: 完整的启动命令列表，提供时代替由以上参数生成的命令（如使用仿真引擎测试）。\n
         """
         # 私有成员变量
         self.__ENABLE_CLIPBOARD = False
@@ -44,6 +50,8 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
                     cmds += [f"--{key}", value]
                 else:
                     cmds += [f"--{key}", str(value)]
+        if command is not None:
+            cmds = list(command)
         # 设置子进程启用静默模式，不显示控制台窗口
         self.ret = None
         startupinfo = None
@@ -181,12 +189,29 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
 class PPOCR_socket(PPOCR_pipe):
     """调用OCR（套接字模式）"""
 
-    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None):
+    # 长连接探测（空指令）的超时秒数
+    PROBE_TIMEOUT = 2
+
+    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None, timeout: float = 30,
+                 keepAlive: bool = False):
         """初始化识别器（套接字模式）。\n
         `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
         `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
         `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json
+        `timeout`: 单次识别的超时秒数（连接超时为其与5秒中的较小值）。\n
+        `keepAlive`: 复用TCP连接（默认关闭，尚未在真实引擎上验证）。首次连接先用空指令短超时探测，\n
+        服务端不回复（需等待连接半关闭）或每次回复后关闭连接时，自动退回每次请求新建连接。\n
         """
+        self.timeout = timeout
+        self.keepAlive = keepAlive
+        self._socket = None
+        self._socketLock = threading.Lock()
+        # 复用的连接连续被服务端关闭的次数，达到2次视为服务端不支持长连接
+        self._reuseFailures = 0
+        # 服务端是否已确认支持在同一连接上不半关闭就回复
+        self._keepAliveVerified = False
+        # 接收缓冲区，按需倍增，避免逐块拼接 bytes 的平方级复制
+        self._recvBuffer = bytearray(64 * 1024)
         # 处理参数
         if not argument:
             argument = {}
@@ -234,7 +259,7 @@ class PPOCR_socket(PPOCR_pipe):
     def getRunningMode(self) -> str:
         return self.__runningMode
 
-    def runDict(self, writeDict: dict):
+    def runDict(self, writeDict: dict, show_log=True):
         """传入指令字典，发送给引擎进程。\n
         `writeDict`: 指令字典。\n
         `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
@@ -246,42 +271,134 @@ class PPOCR_socket(PPOCR_pipe):
                 return {"code": 901, "data": f"子进程已崩溃。"}
 
         # 通信
-        writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
-        try:
-            # 创建TCP连接
-            clientSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            clientSocket.connect((self.ip, self.port))
-            # 发送数据
-            clientSocket.sendall(writeStr.encode())
-            # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
-            clientSocket.shutdown(socket.SHUT_WR)
-            # 接收数据
-            resData = b""
-            while True:
-                chunk = clientSocket.recv(1024)
-                if not chunk:
-                    break
-                resData += chunk
-            getStr = resData.decode()
-        except ConnectionRefusedError:
-            return {"code": 902, "data": "连接被拒绝"}
-        except TimeoutError:
-            return {"code": 903, "data": "连接超时"}
-        except Exception as e:
-            return {"code": 904, "data": f"网络错误：{e}"}
-        finally:
-            clientSocket.close()  # 关闭连接
+        writeBytes = (jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n").encode()
+        with self._socketLock:
+            try:
+                resData = self.__request(writeBytes)
+            except ConnectionRefusedError:
+                return {"code": 902, "data": "连接被拒绝"}
+            except (TimeoutError, socket.timeout):
+                return {"code": 903, "data": "连接超时"}
+            except Exception as e:
+                return {"code": 904, "data": f"网络错误：{e}"}
+        getStr = resData.decode(errors="ignore")
         # 反序列输出信息
         try:
-            return jsonLoads(getStr)
+            result = jsonLoads(getStr)
         except Exception as e:
             return {
                 "code": 905,
                 "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
             }
+        if show_log and getattr(self, "logger", None):
+            self.logger.debug(f"本次orc识别结果为：{result}")
+        return result
+
+    def __request(self, writeBytes: bytes) -> bytes:
+        """发送一行请求并读取一行回复（复用连接时失败会重连重试一次）"""
+        if not self.keepAlive:
+            return self.__requestOnce(writeBytes)
+        if self._socket is None and not self._keepAliveVerified and not self.__probeKeepAlive():
+            # 服务端要等到连接半关闭才回复，退回每次请求新建连接
+            self.keepAlive = False
+            return self.__requestOnce(writeBytes)
+        # 探测留下的连接与复用的连接一样，可能在回复后已被服务端关闭
+        reused = self._socket is not None
+        try:
+            if self._socket is None:
+                self._socket = self.__connect()
+            self._socket.sendall(writeBytes)
+            resData = self.__readLine(self._socket)
+            if resData is not None:
+                if reused:
+                    self._reuseFailures = 0
+                return resData
+        except (TimeoutError, socket.timeout):
+            # 已通过探测确认服务端支持长连接，超时即识别本身超时，不再重发
+            self.__closeSocket()
+            raise
+        except OSError:
+            self.__closeSocket()
+            if not reused:
+                raise
+            # 复用的连接已被服务端关闭，重连后重试
+            return self.__retryClosed(writeBytes)
+        # 服务端未回复就关闭了连接
+        self.__closeSocket()
+        if reused:
+            return self.__retryClosed(writeBytes)
+        self.keepAlive = False
+        return self.__requestOnce(writeBytes)
+
+    def __probeKeepAlive(self) -> bool:
+        """在新连接上以短超时发送空指令，确认服务端不等待半关闭即可回复；成功时保留该连接供后续复用"""
+        clientSocket = self.__connect()
+        try:
+            clientSocket.settimeout(min(self.timeout, self.PROBE_TIMEOUT))
+            clientSocket.sendall(b"{}\n")
+            replied = self.__readLine(clientSocket) is not None
+        except OSError:
+            replied = False
+        if not replied:
+            clientSocket.close()
+            return False
+        clientSocket.settimeout(self.timeout)
+        self._socket = clientSocket
+        self._keepAliveVerified = True
+        return True
+
+    def __retryClosed(self, writeBytes: bytes) -> bytes:
+        """复用的连接已被关闭：偶发（如空闲超时）时重连，连续发生时说明服务端每次回复后都关闭连接"""
+        self._reuseFailures += 1
+        if self._reuseFailures >= 2:
+            self.keepAlive = False
+            return self.__requestOnce(writeBytes)
+        return self.__request(writeBytes)
+
+    def __requestOnce(self, writeBytes: bytes) -> bytes:
+        """每次请求新建连接，发送后半关闭，读取到换行或连接关闭为止"""
+        clientSocket = self.__connect()
+        try:
+            clientSocket.sendall(writeBytes)
+            # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
+            clientSocket.shutdown(socket.SHUT_WR)
+            return self.__readLine(clientSocket) or b""
+        finally:
+            clientSocket.close()
+
+    def __connect(self) -> socket.socket:
+        clientSocket = socket.create_connection((self.ip, self.port), timeout=min(self.timeout, 5))
+        clientSocket.settimeout(self.timeout)
+        clientSocket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return clientSocket
+
+    def __readLine(self, clientSocket: socket.socket):
+        """读取一条以换行结尾的回复（不含换行）；连接关闭时返回已读内容，未读到任何内容返回None"""
+        size = 0
+        while True:
+            if size == len(self._recvBuffer):
+                self._recvBuffer.extend(bytes(len(self._recvBuffer)))
+            with memoryview(self._recvBuffer) as view, view[size:] as target:
+                count = clientSocket.recv_into(target)
+            if count == 0:
+                return bytes(self._recvBuffer[:size]) if size else None
+            end = self._recvBuffer.find(b"\n", size, size + count)
+            size += count
+            if end >= 0:
+                return bytes(self._recvBuffer[:end])
+
+    def __closeSocket(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
 
     def exit(self):
         """关闭引擎子进程"""
+        if hasattr(self, "_socket"):
+            self.__closeSocket()
         # 仅在本地模式下关闭引擎进程
         if hasattr(self, "ret"):
             if self.__runningMode == "local":
@@ -322,6 +439,152 @@ class PPOCR_socket(PPOCR_pipe):
             return None
 
 
+class PPOCR_pipeline(PPOCR_pipe):  # 调用OCR（管道模式，流水线）
+    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None, logger=None,
+                 maxInFlight: int = 4, timeout: float = 60, command: list = None):
+        """初始化识别器（管道流水线模式）。\n
+        引擎按顺序处理管道中的指令并按顺序回复。流水线模式下可以连续提交多条指令而不等待回复：
+        写入线程把指令依次写入管道（图片较大时写入会等待引擎读取，不阻塞提交方），
+        读取线程按提交顺序把回复交给对应的 Future，截图、预处理和提交下一条指令与引擎识别同时进行。\n
+        `exePath`、`modelsPath`、`argument`、`logger`、`command`: 同管道模式。\n
+        `maxInFlight`: 最多同时等待回复的指令数，超出时提交会阻塞等待。\n
+        `timeout`: 同步调用（runDict 等）等待回复的最长秒数。\n
+        """
+        self.maxInFlight = max(1, maxInFlight)
+        self.timeout = timeout
+        self.__pending = deque()  # 按提交顺序等待回复的 Future
+        self.__writeQueue = queue.SimpleQueue()  # 待写入管道的指令，与 __pending 顺序一致
+        self.__submitLock = threading.Lock()  # 保证入队顺序一致
+        self.__slots = threading.BoundedSemaphore(self.maxInFlight)
+        self.__closed = False
+        super().__init__(exePath, modelsPath, argument, logger, command)
+        self.__writer = threading.Thread(
+            target=self.__writeLoop, args=(self.ret.stdin,), name="ocr-pipeline-writer", daemon=True
+        )
+        self.__reader = threading.Thread(
+            target=self.__readLoop, args=(self.ret.stdout,), name="ocr-pipeline-reader", daemon=True
+        )
+        self.__writer.start()
+        self.__reader.start()
+
+    def getRunningMode(self) -> str:
+        return "local"
+
+    def submitDict(self, writeDict: dict) -> Future:
+        """提交指令字典，不等待回复。\n
+        `writeDict`: 指令字典。\n
+        `return`: Future，结果为 {"code": 识别码, "data": 内容列表或错误信息字符串}；
+        可用 future.result() 等待，或在协程中 await asyncio.wrap_future(future)。\n"""
+        future = Future()
+        if not self.ret:
+            future.set_result({"code": 901, "data": f"引擎实例不存在。"})
+            return future
+        writeBytes = (jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n").encode("utf-8")
+        self.__slots.acquire()
+        with self.__submitLock:
+            if self.__closed or not self.ret or not self.ret.poll() == None:
+                self.__slots.release()
+                future.set_result({"code": 902, "data": f"子进程已崩溃。"})
+                return future
+            # 先入待回复队列再写入，读取线程收到回复时 Future 一定已在队列中
+            self.__pending.append(future)
+            self.__writeQueue.put(writeBytes)
+        return future
+
+    def submit(self, imgPath: str) -> Future:
+        """提交一张本地图片，不等待回复。\n"""
+        return self.submitDict({"image_path": imgPath})
+
+    def submitBase64(self, imageBase64: str) -> Future:
+        """提交一张编码为base64字符串的图片，不等待回复。\n"""
+        return self.submitDict({"image_base64": imageBase64})
+
+    def submitBytes(self, imageBytes) -> Future:
+        """提交一张图片的字节流信息，不等待回复。\n"""
+        return self.submitBase64(b64encode(imageBytes).decode("utf-8"))
+
+    def runDict(self, writeDict: dict, show_log=True):
+        """传入指令字典，等待回复（与管道模式用法一致）。\n
+        `writeDict`: 指令字典。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        future = self.submitDict(writeDict)
+        try:
+            result = future.result(self.timeout)
+        except FutureTimeoutError:
+            return {"code": 905, "data": f"等待识别器回复超时（{self.timeout}s）。"}
+        if show_log and self.logger:
+            self.logger.debug(f"本次orc识别结果为：{result}")
+        return result
+
+    def pending(self) -> int:
+        """已提交、尚未收到回复的指令数"""
+        return len(self.__pending)
+
+    def exit(self):
+        """关闭引擎子进程，未收到回复的指令返回错误"""
+        self.__close()
+        super().exit()
+        self.__failPending("识别器进程已关闭。")
+
+    def __close(self):
+        with self.__submitLock:
+            if not self.__closed:
+                self.__closed = True
+                self.__writeQueue.put(None)  # 结束写入线程
+
+    def __writeLoop(self, stdin):
+        while True:
+            writeBytes = self.__writeQueue.get()
+            if writeBytes is None:
+                return
+            try:
+                stdin.write(writeBytes)
+                stdin.flush()
+            except Exception as e:
+                self.__close()
+                self.__failPending(f"向识别器进程传入指令失败，疑似子进程已崩溃。{e}")
+                return
+
+    def __readLoop(self, stdout):
+        while True:
+            try:
+                getBytes = stdout.readline()
+            except Exception:
+                getBytes = b""
+            if not getBytes:
+                break
+            if not getBytes.lstrip().startswith(b"{"):
+                # 引擎输出的提示信息，不是指令的回复
+                continue
+            try:
+                future = self.__pending.popleft()
+            except IndexError:
+                # 没有等待中的指令，忽略
+                continue
+            getStr = getBytes.decode("utf-8", errors="ignore")
+            try:
+                result = jsonLoads(getStr)
+            except Exception as e:
+                result = {
+                    "code": 904,
+                    "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
+                }
+            self.__slots.release()
+            future.set_result(result)
+        self.__close()
+        self.__failPending("子进程已崩溃。")
+
+    def __failPending(self, message: str):
+        while True:
+            try:
+                future = self.__pending.popleft()
+            except IndexError:
+                return
+            self.__slots.release()
+            if not future.done():
+                future.set_result({"code": 902, "data": message})
+
+
 def GetOcrApi(
         exePath: str, modelsPath: str = None, argument: dict = None, ipcMode: str = "pipe", logger=None
 ):
@@ -330,13 +593,16 @@ def GetOcrApi(
     `logger`: 日志记录器对象\n
     `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
     `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
-    `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。用法上完全一致。
+    `ipcMode`: 进程通信模式，可选值为套接字模式`socket`、管道模式`pipe` 或 管道流水线模式`pipeline`。用法上完全一致，
+    流水线模式另外支持 submit* 方法提交指令而不等待回复。
     """
     if ipcMode == "socket":
         return PPOCR_socket(exePath, modelsPath, argument)
     elif ipcMode == "pipe":
         return PPOCR_pipe(exePath, modelsPath, argument, logger)
+    elif ipcMode == "pipeline":
+        return PPOCR_pipeline(exePath, modelsPath, argument, logger)
     else:
         raise Exception(
-            f'ipcMode可选值为 套接字模式"socket" 或 管道模式"pipe" ，不允许{ipcMode}。'
+            f'ipcMode可选值为 套接字模式"socket"、管道模式"pipe" 或 管道流水线模式"pipeline" ，不允许{ipcMode}。'
         )
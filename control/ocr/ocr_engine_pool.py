@@ -0,0 +1,277 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from control.ocr.ocr_controller import GetOcrApi
+
+
+class _EngineSlot:
+    """池中的一个引擎及其统计"""
+
+    def __init__(self, index: int, engine):
+        self.index = index
+        self.engine = engine
+        self.requests = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.checked_out_at = None
+        self.created_at = time.monotonic()
+
+
+class OcrEnginePool:
+    """
+    OCR引擎池，线程安全（进程内按识别器路径共享）
+
+    PaddleOCR-json 每个进程占用数百MB内存、启动需要数秒。引擎池按CPU核数限制引擎数量，
+    引擎在首次需要时才启动；各设备线程使用时借出、用完归还，没有空闲引擎时排队等待：
+
+        pool = OcrEnginePool.get_instance("control/ocr/PaddleOCR/PaddleOCR-json.exe")
+        with pool.engine() as ocr:
+            result = ocr.runBytes(image_bytes)
+
+    或通过 proxy() 得到与单个引擎用法一致的对象，每次调用自动借出和归还。
+    """
+
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, exe_path: str, size: int = None, models_path: str = None, argument: dict = None,
+                 ipc_mode: str = "pipe", logger=None, engine_factory=None):
+        """
+        :param exe_path: 识别器 PaddleOCR-json.exe 的路径
+        :param size: 最大引擎数，默认为CPU核数的一半（至少1个）
+        :param models_path: 识别库 models 文件夹的路径
+        :param argument: 引擎启动参数
+        :param ipc_mode: 进程通信模式 pipe、pipeline 或 socket
+        :param logger: 日志记录器对象
+        :param engine_factory: 创建引擎的函数，默认使用 GetOcrApi
+        """
+        self.exe_path = exe_path
+        self.models_path = models_path
+        self.argument = argument
+        self.size = size or max(1, (os.cpu_count() or 2) // 2)
+        self.logger = logger
+        self._factory = engine_factory or (
+            lambda: GetOcrApi(exe_path, models_path, argument, ipc_mode, logger=logger))
+        self._cond = threading.Condition()
+        self._slots = []  # 全部引擎
+        self._idle = []  # 空闲引擎（后进先出，优先复用刚用过的引擎）
+        self._starting = 0  # 正在启动的引擎数
+        self._waiting = 0  # 排队等待的请求数
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._timeouts = 0
+        self._closed = False
+        self._next_index = 0
+
+    @classmethod
+    def get_instance(cls, exe_path: str, size: int = None, logger=None, **kwargs):
+        """获取引擎池实例（单例模式，按识别器路径区分；size 等参数仅在首次创建时生效）"""
+        key = os.path.abspath(exe_path)
+        with cls._lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(exe_path, size, logger=logger, **kwargs)
+            return cls._instances[key]
+
+    def checkout(self, timeout: float = None):
+        """
+        借出一个引擎，没有空闲引擎且已达上限时等待
+
+        :param timeout: 最长等待秒数，None表示一直等待
+        :return: 引擎槽位（通过 .engine 访问引擎），用完必须调用 checkin 归还
+        :raises TimeoutError: 等待超时
+        :raises RuntimeError: 引擎池已关闭
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("OCR引擎池已关闭")
+                    if self._idle:
+                        slot = self._idle.pop()
+                        break
+                    if len(self._slots) + self._starting < self.size:
+                        self._starting += 1
+                        slot = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._timeouts += 1
+                        raise TimeoutError(f"等待空闲OCR引擎超时（{timeout}s）")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - started
+            self._waits += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        if slot is None:
+            slot = self._start_engine()
+        slot.checked_out_at = time.monotonic()
+        return slot
+
+    def checkin(self, slot: _EngineSlot, failed: bool = False):
+        """
+        归还引擎
+
+        :param failed: 本次使用是否失败；引擎进程已退出时会被移出池，之后按需重新启动
+        """
+        now = time.monotonic()
+        with self._cond:
+            slot.requests += 1
+            slot.errors += int(failed)
+            if slot.checked_out_at is not None:
+                slot.busy_seconds += now - slot.checked_out_at
+                slot.checked_out_at = None
+            if self._closed or not self._is_alive(slot.engine):
+                if slot in self._slots:
+                    self._slots.remove(slot)
+                if not self._closed and self.logger:
+                    self.logger.warning(f"OCR引擎#{slot.index}已退出，移出引擎池")
+                self._exit_engine(slot.engine)
+            else:
+                self._idle.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def engine(self, timeout: float = None):
+        """借出引擎的上下文管理器，退出时自动归还"""
+        slot = self.checkout(timeout)
+        failed = False
+        try:
+            yield slot.engine
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.checkin(slot, failed)
+
+    def proxy(self, timeout: float = None) -> "PooledOcrApi":
+        """与单个引擎用法一致的代理对象，每次识别调用自动借出和归还引擎"""
+        return PooledOcrApi(self, timeout)
+
+    def stats(self) -> dict:
+        """
+        引擎池统计
+
+        :return: {"size", "started", "idle", "busy", "waiting", "waits", "mean_wait_ms", "max_wait_ms", "timeouts",
+                  "engines": [{"index", "requests", "errors", "busy_seconds", "utilization"}]}，
+                 utilization 为引擎启动以来处于借出状态的时间比例
+        """
+        now = time.monotonic()
+        with self._cond:
+            engines = []
+            for slot in self._slots:
+                busy = slot.busy_seconds + (now - slot.checked_out_at if slot.checked_out_at is not None else 0)
+                lifetime = max(now - slot.created_at, 1e-9)
+                engines.append({
+                    "index": slot.index,
+                    "requests": slot.requests,
+                    "errors": slot.errors,
+                    "busy_seconds": round(busy, 3),
+                    "utilization": round(busy / lifetime, 3),
+                })
+            return {
+                "size": self.size,
+                "started": len(self._slots),
+                "idle": len(self._idle),
+                "busy": len(self._slots) - len(self._idle),
+                "waiting": self._waiting,
+                "waits": self._waits,
+                "mean_wait_ms": round(self._wait_seconds / self._waits * 1000, 2) if self._waits else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 2),
+                "timeouts": self._timeouts,
+                "engines": engines,
+            }
+
+    def close(self):
+        """关闭全部空闲引擎；借出中的引擎在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for slot in idle:
+                self._slots.remove(slot)
+            self._cond.notify_all()
+        for slot in idle:
+            self._exit_engine(slot.engine)
+
+    def _start_engine(self) -> _EngineSlot:
+        started = time.monotonic()
+        try:
+            engine = self._factory()
+        except BaseException:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            slot = _EngineSlot(self._next_index, engine)
+            self._next_index += 1
+            self._slots.append(slot)
+        if self.logger:
+            self.logger.info(f"OCR引擎#{slot.index}已启动 | 耗时: {time.monotonic() - started:.2f}s | "
+                             f"引擎数: {len(self._slots)}/{self.size}")
+        return slot
+
+    @staticmethod
+    def _is_alive(engine) -> bool:
+        process = getattr(engine, "ret", None)
+        if process is None:
+            # 远程套接字模式没有本地进程
+            return getattr(engine, "getRunningMode", lambda: "local")() == "remote"
+        return process.poll() is None
+
+    @staticmethod
+    def _exit_engine(engine):
+        try:
+            engine.exit()
+        except Exception:
+            pass
+
+
+class PooledOcrApi:
+    """
+    引擎池代理：提供与 PPOCR_pipe 相同的识别方法，每次调用从池中借出引擎
+
+    借出超时或引擎启动失败时与引擎本身一样返回 {"code": 错误码, "data": 错误信息}。
+    """
+
+    def __init__(self, pool: OcrEnginePool, timeout: float = None):
+        self.pool = pool
+        self.timeout = timeout
+
+    def _call(self, method: str, *args, **kwargs) -> dict:
+        try:
+            slot = self.pool.checkout(self.timeout)
+        except TimeoutError as e:
+            return {"code": 906, "data": str(e)}
+        except Exception as e:
+            return {"code": 907, "data": f"获取OCR引擎失败：{e}"}
+        failed = True
+        try:
+            result = getattr(slot.engine, method)(*args, **kwargs)
+            failed = not isinstance(result, dict) or result.get("code") not in (100, 101)
+            return result
+        finally:
+            self.pool.checkin(slot, failed)
+
+    def run(self, imgPath: str) -> dict:
+        return self._call("run", imgPath)
+
+    def runDict(self, writeDict: dict, *args, **kwargs) -> dict:
+        return self._call("runDict", writeDict, *args, **kwargs)
+
+    def runBase64(self, imageBase64: str, *args, **kwargs) -> dict:
+        return self._call("runBase64", imageBase64, *args, **kwargs)
+
+    def runBytes(self, imageBytes, *args, **kwargs) -> dict:
+        return self._call("runBytes", imageBytes, *args, **kwargs)
+
+    def exit(self):
+        """代理不持有引擎，引擎由引擎池统一关闭"""
@@ -3,7 +3,7 @@ import re
 import time
 import win32gui
 import subprocess
-from lxml import etree
+from control.image.hierarchy import Selector
 from log.log_factory import get_logger
 from simulator.base.simulator_base import SimulatorBase
 from simulator.manager.simulator_manager import SimulatorManager
@@ -14,6 +14,14 @@ class MuMuSimulator(SimulatorBase):
     MuMu模拟器实现类
     """
 
+    AD_CLOSE = Selector("resource-id", "com.mumu.launcher:id/close")
+    PAGE_INDICATOR = Selector("resource-id", "com.mumu.launcher:id/page_indicator")
+    # 桌面页在界面分类器中的标签前缀
+    LAUNCHER_LABEL = "mumu/launcher/"
+    # 各桌面页共用壁纸、Dock栏和图标网格，彼此很接近：只有距离足够小且明显小于次近页时才认定为已搜索页
+    PAGE_MATCH_DISTANCE = 8
+    PAGE_MATCH_MARGIN = 24
+
     def __init__(self, window_name: str, window_class: str, simulator_path: str, simulator_type: str, port: int, account: str, icon: str):
         """
         初始化MuMu模拟器
@@ -36,8 +44,11 @@ class MuMuSimulator(SimulatorBase):
         self.simulator_path = os.path.normpath(simulator_path)
         self.simulator = SimulatorManager.get_simulator_instance(port, account, simulator_type)
         self.logger = get_logger(self.__class__.__name__, port, account, simulator_type)
-        self.xml_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "res", "xml", "window_dump.xml")
         self._is_screen_initialized = False
+        # 最近一次刷新时查找到的桌面节点（页面指示器和游戏图标），定位图标时复用，避免同一屏重复dump
+        self._screen_nodes = None
+        # 本次启动中已dump确认未找到图标的桌面页（屏号），登记在界面分类器中，只用于选择滑动方向和避免重复dump
+        self._searched_pages = set()
 
     def run(self) -> bool:
         result = False
@@ -120,10 +131,7 @@ class MuMuSimulator(SimulatorBase):
                 self.logger.info("ADB断开连接成功")
             else:
                 self.logger.warning("ADB断开连接失败")
-
-            # 通过ADB关闭模拟器
-            cmd = ["adb", "kill-server"]
-            subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            # 不再执行 adb kill-server：adb server 由所有模拟器实例共享，关闭会中断其他设备的连接
 
             self.logger.info(f"MuMu模拟器停止成功: {self.window_name}")
             return True
@@ -181,27 +189,35 @@ class MuMuSimulator(SimulatorBase):
         self.logger.hr("启动游戏----开始", level=3)
         # TODO 关闭游戏前需判断在能识别的首页时则不进行关闭应用,直接返回成功
         if self.simulator.adb.close_simulator_game(self.game_package):
+            self._reset_searched_pages()
             if self._refresh_screen():
                 # 首次尝试直接定位
                 if self._try_launch():
                     return True
                 else:
+                    self._mark_searched_page()
                     if self.page <= 1:
                         self.logger.debug("只有一页，无需滑动查找")
                         return False
-                    # 计算滑动策略
-                    self.logger.debug(f"开始循环滑动查找，最大尝试次数: {self.page}")
-                    for attempt in range(1, self.page + 1):
-                        # 动态判断滑动方向
-                        if self.count > 1:
-                            # 优先向左滑动查找
-                            self.simulator.adb.swipe_left() if attempt % 2 == 1 else self.simulator.adb.swipe_right()
+                    # 每次滑向最近的未搜索页；只有dump确认过的页才算已搜索，分类误判只会多滑动，不会漏掉页面
+                    self.logger.debug(f"开始循环滑动查找，共{self.page}屏")
+                    for _ in range(self.page * 2):
+                        target = self._next_unsearched_page()
+                        if target is None:
+                            break
+                        if target < self.count:
+                            # 回到上一屏
+                            self.simulator.adb.swipe_left()
                         else:
-                            # 从首页直接向右滑动
+                            # 前往下一屏
                             self.simulator.adb.swipe_right()
-                        self._refresh_screen()
+                        if self._is_searched_page():
+                            continue
+                        refreshed = self._refresh_screen()
                         if self._try_launch():
                             return True
+                        if refreshed:
+                            self._mark_searched_page()
         self.logger.hr("启动游戏----结束", level=3)
         return False
 
@@ -212,7 +228,8 @@ class MuMuSimulator(SimulatorBase):
             self.logger.info("初始化模拟器屏幕相关页数...")
             self._is_screen_initialized = True
             
-        if self._get_simulator_screen_info():
+        self._screen_nodes = self._find_launcher_nodes()
+        if self._get_simulator_screen_info(self._screen_nodes):
             if self._is_screen_initialized:
                 self.logger.info("屏幕数据已刷新")
             else:
@@ -227,7 +244,12 @@ class MuMuSimulator(SimulatorBase):
 
     def _try_launch(self):
         self.logger.info("正在尝试定位并启动游戏...")
-        bounds = self.simulator.image.get_simulator_ui_bounds(self.icon)
+        # 与页数解析共用 _refresh_screen 得到的同一次dump
+        nodes, self._screen_nodes = self._screen_nodes, None
+        if nodes is None:
+            nodes = self._find_launcher_nodes()
+        icon = nodes.get("icon") if nodes else None
+        bounds = icon.center if icon else None
         if bounds is not None:
             self.logger.debug(f"已定位游戏图标坐标: {bounds}")
             self.simulator.adb.click(bounds[0], bounds[1])
@@ -236,44 +258,87 @@ class MuMuSimulator(SimulatorBase):
             self.logger.error("当前屏幕未检测到游戏图标")
             return False
 
-    def _get_simulator_screen_info(self) -> bool:
+    def _next_unsearched_page(self) -> int | None:
+        """距当前屏最近的未搜索页（距离相同时优先上一屏），全部搜索过时返回None"""
+        unsearched = [page for page in range(1, self.page + 1) if page not in self._searched_pages]
+        if not unsearched:
+            return None
+        return min(unsearched, key=lambda page: (abs(page - self.count), page))
+
+    def _reset_searched_pages(self):
+        """开始新一次启动：清空已搜索页，并移除之前登记的桌面页样本（图标可能已移动，旧样本会让未搜索页被误判为已搜索）"""
+        self._searched_pages.clear()
+        screens = self.simulator.image.screens
+        for label in screens.labels():
+            if label.startswith(self.LAUNCHER_LABEL):
+                screens.remove(label)
+
+    def _mark_searched_page(self):
+        """将当前桌面页（刚dump确认的屏号）登记为已搜索"""
+        frame = self.simulator.image.take_screenshot(max_age_ms=500)
+        if frame is None or not self.count:
+            return
+        self.simulator.image.screens.register(f"{self.LAUNCHER_LABEL}{self.count}", frame, unique=True)
+        self._searched_pages.add(self.count)
+
+    def _is_searched_page(self) -> bool:
+        """
+        滑动后的界面是否可以确定为已搜索过的桌面页（此时跳过dump，继续滑向未搜索页）
+
+        先等待滑动动画结束；画面未稳定、距离不够小或与次近页区分不明显时一律返回False，按原流程dump确认
+        """
+        settled = self.simulator.frames.wait_until_stable(max_wait=2.0, min_wait=0.2)
+        if not settled.stable or settled.frame is None:
+            return False
+        matches = self.simulator.image.screens.nearest(settled.frame.image, k=2)
+        if not matches or not matches[0].label.startswith(self.LAUNCHER_LABEL):
+            return False
+        best = matches[0]
+        # 只登记了一页时无法与其他页比较，不能排除是外观相近的未搜索页
+        if (best.distance > self.PAGE_MATCH_DISTANCE or len(matches) < 2
+                or matches[1].distance - best.distance < self.PAGE_MATCH_MARGIN):
+            return False
+        page = int(best.label[len(self.LAUNCHER_LABEL):])
+        if page not in self._searched_pages:
+            return False
+        self.count = page
+        self.logger.debug(f"当前为已搜索过的第{self.count}屏（距离: {best.distance}），跳过布局获取")
+        return True
+
+    def _find_launcher_nodes(self) -> dict | None:
+        """一次dump同时查找页面指示器和游戏图标（均命中后停止解析）"""
+        return self.simulator.image.find_nodes({
+            "indicator": self.PAGE_INDICATOR,
+            "icon": Selector("text", self.icon),
+        })
+
+    def _get_simulator_screen_info(self, nodes=None) -> bool:
         """
         获取模拟器当前屏幕信息（当前屏号和总屏数）
 
+        Args:
+            nodes: _find_launcher_nodes 的查找结果，为None时重新获取
+
         Returns:
             str: 格式化的屏幕信息字符串，如"当前所在屏幕：第1屏，共2屏"
             None: 解析失败时返回None
         """
         try:
-            # 使用端口号和账号构建唯一文件名，避免多实例冲突
-            xml_dir = os.path.dirname(self.xml_path)
-            base_name = os.path.splitext(os.path.basename(self.xml_path))[0]
-            ext = os.path.splitext(self.xml_path)[1]
-
-            # 构建基于端口和账号的唯一文件名
-            unique_filename = f"{base_name}_{self.port}_{self.simulator.account}{ext}"
-            unique_xml_path = os.path.join(xml_dir, unique_filename)
-
-            # 确保目标目录存在
-            if not os.path.exists(xml_dir):
-                os.makedirs(xml_dir)
-
-            # 下载XML文件
-            if not self.simulator.adb.download_window_dump(unique_xml_path):
-                self.logger.error("下载模拟器布局文件失败")
+            if nodes is None:
+                nodes = self._find_launcher_nodes()
+            if nodes is None:
+                self.logger.error("获取模拟器布局失败")
                 return False
             else:
                 self.logger.info("正在解析当前模拟器屏幕数据...")
-                tree = etree.parse(unique_xml_path)
-                root = tree.getroot()
 
                 # 定位页面指示器节点
-                target_nodes = root.xpath('//node[@resource-id="com.mumu.launcher:id/page_indicator"]')
-                if not target_nodes:
+                target_node = nodes["indicator"]
+                if target_node is None:
                     self.logger.error("未找到页面指示器节点")
                     return False
 
-                content_desc = target_nodes[0].get("content-desc", "")
+                content_desc = target_node.get("content-desc", "")
                 if not content_desc:
                     self.logger.error("content-desc 属性为空")
                     return False
@@ -311,7 +376,8 @@ class MuMuSimulator(SimulatorBase):
         """
         self.logger.info("正在检测启动模拟器后的广告 -X-")
 
-        bounds = self.simulator.image.get_simulator_ui_bounds("com.mumu.launcher:id/close", "resource-id")
+        found = self.simulator.image.find_many({"close": self.AD_CLOSE})
+        bounds = found["close"] if found else None
         if bounds is not None:
             self.simulator.adb.click(bounds[0], bounds[1])
             self.logger.info("成功关闭启动模拟器后的广告")
@@ -1,6 +1,11 @@
+import numpy as np
+
 from control.adb.adb_controller import ADBController
+from control.image.frame_stream import Frame, FrameStream
 from control.image.image_controller import ImageController
-from control.ocr.ocr_controller import GetOcrApi
+from control.ocr import ocr_region
+from control.ocr.ocr_cache import OcrCache
+from control.ocr.ocr_engine_pool import OcrEnginePool
 from log.log_factory import get_logger
 
 
@@ -12,8 +17,66 @@ class SimulatorInstance:
         self.account = account
         self.adb = ADBController.get_instance(port, account, simulator_type)
         self.image = ImageController.get_instance(port, account, simulator_type)
-        self.ocr = GetOcrApi('control/ocr/PaddleOCR/PaddleOCR-json.exe', logger=get_logger("OCR-API", port, account, simulator_type))
+        # 截图流按设备共享，同一设备的其他实例仍在使用时不能停止
+        self.frames = FrameStream.get_instance(port, account, simulator_type)
+        self.frames.acquire()
+        ocr_logger = get_logger("OCR-API", port, account, simulator_type)
+        # 所有设备线程共享的OCR引擎池（引擎数按CPU核数限制，首次识别时才启动引擎），用法与单个引擎一致
+        self.ocr_pool = OcrEnginePool.get_instance('control/ocr/PaddleOCR/PaddleOCR-json.exe', logger=ocr_logger)
+        self.ocr = self.ocr_pool.proxy()
+        # 区域识别结果缓存（所有设备共享，跨运行保存），相同画面不再调用引擎
+        self.ocr_cache = OcrCache.get_instance('control/ocr/.ocr_cache.json', logger=ocr_logger)
+
+    def ocr_region(self, frame, rect: tuple, base: bool = False, padding: int = 4, max_age_ms: float = 200,
+                   use_cache: bool = True) -> dict:
+        """
+        只识别屏幕中的一个区域（如体力数字、按钮文字），识别耗时与像素数成正比，远快于整屏识别；
+        区域像素与之前识别过的完全相同时直接返回缓存结果
+
+        用法：
+            result = instance.ocr_region(None, (1500, 20, 1700, 70), base=True)
+            if result["code"] == 100:
+                text = result["data"][0]["text"]
+
+        :param frame: 截图（Frame 或数组），None 时从截图流获取
+        :param rect: 区域 (left, top, right, bottom)，默认为设备坐标
+        :param base: rect 是否为基准分辨率（1920x1080）坐标
+        :param padding: 区域向外扩展的像素数
+        :param max_age_ms: 未提供 frame 时可接受的最大帧龄
+        :param use_cache: 是否使用识别结果缓存（见 self.ocr_cache）
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}，文本框为屏幕坐标
+        """
+        return self.ocr_regions(frame, [rect], base, padding, max_age_ms, use_cache)[0]
+
+    def ocr_regions(self, frame, rects: list, base: bool = False, padding: int = 4,
+                    max_age_ms: float = 200, use_cache: bool = True) -> list:
+        """
+        识别屏幕中的多个区域，多个区域拼接后一次调用引擎
+
+        :param rects: 区域列表 [(left, top, right, bottom), ...]
+        :return: 与 rects 一一对应的识别结果列表，参数和结果格式同 ocr_region
+        """
+        frame = self._resolve_frame(frame, max_age_ms)
+        if frame is None:
+            return [{"code": 908, "data": "截图失败"} for _ in rects]
+        if base:
+            transform = self.adb.transform
+            if transform is None:
+                return [{"code": 909, "data": "设备分辨率获取失败，无法换算识别区域"} for _ in rects]
+            rects = [transform.rect(rect) for rect in rects]
+        cache = self.ocr_cache if use_cache else None
+        # 识别器、识别库或启动参数不同时识别结果可能不同，一并作为缓存键
+        cache_args = [self.ocr_pool.exe_path, self.ocr_pool.models_path, self.ocr_pool.argument]
+        return ocr_region.ocr_regions(self.ocr, frame, rects, padding, cache=cache, cache_args=cache_args)
+
+    def _resolve_frame(self, frame, max_age_ms: float) -> np.ndarray | None:
+        if isinstance(frame, Frame):
+            return frame.image
+        if frame is None:
+            return self.image.take_screenshot(max_age_ms)
+        return frame
 
     def cleanup(self):
         """清理资源"""
-        self.adb.disconnect(self.port)
\ No newline at end of file
+        self.frames.release()
+        self.adb.disconnect(self.port)
@@ -0,0 +1,100 @@
+import logging
+import os
+import subprocess
+import unittest
+from unittest import mock
+
+from benchmark.fake_adb_server import FakeADBServer
+from control.adb.adb_protocol import ADBProtocolClient, ADBProtocolError
+from control.adb.adb_socket_controller import ADBSocketController
+
+SERIAL = "127.0.0.1:16384"
+
+
+@unittest.skipIf(os.name == "nt", "伪 adb server 仅支持 Linux / macOS")
+class ADBProtocolClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeADBServer([SERIAL]).start()
+        self.device = self.server.devices[SERIAL]
+        self.client = ADBProtocolClient(port=self.server.port, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_host_command(self):
+        self.assertIn(SERIAL, self.client.host_command("host:devices"))
+        self.assertIn("already connected", self.client.host_command(f"host:connect:{SERIAL}"))
+
+    def test_shell_output_and_exit_code(self):
+        self.assertEqual(self.client.shell(SERIAL, "echo hello; echo world"), (0, b"hello\nworld\n"))
+        self.assertEqual(self.client.shell(SERIAL, "sh -c 'printf abc; exit 3'"), (3, b"abc"))
+        self.assertEqual(self.client.shell(SERIAL, "printf abc"), (0, b"abc"))
+
+    def test_shell_reuses_pooled_connection(self):
+        self.client.shell(SERIAL, "echo $$ > /dev/null")
+        first = self.client.shell(SERIAL, "echo $$")[1]
+        second = self.client.shell(SERIAL, "echo $$")[1]
+        self.assertEqual(first, second)
+
+    def test_exec_out_returns_raw_bytes(self):
+        self.assertEqual(self.client.exec_out(SERIAL, "printf 'a\\r\\nb'"), b"a\r\nb")
+
+    def test_pull_bytes(self):
+        with open(self.device.local_path("/sdcard/data.bin"), "wb") as f:
+            f.write(bytes(range(256)) * 1000)
+        self.assertEqual(self.client.pull_bytes(SERIAL, "/sdcard/data.bin"), bytes(range(256)) * 1000)
+        with self.assertRaises(ADBProtocolError):
+            self.client.pull_bytes(SERIAL, "/sdcard/missing.bin")
+
+    def test_fail_reply_is_os_error(self):
+        with self.assertRaises(ADBProtocolError) as caught:
+            self.client.shell("127.0.0.1:16385", "echo hello")
+        self.assertIsInstance(caught.exception, OSError)
+        self.assertIn("device not found", str(caught.exception))
+
+    def test_connection_closed_mid_reply(self):
+        # 输出一行后shell被杀死，服务端在哨兵行之前关闭连接
+        with self.assertRaises(ADBProtocolError):
+            self.client.shell(SERIAL, "echo partial; kill -9 $$")
+        self.assertEqual(self.client.shell(SERIAL, "echo ok"), (0, b"ok\n"))
+
+
+@unittest.skipIf(os.name == "nt", "伪 adb server 仅支持 Linux / macOS")
+class ADBSocketControllerErrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeADBServer([SERIAL]).start()
+        self.client = ADBProtocolClient(port=self.server.port, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def make_controller(self, port: int) -> ADBSocketController:
+        with mock.patch("control.adb.adb_controller.get_logger", return_value=logging.getLogger(__name__)):
+            return ADBSocketController(port, "test", "mumu", client=self.client)
+
+    def test_close_game_handles_dropped_connection(self):
+        device = self.server.devices[SERIAL]
+        with open(os.path.join(device.bin_dir, "am"), "w") as f:
+            f.write("#!/bin/sh\necho partial\nkill -9 $PPID\n")
+        controller = self.make_controller(16384)
+        self.assertFalse(controller.close_simulator_game("com.miHoYo.hkrpg"))
+
+    def test_close_game_handles_offline_device(self):
+        controller = self.make_controller(16385)
+        self.assertFalse(controller.close_simulator_game("com.miHoYo.hkrpg"))
+
+    def test_shell_error_types(self):
+        controller = self.make_controller(16384)
+        self.assertEqual(controller.shell("echo hello"), "hello\n")
+        with self.assertRaises(subprocess.CalledProcessError):
+            controller.shell("sh -c 'exit 2'")
+        with self.assertRaises(OSError):
+            controller.shell("echo partial; kill -9 $$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import subprocess
+import unittest
+
+from control.adb.adb_shell_session import (ADBSessionError, ADBShellSession, frame_command, is_marker_line,
+                                           marker_bytes, parse_marker_line, strip_frame_newline)
+
+MARKER_ID = "0123456789abcdef0123456789abcdef"
+
+
+def run_framed(command: str) -> bytes:
+    """用本地 sh 执行封装后的命令，返回原始输出"""
+    return subprocess.run(["sh"], input=frame_command(command, MARKER_ID), stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, timeout=10).stdout
+
+
+class MarkerParsingTest(unittest.TestCase):
+
+    def test_parse_marker_line(self):
+        marker = marker_bytes(MARKER_ID)
+        self.assertEqual(parse_marker_line(b"__GH_END_" + MARKER_ID.encode() + b"__:0\n", marker), (b"", 0))
+        self.assertEqual(parse_marker_line(b"tail__GH_END_" + MARKER_ID.encode() + b"__:127\r\n", marker),
+                         (b"tail", 127))
+        self.assertIsNone(parse_marker_line(b"ordinary output\n", marker))
+        # 其他命令的哨兵不属于本命令
+        self.assertIsNone(parse_marker_line(b"__GH_END_" + b"f" * 32 + b"__:0\n", marker))
+
+    def test_is_marker_line(self):
+        self.assertTrue(is_marker_line(b"__GH_END_" + b"f" * 32 + b"__:1\n"))
+        self.assertFalse(is_marker_line(b"ordinary output\n"))
+        # 终端回显的命令文本中前缀与ID被引号隔开
+        echoed = frame_command("true", MARKER_ID)
+        self.assertFalse(is_marker_line(echoed))
+
+    def test_strip_frame_newline(self):
+        self.assertEqual(strip_frame_newline(b"abc\n"), b"abc")
+        self.assertEqual(strip_frame_newline(b"abc\r\n"), b"abc")
+        self.assertEqual(strip_frame_newline(b"abc"), b"abc")
+        self.assertEqual(strip_frame_newline(b"abc\n\n"), b"abc\n")
+
+
+@unittest.skipIf(os.name == "nt", "需要 sh")
+class FrameCommandTest(unittest.TestCase):
+
+    def parse(self, command: str) -> tuple:
+        output = run_framed(command)
+        lines = output.splitlines(keepends=True)
+        parsed = parse_marker_line(lines[-1], marker_bytes(MARKER_ID))
+        self.assertIsNotNone(parsed, output)
+        return parsed[1], strip_frame_newline(b"".join(lines[:-1]) + parsed[0])
+
+    def test_output_and_exit_code(self):
+        self.assertEqual(self.parse("echo hello"), (0, b"hello\n"))
+        self.assertEqual(self.parse("sh -c 'exit 5'"), (5, b""))
+
+    def test_output_without_trailing_newline(self):
+        self.assertEqual(self.parse("printf abc"), (0, b"abc"))
+
+    def test_stderr_is_merged(self):
+        self.assertEqual(self.parse("echo out; echo err >&2"), (0, b"out\nerr\n"))
+
+    def test_command_cannot_read_session_input(self):
+        self.assertEqual(self.parse("cat"), (0, b""))
+
+
+@unittest.skipIf(os.name == "nt", "需要 sh")
+class ADBShellSessionTest(unittest.TestCase):
+    """以本地 sh 代替 adb shell，验证常驻会话的分帧与重建"""
+
+    def setUp(self):
+        self.session = ADBShellSession(["sh"])
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_commands_share_one_process(self):
+        self.assertEqual(self.session.execute("echo one"), (0, b"one\n"))
+        pid = self.session._process.pid
+        self.assertEqual(self.session.execute("sh -c 'echo two; exit 3'"), (3, b"two\n"))
+        self.assertEqual(self.session._process.pid, pid)
+
+    def test_multiline_output(self):
+        code, output = self.session.execute("seq 1 2000")
+        self.assertEqual(code, 0)
+        self.assertEqual(output.splitlines(), [str(value).encode() for value in range(1, 2001)])
+
+    def test_timeout_closes_session(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.session.execute("sleep 5", timeout=0.2)
+        self.assertFalse(self.session.is_alive())
+        self.assertEqual(self.session.execute("echo again"), (0, b"again\n"))
+
+    def test_session_exit_raises(self):
+        with self.assertRaises(ADBSessionError) as caught:
+            self.session.execute("exit 0")
+        self.assertIsInstance(caught.exception, OSError)
+        self.assertEqual(self.session.execute("echo restarted"), (0, b"restarted\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
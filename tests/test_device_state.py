@@ -0,0 +1,56 @@
+import unittest
+
+from control.adb.device_state import parse_probe_output
+
+# Android 10+：旋转以角度输出
+MODERN_OUTPUT = """\
+    init=1080x1920 420dpi cur=1920x1080 app=1920x1008 rng=1080x1008-1920x1920
+    mCurrentRotation=ROTATION_90
+  mCurrentFocus=Window{1a2b3c u0 com.miHoYo.hkrpg/com.mihoyo.combosdk.ComboSDKActivity}
+  mWakefulness=Awake
+"""
+
+# Android 9 及以下：旋转以序号输出
+LEGACY_OUTPUT = """\
+    init=1080x1920 320dpi cur=1920x1080 app=1920x1080 rng=1080x1032-1920x1872
+    mRotation=3 mAltOrientation=false
+  mCurrentFocus=Window{4d5e6f u0 com.example/.MainActivity}
+Display Power: state=ON
+"""
+
+
+class ParseProbeOutputTest(unittest.TestCase):
+
+    def test_modern_format(self):
+        info = parse_probe_output(MODERN_OUTPUT)
+        self.assertEqual(info.resolution, (1920, 1080))
+        self.assertEqual(info.rotation, 1)
+        self.assertEqual(info.focused_package, "com.miHoYo.hkrpg")
+        self.assertEqual(info.focused_activity, "com.mihoyo.combosdk.ComboSDKActivity")
+        self.assertTrue(info.screen_on)
+
+    def test_legacy_format(self):
+        info = parse_probe_output(LEGACY_OUTPUT)
+        self.assertEqual(info.resolution, (1920, 1080))
+        self.assertEqual(info.rotation, 3)
+        self.assertEqual(info.focused_package, "com.example")
+        self.assertEqual(info.focused_activity, "com.example.MainActivity")
+        self.assertTrue(info.screen_on)
+
+    def test_rotation_degrees_map_to_distinct_indices(self):
+        for degrees, index in ((0, 0), (90, 1), (180, 2), (270, 3)):
+            with self.subTest(degrees=degrees):
+                info = parse_probe_output(f"cur=1080x1920\nmCurrentRotation=ROTATION_{degrees}\n")
+                self.assertEqual(info.rotation, index)
+
+    def test_surface_orientation_index(self):
+        info = parse_probe_output("cur=1920x1080\n    SurfaceOrientation: 1\n")
+        self.assertEqual(info.rotation, 1)
+
+    def test_missing_resolution(self):
+        with self.assertRaises(ValueError):
+            parse_probe_output("mCurrentRotation=ROTATION_0\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import random
+import unittest
+import xml.etree.ElementTree as ET
+
+from benchmark.fake_adb_server import WINDOW_DUMP
+from control.image.hierarchy import HierarchySnapshot, Selector, find_nodes, parse_bounds
+
+TEXTS = ["", "开始", "崩坏：星穹铁道", "a&b", 'say "hi"', "<tag>", "x > y", "line\nbreak", "tab\tin", "开始游戏"]
+IDS = ["", "com.mumu.launcher:id/icon", "com.mumu.launcher:id/close", "com.example:id/a&b"]
+CLASSES = ["android.widget.TextView", "android.view.View", "android.widget.FrameLayout"]
+BOUNDS = ["[0,0][100,100]", "[10,20][30,40]", "[-5,0][5,10]", "", "invalid", "[1,1][2,2]"]
+
+
+def random_hierarchy(rng: random.Random, count: int = 200) -> bytes:
+    """生成随机布局：随机嵌套、重复的属性值、缺失或无效的 bounds、需要转义的字符"""
+    root = ET.Element("hierarchy", rotation="0")
+    parents = [root]
+    for index in range(count):
+        attrib = {
+            "index": str(index),
+            "text": rng.choice(TEXTS),
+            "resource-id": rng.choice(IDS),
+            "class": rng.choice(CLASSES),
+            "package": rng.choice(["com.mumu.launcher", "com.miHoYo.hkrpg"]),
+            "content-desc": rng.choice(TEXTS),
+        }
+        bounds = rng.choice(BOUNDS)
+        if bounds:
+            attrib["bounds"] = bounds
+        node = ET.SubElement(rng.choice(parents), "node", attrib)
+        parents.append(node)
+    return b"<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>" + ET.tostring(root, encoding="utf-8")
+
+
+def selectors() -> list:
+    result = []
+    for by, values in (("text", TEXTS), ("content-desc", TEXTS), ("resource-id", IDS), ("class", CLASSES),
+                       ("package", ["com.miHoYo.hkrpg", "missing"])):
+        for value in values:
+            if value:
+                result.append(Selector(by, value))
+                result.append(Selector(by, value[:2], "contains"))
+    result += [Selector("text", r"^开始", "regex"), Selector("resource-id", r"id/(icon|close)$", "regex"),
+               Selector("text", "missing"), Selector("bounds", "[10,20][30,40]")]
+    return result
+
+
+def attrib_of(node):
+    return None if node is None else node.attrib
+
+
+class FindNodesTest(unittest.TestCase):
+
+    def test_parse_bounds(self):
+        self.assertEqual(parse_bounds("[1,2][3,4]"), (1, 2, 3, 4))
+        self.assertEqual(parse_bounds("[-5,0][5,10]"), (-5, 0, 5, 10))
+        self.assertIsNone(parse_bounds("invalid"))
+        self.assertIsNone(parse_bounds(None))
+
+    def test_window_dump(self):
+        found = find_nodes(WINDOW_DUMP.encode("utf-8"), {
+            "indicator": Selector("resource-id", "com.mumu.launcher:id/page_indicator"),
+            "icon": Selector("text", "崩坏：星穹铁道"),
+            "food": ("content-desc", "食物", "contains"),
+            "missing": ("text", "missing"),
+        })
+        self.assertEqual(found["indicator"].center, (960, 1020))
+        self.assertEqual(found["icon"].center, (280, 390))
+        self.assertEqual(found["food"].text, "食物语")
+        self.assertIsNone(found["missing"])
+
+    def test_matches_snapshot(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            xml = random_hierarchy(rng)
+            snapshot = HierarchySnapshot.from_xml(xml)
+            for selector in selectors():
+                with self.subTest(selector=selector):
+                    expected = attrib_of(snapshot.select(selector))
+                    self.assertEqual(attrib_of(find_nodes(xml, {"node": selector})["node"]), expected)
+                    self.assertEqual(attrib_of(find_nodes(xml, {"node": selector}, chunk_size=7)["node"]),
+                                     expected)
+
+    def test_many_selectors_in_one_pass(self):
+        rng = random.Random(1)
+        xml = random_hierarchy(rng, 500)
+        snapshot = HierarchySnapshot.from_xml(xml)
+        specs = {str(position): selector for position, selector in enumerate(selectors())}
+        found = find_nodes(xml, specs, chunk_size=64)
+        expected = snapshot.select_many(specs)
+        self.assertEqual({name: attrib_of(node) for name, node in found.items()},
+                         {name: attrib_of(node) for name, node in expected.items()})
+
+    def test_accepts_str(self):
+        found = find_nodes(WINDOW_DUMP, {"icon": ("text", "食物语")})
+        self.assertEqual(found["icon"].center, (480, 390))
+
+    def test_malformed_xml_raises_before_match(self):
+        with self.assertRaises(ET.ParseError):
+            find_nodes(b"<hierarchy><node text='a' <node", {"node": ("text", "b", "contains")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import logging
+import os
+import unittest
+from unittest import mock
+
+from benchmark.fake_adb_server import FakeADBServer
+from control.adb.adb_protocol import ADBProtocolClient
+from control.adb.adb_socket_controller import ADBSocketController
+from control.adb.input_batch import STEP_MARKER, InputBatch
+
+SERIAL = "127.0.0.1:16384"
+
+
+def stamp(key, exit_code: int, uptime: float) -> str:
+    return f"{STEP_MARKER}{key}:{exit_code} {uptime:.2f} 1234.56"
+
+
+class InputBatchTest(unittest.TestCase):
+
+    def test_compile(self):
+        batch = InputBatch(max_offset=0).tap(100, 200).sleep(300).swipe(1, 2, 3, 4, duration=500).keyevent(4)
+        script = batch.compile().splitlines()
+        self.assertEqual(script[0], f'echo "{STEP_MARKER}start:0 $(cat /proc/uptime)"')
+        self.assertEqual(script[1::2], ["input tap 100 200", "sleep 0.300", "input swipe 1 2 3 4 500",
+                                        "input keyevent 4"])
+        self.assertEqual(script[2], f'echo "{STEP_MARKER}0:$? $(cat /proc/uptime)"')
+        self.assertAlmostEqual(batch.estimated_seconds(), 0.8)
+
+    def test_jitter_is_seeded_and_clamped(self):
+        first = InputBatch(seed=7).tap(5, 5).swipe(0, 0, 100, 100).compile()
+        self.assertEqual(first, InputBatch(seed=7).tap(5, 5).swipe(0, 0, 100, 100).compile())
+        for _ in range(50):
+            batch = InputBatch(max_offset=10).tap(3, 3)
+            x, y = batch.parse_results("\n".join([stamp("start", 0, 1.0), stamp(0, 0, 1.1)]))[0]["args"]
+            self.assertGreaterEqual(min(x, y), 0)
+            self.assertLessEqual(max(x, y), 13)
+
+    def test_random_delay_is_compiled(self):
+        batch = InputBatch(seed=1).tap(10, 10, min_delay=0.2, max_delay=0.4)
+        lines = batch.compile().splitlines()
+        self.assertTrue(lines[1].startswith("sleep 0."))
+        self.assertTrue(0.2 <= float(lines[1].split()[1]) <= 0.4)
+
+    def test_parse_results(self):
+        batch = InputBatch(max_offset=0).tap(1, 2).sleep(250).keyevent("KEYCODE_BACK")
+        output = "\n".join([
+            "noise before",
+            stamp("start", 0, 100.00),
+            stamp(0, 0, 100.05),
+            "input: warning",
+            stamp(1, 0, 100.31),
+            stamp(2, 1, 100.34),
+        ])
+        results = batch.parse_results(output)
+        self.assertEqual([step["action"] for step in results], ["tap", "sleep", "keyevent"])
+        self.assertEqual([step["elapsed_ms"] for step in results], [50, 260, 30])
+        self.assertEqual([step["exit_code"] for step in results], [0, 0, 1])
+        self.assertEqual(results[0]["args"], (1, 2))
+        self.assertEqual(results[1]["args"], (250,))
+
+    def test_parse_results_stops_at_missing_step(self):
+        batch = InputBatch(max_offset=0).tap(1, 2).tap(3, 4).tap(5, 6)
+        output = "\n".join([stamp("start", 0, 1.0), stamp(0, 0, 1.1), stamp(2, 0, 1.3)])
+        self.assertEqual([step["index"] for step in batch.parse_results(output)], [0])
+        self.assertEqual(batch.parse_results("no markers"), [])
+
+
+@unittest.skipIf(os.name == "nt", "伪 adb server 仅支持 Linux / macOS")
+class RunBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeADBServer([SERIAL]).start()
+        self.client = ADBProtocolClient(port=self.server.port, timeout=5)
+        with mock.patch("control.adb.adb_controller.get_logger", return_value=logging.getLogger(__name__)):
+            self.controller = ADBSocketController(16384, "test", "mumu", client=self.client)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_run_batch(self):
+        batch = InputBatch(max_offset=0).tap(100, 200).sleep(50).swipe(10, 20, 30, 40, duration=100)
+        results = self.controller.run_batch(batch)
+        self.assertEqual(len(results), 3)
+        self.assertGreaterEqual(results[1]["elapsed_ms"], 40)
+        self.assertEqual(self.server.devices[SERIAL].input_log(), ["tap 100 200", "swipe 10 20 30 40 100"])
+
+    def test_run_batch_failed_step(self):
+        device = self.server.devices[SERIAL]
+        with open(os.path.join(device.bin_dir, "input"), "w") as f:
+            f.write('#!/bin/sh\n[ "$1" = keyevent ] && exit 1\nexit 0\n')
+        self.assertIsNone(self.controller.run_batch(InputBatch(max_offset=0).tap(1, 1).keyevent(4)))
+        self.assertEqual(len(self.controller.run_batch(InputBatch(max_offset=0).tap(1, 1))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
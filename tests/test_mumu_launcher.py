@@ -0,0 +1,119 @@
+import importlib.util
+import time
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from control.image.frame_stream import Frame, StableResult
+from control.image.screen_classifier import ScreenClassifier
+
+HAS_WIN32 = importlib.util.find_spec("win32gui") is not None
+if HAS_WIN32:
+    from simulator.implementations.mumu.simulator_mumu import MuMuSimulator
+
+
+def page_image(seed: int) -> np.ndarray:
+    """每个种子生成一张不同的桌面截图"""
+    return np.random.default_rng(seed).integers(0, 255, (90, 160, 4), dtype=np.uint8)
+
+
+class _Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Node(dict):
+    center = None
+
+
+class FakeLauncher:
+    """模拟桌面：每次启动前可更换各页截图和图标所在页，滑动会真实改变当前页"""
+
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.current = 1
+        self.images = {}
+        self.icon_page = None
+        self.clicked = []
+        self.dumps = 0
+        self.adb = SimpleNamespace(
+            close_simulator_game=self._close,
+            swipe_left=lambda: self._move(-1),
+            swipe_right=lambda: self._move(1),
+            click=lambda x, y: self.clicked.append(self.current),
+        )
+        self.image = SimpleNamespace(
+            screens=ScreenClassifier(),
+            take_screenshot=lambda max_age_ms=None: self.images[self.current],
+            find_nodes=self._find_nodes,
+        )
+        self.frames = SimpleNamespace(wait_until_stable=self._wait_until_stable)
+
+    def layout(self, images: dict, icon_page: int):
+        self.images = images
+        self.icon_page = icon_page
+
+    def _close(self, package):
+        self.current = 1
+        return True
+
+    def _move(self, step):
+        self.current = min(max(self.current + step, 1), self.pages)
+
+    def _wait_until_stable(self, **kwargs):
+        frame = Frame(1, time.monotonic(), self.images[self.current])
+        return StableResult(True, 0.0, 2, frame)
+
+    def _find_nodes(self, selectors):
+        self.dumps += 1
+        indicator = _Node({"content-desc": f"页面指示器：第{self.current}屏，共{self.pages}屏"})
+        icon = None
+        if self.current == self.icon_page:
+            icon = _Node({"text": selectors["icon"].value})
+            icon.center = (100, 200)
+        return {"indicator": indicator, "icon": icon}
+
+
+@unittest.skipUnless(HAS_WIN32, "MuMuSimulator 依赖 win32gui")
+class LauncherSearchTest(unittest.TestCase):
+
+    def make_simulator(self, device: FakeLauncher) -> "MuMuSimulator":
+        simulator = MuMuSimulator.__new__(MuMuSimulator)
+        simulator.page = 0
+        simulator.count = 0
+        simulator.icon = "崩坏：星穹铁道"
+        simulator.game_package = "com.miHoYo.hkrpg"
+        simulator.simulator = device
+        simulator.logger = _Logger()
+        simulator._is_screen_initialized = False
+        simulator._screen_nodes = None
+        simulator._searched_pages = set()
+        return simulator
+
+    def test_finds_icon_after_pages_change_between_launches(self):
+        device = FakeLauncher(pages=3)
+        simulator = self.make_simulator(device)
+
+        device.layout({1: page_image(1), 2: page_image(2), 3: page_image(3)}, icon_page=3)
+        self.assertTrue(simulator.launcher_simulator_game())
+        self.assertEqual(device.clicked, [3])
+
+        # 图标移动后，第2屏变成了上次第1屏的样子：不能被旧样本误判为已搜索页
+        device.layout({1: page_image(4), 2: page_image(1), 3: page_image(5)}, icon_page=2)
+        self.assertTrue(simulator.launcher_simulator_game())
+        self.assertEqual(device.clicked, [3, 2])
+
+    def test_launch_removes_previous_launcher_samples(self):
+        device = FakeLauncher(pages=2)
+        simulator = self.make_simulator(device)
+        device.image.screens.register("star_rail/login", page_image(9))
+        device.image.screens.register(f"{MuMuSimulator.LAUNCHER_LABEL}2", page_image(8))
+
+        device.layout({1: page_image(1), 2: page_image(2)}, icon_page=1)
+        self.assertTrue(simulator.launcher_simulator_game())
+        self.assertEqual(device.image.screens.labels(), ["star_rail/login"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from control.ocr.ocr_cache import OcrCache
+
+
+def result(text: str) -> dict:
+    return {"code": 100, "data": [{"box": [[0, 0], [10, 0], [10, 10], [0, 10]], "score": 0.99, "text": text}]}
+
+
+def entry_size(key: str, value: dict) -> int:
+    return len(key) + len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+class OcrCacheKeyTest(unittest.TestCase):
+
+    def test_key_depends_on_pixels_shape_dtype_and_args(self):
+        pixels = np.arange(24, dtype=np.uint8).reshape(2, 3, 4)
+        key = OcrCache.key(pixels)
+        self.assertEqual(OcrCache.key(pixels.copy()), key)
+        changed = pixels.copy()
+        changed[0, 0, 0] += 1
+        self.assertNotEqual(OcrCache.key(changed), key)
+        self.assertNotEqual(OcrCache.key(pixels.reshape(3, 2, 4)), key)
+        self.assertNotEqual(OcrCache.key(pixels.astype(np.uint16)), key)
+        self.assertNotEqual(OcrCache.key(pixels, {"limit_side_len": 960}), key)
+        self.assertEqual(OcrCache.key(pixels, {"a": 1, "b": 2}), OcrCache.key(pixels, {"b": 2, "a": 1}))
+
+    def test_key_of_cropped_view(self):
+        frame = np.random.default_rng(0).integers(0, 255, (50, 60, 4), dtype=np.uint8)
+        view = frame[10:20, 5:25]
+        self.assertFalse(view.flags.c_contiguous)
+        self.assertEqual(OcrCache.key(view), OcrCache.key(np.ascontiguousarray(view)))
+
+
+class OcrCacheTest(unittest.TestCase):
+
+    def test_get_and_put(self):
+        cache = OcrCache()
+        self.assertIsNone(cache.get("a"))
+        self.assertTrue(cache.put("a", result("A")))
+        self.assertEqual(cache.get("a"), result("A"))
+        self.assertTrue(cache.put("empty", {"code": 101, "data": ""}))
+        self.assertFalse(cache.put("failed", {"code": 902, "data": "连接被拒绝"}))
+        self.assertIsNone(cache.get("failed"))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"]), (2, 1, 2))
+        self.assertEqual(stats["hit_rate"], 0.333)
+
+    def test_lru_eviction_by_entries(self):
+        cache = OcrCache(max_entries=3)
+        for key in "abc":
+            cache.put(key, result(key))
+        cache.get("a")  # a 变为最近使用
+        cache.put("d", result("d"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([key for key in "acd" if cache.get(key)], ["a", "c", "d"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_eviction_by_bytes(self):
+        size = entry_size("a", result("a"))
+        cache = OcrCache(max_bytes=size * 2)
+        for key in "abc":
+            cache.put(key, result(key))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, size * 2, 1))
+        self.assertIsNone(cache.get("a"))
+
+    def test_oversized_result_is_not_cached(self):
+        cache = OcrCache(max_bytes=50)
+        cache.put("small", {"code": 101, "data": ""})
+        self.assertFalse(cache.put("big", result("x" * 100)))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_replacing_key_updates_bytes(self):
+        cache = OcrCache()
+        cache.put("a", result("short"))
+        cache.put("a", result("a much longer text"))
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.stats()["bytes"], entry_size("a", result("a much longer text")))
+        cache.clear()
+        self.assertEqual((cache.stats()["entries"], cache.stats()["bytes"]), (0, 0))
+
+
+class OcrCachePersistenceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="ocr_cache_")
+        self.path = os.path.join(self.directory, "sub", ".ocr_cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_save_and_load_keeps_lru_order(self):
+        cache = OcrCache()
+        for key in "abc":
+            cache.put(key, result(key))
+        cache.get("a")
+        self.assertTrue(cache.save(self.path))
+
+        restored = OcrCache(max_entries=2)
+        self.assertEqual(restored.load(self.path), 3)
+        # 按使用顺序加载：最久未使用的 b 被淘汰
+        self.assertIsNone(restored.get("b"))
+        self.assertEqual(restored.get("a"), result("a"))
+        self.assertEqual(restored.get("c"), result("c"))
+
+    def test_invalid_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("not json")
+        self.assertEqual(OcrCache().load(self.path), 0)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": 99, "entries": [["a", result("a")]]}, f)
+        self.assertEqual(OcrCache().load(self.path), 0)
+        self.assertEqual(OcrCache().load(os.path.join(self.directory, "missing.json")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import threading
+import time
+import unittest
+
+from control.ocr.ocr_controller import PPOCR_pipeline
+
+# 仿真引擎：按顺序逐条处理，回复中带回请求的 image_path；耗时随请求变化，
+# 回复前可能先输出提示行；收到 "crash" 时不回复直接退出
+ENGINE = r"""
+import json, sys, time
+out = sys.stdout.buffer
+out.write(b"OCR init completed.\n"); out.flush()
+for line in iter(sys.stdin.buffer.readline, b""):
+    request = json.loads(line)
+    path = request.get("image_path", "")
+    if path == "crash":
+        sys.exit(1)
+    index = int(path) if path.isdigit() else 0
+    time.sleep((index % 3) * 0.002)
+    if index % 4 == 0:
+        out.write(b"hint: not a reply\n")
+    result = {"code": 100, "data": [{"box": [[0, 0], [1, 0], [1, 1], [0, 1]], "score": 1.0, "text": path}]}
+    if not request:
+        result = {"code": 200, "data": "No image input"}
+    out.write((json.dumps(result) + "\n").encode()); out.flush()
+"""
+
+
+def start_engine(**kwargs) -> PPOCR_pipeline:
+    return PPOCR_pipeline(__file__, command=[sys.executable, "-c", ENGINE], **kwargs)
+
+
+class PPOCRPipelineTest(unittest.TestCase):
+
+    def test_futures_receive_their_own_replies(self):
+        ocr = start_engine(maxInFlight=4)
+        try:
+            futures = [ocr.submit(str(index)) for index in range(100)]
+            texts = [future.result(10)["data"][0]["text"] for future in futures]
+            self.assertEqual(texts, [str(index) for index in range(100)])
+            self.assertEqual(ocr.pending(), 0)
+        finally:
+            ocr.exit()
+
+    def test_concurrent_submitters(self):
+        ocr = start_engine(maxInFlight=3)
+        mismatches = []
+
+        def submitter(prefix: int):
+            for index in range(30):
+                path = str(prefix * 1000 + index)
+                result = ocr.submit(path).result(10)
+                if result["data"][0]["text"] != path:
+                    mismatches.append((path, result))
+
+        threads = [threading.Thread(target=submitter, args=(prefix,)) for prefix in range(1, 5)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            ocr.exit()
+        self.assertEqual(mismatches, [])
+
+    def test_max_in_flight_blocks_submit(self):
+        ocr = start_engine(maxInFlight=2)
+        try:
+            observed = []
+            futures = []
+            for index in range(20):
+                futures.append(ocr.submit(str(index)))
+                observed.append(ocr.pending())
+            self.assertLessEqual(max(observed), 2)
+            for future in futures:
+                future.result(10)
+        finally:
+            ocr.exit()
+
+    def test_run_dict_is_synchronous(self):
+        ocr = start_engine()
+        try:
+            self.assertEqual(ocr.runDict({}, show_log=False)["code"], 200)
+            self.assertEqual(ocr.run("7")["data"][0]["text"], "7")
+        finally:
+            ocr.exit()
+
+    def test_crash_fails_pending_futures(self):
+        ocr = start_engine(maxInFlight=8)
+        try:
+            before = ocr.submit("1")
+            crashed = ocr.submit("crash")
+            after = ocr.submit("2")
+            self.assertEqual(before.result(10)["data"][0]["text"], "1")
+            self.assertEqual(crashed.result(10)["code"], 902)
+            self.assertEqual(after.result(10)["code"], 902)
+            deadline = time.monotonic() + 10
+            while ocr.ret.poll() is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(ocr.submit("3").result(10)["code"], 902)
+        finally:
+            ocr.exit()
+
+    def test_exit_fails_pending_futures(self):
+        ocr = start_engine(maxInFlight=4)
+        future = ocr.submit("1")
+        ocr.exit()
+        self.assertIn(future.result(10)["code"], (100, 902))
+        self.assertEqual(ocr.submit("2").result(10)["code"], 901)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import struct
+import unittest
+from base64 import b64decode
+
+import numpy as np
+
+from control.ocr.ocr_cache import OcrCache
+from control.ocr.ocr_region import GAP, MAX_SIDE, clip_rect, encode_bmp, ocr_region, ocr_regions, offset_result
+
+
+def decode_bmp(data: bytes) -> np.ndarray:
+    """解码 encode_bmp 生成的24位BMP，返回 (高, 宽, 3) RGB 数组"""
+    width, height = struct.unpack_from("<ii", data, 18)
+    stride = (width * 3 + 3) & ~3
+    pixels = np.frombuffer(data, dtype=np.uint8, offset=54).reshape(height, stride)
+    return pixels[::-1, :width * 3].reshape(height, width, 3)[:, :, ::-1]
+
+
+class FakeOcr:
+    """
+    把图片中每块亮色矩形识别为一行文字：文本为该矩形的像素值，文本框为矩形的外接框
+
+    失败模式下返回 code 902
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def runBase64(self, imageBase64: str, show_log=True) -> dict:
+        image = decode_bmp(b64decode(imageBase64))
+        self.calls.append(image.shape[:2])
+        if self.fail:
+            return {"code": 902, "data": "连接被拒绝"}
+        gray = image[:, :, 0]
+        data = []
+        for value in sorted(set(np.unique(gray)) - {0}):
+            ys, xs = np.nonzero(gray == value)
+            left, top, right, bottom = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+            data.append({"box": [[left, top], [right, top], [right, bottom], [left, bottom]], "score": 0.99,
+                         "text": str(int(value))})
+        return {"code": 100, "data": data} if data else {"code": 101, "data": ""}
+
+
+def make_frame(labels: dict, width: int = 1920, height: int = 1080) -> np.ndarray:
+    """在黑色截图上绘制亮色矩形 {像素值: (left, top, right, bottom)}"""
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    frame[..., 3] = 255
+    for value, (left, top, right, bottom) in labels.items():
+        frame[top:bottom, left:right, :3] = value
+    return frame
+
+
+def boxes(result: dict) -> dict:
+    return {item["text"]: tuple(item["box"][0] + item["box"][2]) for item in result["data"]}
+
+
+class OcrRegionHelpersTest(unittest.TestCase):
+
+    def test_encode_bmp_round_trip(self):
+        image = np.random.default_rng(0).integers(0, 255, (7, 5, 4), dtype=np.uint8)
+        self.assertTrue(np.array_equal(decode_bmp(encode_bmp(image)), image[:, :, :3]))
+        gray = image[:, :, 0]
+        self.assertTrue(np.array_equal(decode_bmp(encode_bmp(gray))[:, :, 1], gray))
+
+    def test_clip_rect(self):
+        shape = (1080, 1920, 4)
+        self.assertEqual(clip_rect((10, 10, 20, 20), shape, padding=4), (6, 6, 24, 24))
+        self.assertEqual(clip_rect((-10, 1070, 30, 1100), shape, padding=4), (0, 1066, 34, 1080))
+        self.assertIsNone(clip_rect((2000, 0, 2100, 10), shape))
+        self.assertIsNone(clip_rect((10, 10, 10, 20), shape))
+
+    def test_offset_result(self):
+        result = {"code": 100, "data": [{"box": [[1, 2], [3, 2], [3, 4], [1, 4]], "text": "a"}]}
+        moved = offset_result(result, 10, 20)
+        self.assertEqual(moved["data"][0]["box"], [[11, 22], [13, 22], [13, 24], [11, 24]])
+        self.assertEqual(result["data"][0]["box"][0], [1, 2])
+        self.assertEqual(offset_result({"code": 101, "data": ""}, 5, 5), {"code": 101, "data": ""})
+
+
+class OcrRegionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ocr = FakeOcr()
+        self.labels = {
+            50: (100, 100, 180, 130),
+            90: (900, 500, 1000, 540),
+            130: (1500, 60, 1620, 90),
+        }
+        self.frame = make_frame(self.labels)
+        self.rects = [(90, 90, 200, 140), (880, 490, 1020, 550), (1490, 50, 1640, 100)]
+
+    def test_single_region(self):
+        result = ocr_region(self.ocr, self.frame, self.rects[1])
+        self.assertEqual(boxes(result), {"90": (900, 500, 1000, 540)})
+        self.assertEqual(self.ocr.calls, [(68, 148)])
+
+    def test_regions_share_one_call_and_map_back(self):
+        results = ocr_regions(self.ocr, self.frame, self.rects)
+        self.assertEqual(len(self.ocr.calls), 1)
+        for result, (value, rect) in zip(results, self.labels.items()):
+            self.assertEqual(boxes(result), {str(value): rect})
+
+    def test_empty_and_outside_regions(self):
+        results = ocr_regions(self.ocr, self.frame, [(300, 300, 400, 400), (3000, 0, 3100, 10), self.rects[0]])
+        self.assertEqual(results[0], {"code": 101, "data": ""})
+        self.assertEqual(results[1], {"code": 101, "data": ""})
+        self.assertEqual(boxes(results[2]), {"50": (100, 100, 180, 130)})
+
+    def test_tall_batches_are_split(self):
+        labels = {10 + index: (100, 20 + index * 85, 300, 60 + index * 85) for index in range(12)}
+        frame = make_frame(labels)
+        rects = [(left, top - 20, right, bottom + 20) for left, top, right, bottom in labels.values()]
+        results = ocr_regions(self.ocr, frame, rects, padding=0)
+        self.assertGreater(len(self.ocr.calls), 1)
+        self.assertTrue(all(height <= MAX_SIDE and width <= MAX_SIDE for height, width in self.ocr.calls))
+        for result, (value, rect) in zip(results, labels.items()):
+            self.assertEqual(boxes(result), {str(value): rect})
+
+    def test_wide_region_is_not_merged(self):
+        rects = [(0, 0, 1200, 50), self.rects[0]]
+        ocr_regions(self.ocr, self.frame, rects, padding=0)
+        self.assertEqual(len(self.ocr.calls), 2)
+
+    def test_failure_is_reported_for_every_region(self):
+        self.ocr.fail = True
+        results = ocr_regions(self.ocr, self.frame, self.rects)
+        self.assertEqual([result["code"] for result in results], [902, 902, 902])
+
+    def test_cache_hits_skip_engine_and_follow_position(self):
+        cache = OcrCache()
+        first = ocr_regions(self.ocr, self.frame, self.rects, cache=cache)
+        self.assertEqual(len(self.ocr.calls), 1)
+        self.assertEqual(ocr_regions(self.ocr, self.frame, self.rects, cache=cache), first)
+        self.assertEqual(len(self.ocr.calls), 1)
+
+        # 同一标签移动到别处：仍然命中，坐标换算到新位置
+        moved = make_frame({50: (600, 700, 680, 730)})
+        result = ocr_region(self.ocr, moved, (590, 690, 700, 740), cache=cache)
+        self.assertEqual(len(self.ocr.calls), 1)
+        self.assertEqual(boxes(result), {"50": (600, 700, 680, 730)})
+
+        # 引擎参数不同时不命中
+        ocr_region(self.ocr, self.frame, self.rects[0], cache=cache, cache_args={"limit_side_len": 1920})
+        self.assertEqual(len(self.ocr.calls), 2)
+
+    def test_failures_are_not_cached(self):
+        cache = OcrCache()
+        self.ocr.fail = True
+        ocr_region(self.ocr, self.frame, self.rects[0], cache=cache)
+        self.ocr.fail = False
+        self.assertEqual(boxes(ocr_region(self.ocr, self.frame, self.rects[0], cache=cache)),
+                         {"50": (100, 100, 180, 130)})
+        self.assertEqual(len(self.ocr.calls), 2)
+
+    def test_gap_between_regions(self):
+        # 拼接图中相邻区域之间留有 GAP 像素的空白
+        ocr_regions(self.ocr, self.frame, self.rects[:2], padding=0)
+        heights = [bottom - top for _, top, _, bottom in self.rects[:2]]
+        self.assertEqual(self.ocr.calls[0][0], sum(heights) + GAP)
+
+
+if __name__ == "__main__":
+    unittest.main()
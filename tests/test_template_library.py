@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from control.image.template_library import TemplateLibrary
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def write_template(path: str, value: int, size: int = 32):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(np.full((size, size, 3), value, dtype=np.uint8)).save(path)
+
+
+class _SwapProbeLibrary(TemplateLibrary):
+    """切换映射的中途在另一个线程中读取模板"""
+
+    probe = False
+
+    def _open_path(self, path: str) -> bool:
+        if self.probe:
+            self.probe = False
+            self.errors, self.values = [], []
+            self.reader = threading.Thread(target=self._read)
+            self.reader.start()
+            self.reader.join(0.2)
+        return super()._open_path(path)
+
+    def _read(self):
+        try:
+            self.values.append(int(self.get("start").image[0, 0]))
+        except Exception as e:
+            self.errors.append(e)
+
+
+@unittest.skipIf(Image is None, "需要 Pillow")
+class TemplateLibraryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="templates_")
+        write_template(os.path.join(self.directory, "start.png"), 100)
+        write_template(os.path.join(self.directory, "battle", "auto.png"), 200)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def pack_files(self) -> list:
+        return [name for name in os.listdir(self.directory) if name.endswith(".pack")]
+
+    def test_build_and_get(self):
+        library = TemplateLibrary(self.directory, (1920, 1080))
+        self.assertEqual(library.names(), ["battle/auto", "start"])
+        entry = library.get("battle/auto")
+        self.assertEqual(entry.image.shape, (32, 32))
+        self.assertEqual(int(entry.image[0, 0]), 200)
+        self.assertIs(library.get("battle/auto"), entry)
+        with self.assertRaises(KeyError):
+            library.get("missing")
+        library.close()
+
+    def test_scaled_resolution(self):
+        library = TemplateLibrary(self.directory, (960, 540))
+        self.assertEqual(library.get("start").image.shape, (16, 16))
+        library.close()
+
+    def test_rebuild_switches_to_new_version(self):
+        library = TemplateLibrary(self.directory, (1920, 1080))
+        held = library.get("start")
+        write_template(os.path.join(self.directory, "start.png"), 50)
+        self.assertTrue(library.refresh())
+        self.assertFalse(library.refresh())
+        self.assertEqual(int(library.get("start").image[0, 0]), 50)
+        # 重建前取出的模板数组仍指向旧映射，内容不变
+        self.assertEqual(int(held.image[0, 0]), 100)
+        del held
+        library.close()
+        self.assertEqual(len(self.pack_files()), 1)
+
+        reopened = TemplateLibrary(self.directory, (1920, 1080))
+        self.assertEqual(int(reopened.get("start").image[0, 0]), 50)
+        reopened.close()
+
+    def test_get_during_rebuild(self):
+        library = _SwapProbeLibrary(self.directory, (1920, 1080))
+        library.get("start")
+        write_template(os.path.join(self.directory, "start.png"), 50)
+        library.probe = True
+        self.assertTrue(library.refresh())
+        library.reader.join()
+        # 切换映射期间的读取等待切换完成，读到的是新版本而不是切换到一半的状态
+        self.assertEqual(library.errors, [])
+        self.assertEqual(library.values, [50])
+        library.close()
+
+
+if __name__ == "__main__":
+    unittest.main()